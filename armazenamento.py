@@ -0,0 +1,1270 @@
+import json  # Módulo para manipulação de dados em formato JSON
+import os  # Módulo para manipulação de arquivos do sistema
+from array import array  # Vetor compacto de inteiros para o índice de linhas
+import threading  # Para proteger o livro contra acesso simultâneo de várias threads
+from contextlib import contextmanager
+
+from dinheiro import para_centavos  # Valores guardados como inteiros em centavos
+from instrumentacao import medido  # Métricas opcionais de latência e E/S
+
+try:
+    import fcntl  # Trava de arquivo entre processos (Linux/macOS)
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Nome dos arquivos usados para armazenar o saldo e as transações
+SALDO_FILE = "saldo.json"  # Arquivo onde o saldo será armazenado
+TRANSACOES_FILE = "transacoes.json"  # Formato antigo: {"transacoes": [...]} reescrito a cada operação
+DIARIO_FILE = "transacoes.jsonl"  # Formato novo: uma transação por linha, apenas acrescentada
+TRAVA_FILE = ".trava"  # Arquivo usado apenas para a trava entre processos
+LOTE_FILE = ".lote"  # Tamanho do diário antes de um lote ainda não confirmado
+PONTOS_FILE = "saldo.pontos"  # Pontos de controle do saldo: (posição no diário, saldo), append-only
+
+# Quantidade de transações acrescentadas entre duas chamadas a os.fsync.
+# O livro usa 1 (cada operação confirmada está em disco); valores maiores trocam
+# durabilidade por velocidade.
+FSYNC_A_CADA = 1
+
+# Distância mínima, em bytes do diário, entre dois pontos de controle do saldo
+# (cerca de 10 mil transações). Reconstruir o saldo nunca relê mais do que isso.
+INTERVALO_PONTOS = 1 << 20
+
+# Quantidade máxima de divergências guardadas no relatório de verificar()
+MAX_DIVERGENCIAS = 20
+
+# Decodificador JSON reaproveitado na leitura do diário (evita o custo de json.loads por linha)
+_decodificar = json.JSONDecoder().decode
+_codificar = json.JSONEncoder(ensure_ascii=False).encode
+
+# Sinal de cada tipo de transação no saldo
+SINAIS = {"DEPOSITO": 1, "SAQUE": -1}
+
+
+class OperacaoRecusada(Exception):
+    """
+    Erro levantado quando uma operação viola alguma regra (saldo, limites).
+    A mensagem é exibida diretamente na tela.
+    """
+
+
+class Diario:
+    """
+    Diário de transações append-only no formato JSON Lines.
+    Cada transação ocupa uma linha, então gravar uma nova transação custa O(1),
+    independentemente do tamanho do histórico.
+    """
+
+    def __init__(self, caminho=DIARIO_FILE, sincronizar_a_cada=FSYNC_A_CADA):
+        self.caminho = caminho
+        self.sincronizar_a_cada = sincronizar_a_cada
+        self._arquivo = None  # Aberto apenas na primeira escrita
+        self._pendentes = 0  # Linhas gravadas desde o último fsync
+
+    def anexar(self, transacao):
+        """
+        Acrescenta uma transação ao final do diário e retorna o tamanho do
+        arquivo depois da escrita. O fsync é feito em lotes de
+        `sincronizar_a_cada` transações.
+        """
+        if self._arquivo is None:
+            self._arquivo = open(self.caminho, "ab")
+        self._arquivo.write(codificar(transacao))
+        self._arquivo.flush()
+        self._pendentes += 1
+        if self._pendentes >= self.sincronizar_a_cada:
+            self.sincronizar()
+        return self._arquivo.tell()
+
+    def anexar_bloco(self, dados):
+        """
+        Acrescenta várias linhas já codificadas com uma única escrita e um
+        único fsync (usado nos lançamentos em lote). Retorna o novo tamanho.
+        """
+        if self._arquivo is None:
+            self._arquivo = open(self.caminho, "ab")
+        self._arquivo.write(dados)
+        self._pendentes += 1
+        self.sincronizar()
+        return self._arquivo.tell()
+
+    def sincronizar(self):
+        """
+        Força a gravação em disco das transações pendentes.
+        """
+        if self._arquivo is not None and self._pendentes:
+            self._arquivo.flush()
+            os.fsync(self._arquivo.fileno())
+            self._pendentes = 0
+
+    def fechar(self):
+        """
+        Sincroniza e fecha o arquivo do diário.
+        """
+        self.sincronizar()
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+    def tamanho(self):
+        """
+        Tamanho atual do diário em bytes (0 se ainda não existir).
+        """
+        try:
+            return os.path.getsize(self.caminho)
+        except FileNotFoundError:
+            return 0
+
+    def descartar_linha_incompleta(self):
+        """
+        Remove uma última linha sem '\\n', deixada por uma escrita interrompida
+        (queda de energia, processo morto). Retorna o novo tamanho do diário.
+        """
+        tamanho = self.tamanho()
+        if tamanho == 0:
+            return 0
+        with open(self.caminho, "r+b") as file:
+            file.seek(tamanho - 1)
+            if file.read(1) == b"\n":
+                return tamanho
+            # Procura o último '\n' de trás para frente, em blocos
+            fim = tamanho
+            while fim > 0:
+                inicio = max(0, fim - 4096)
+                file.seek(inicio)
+                bloco = file.read(fim - inicio)
+                quebra = bloco.rfind(b"\n")
+                if quebra != -1:
+                    fim = inicio + quebra + 1
+                    break
+                fim = inicio
+            file.truncate(fim)
+            return fim
+
+    def ler(self, desde=0, ate=None):
+        """
+        Percorre as transações a partir da posição `desde` (em bytes),
+        retornando pares (posição final da linha, transação). Com `ate`,
+        para no fim da linha que termina nessa posição.
+        """
+        if not os.path.exists(self.caminho):
+            return
+        with open(self.caminho, "rb") as file:
+            file.seek(desde)
+            posicao = desde
+            for linha in file:
+                if ate is not None and posicao >= ate:
+                    return
+                posicao += len(linha)
+                if linha.endswith(b"\n") and linha.strip():
+                    yield posicao, normalizar(_decodificar(linha.decode("utf-8")))
+
+    def __iter__(self):
+        """
+        Percorre as transações do diário uma a uma, sem carregar o arquivo inteiro.
+        """
+        for _, transacao in self.ler():
+            yield transacao
+
+
+# Função que transforma uma transação na linha gravada no diário
+def codificar(transacao):
+    return (_codificar(transacao) + "\n").encode("utf-8")
+
+
+# Função que retorna a data e hora atuais. O datetime só é importado na primeira
+# gravação: a tela de login usa este módulo (via credenciais) e não precisa dele.
+def agora():
+    from datetime import datetime
+    return datetime.now()
+
+
+# Função que confere se o texto tem o formato exato "dd/mm/aaaa" (com zeros à esquerda)
+def data_valida(data):
+    return (isinstance(data, str) and len(data) == 10 and data[2] == data[5] == "/"
+            and (data[:2] + data[3:5] + data[6:]).isascii() and (data[:2] + data[3:5] + data[6:]).isdigit())
+
+
+# Função que junta data ("dd/mm/aaaa") e hora ("hh:mm:ss") em um número ordenável: aaaammddhhmmss
+def carimbo(data, hora="00:00:00"):
+    digitos = data[6:10] + data[3:5] + data[0:2] + hora[0:2] + hora[3:5] + hora[6:8]
+    if not (data_valida(data) and len(hora) == 8 and hora[2] == hora[5] == ":"
+            and digitos.isascii() and digitos.isdigit()):
+        raise ValueError(f"Use datas no formato dd/mm/aaaa (e horas hh:mm:ss): {data!r} {hora!r}")
+    return int(digitos)
+
+
+# Função que converte uma transação de formatos antigos para o atual
+def normalizar(transacao):
+    """
+    Transações novas guardam "centavos" e "saldo_centavos" (inteiros) e o
+    carimbo de tempo "ts". As gravadas antes disso tinham "valor" e "saldo"
+    em reais (float) e só "data" e "hora"; elas são convertidas na leitura,
+    sem precisar reescrever o diário.
+    """
+    if "centavos" not in transacao:
+        transacao["centavos"] = para_centavos(transacao.pop("valor", 0.0))
+        if "saldo" in transacao:
+            transacao["saldo_centavos"] = para_centavos(transacao.pop("saldo"))
+    if "ts" not in transacao:
+        transacao["ts"] = carimbo(transacao["data"], transacao.get("hora", "00:00:00"))
+    return transacao
+
+
+# Função para gravar um JSON de forma atômica: escreve um temporário e renomeia
+@medido("armazenamento.gravar_json")
+def gravar_json_atomico(caminho, dados, sincronizar=False):
+    temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as file:
+        json.dump(dados, file, indent=4)
+        if sincronizar:
+            file.flush()
+            os.fsync(file.fileno())
+    os.replace(temporario, caminho)  # Quem lê vê o arquivo antigo ou o novo, nunca pela metade
+
+
+# Função para garantir em disco a criação, a troca ou a remoção de arquivos em uma pasta
+def sincronizar_pasta(diretorio):
+    if os.name == "nt":
+        return  # No Windows não é possível abrir uma pasta para fsync
+    descritor = os.open(diretorio, os.O_RDONLY)
+    try:
+        os.fsync(descritor)
+    finally:
+        os.close(descritor)
+
+
+# Função para ler um JSON, retornando `padrao` se o arquivo não existir
+@medido("armazenamento.ler_json")
+def ler_json(caminho, padrao):
+    try:
+        with open(caminho, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return padrao
+
+
+# Função para converter o arquivo antigo {"transacoes": [...]} para o diário JSON Lines
+def migrar_transacoes(origem=TRANSACOES_FILE, destino=DIARIO_FILE):
+    """
+    Migração única: copia as transações do arquivo antigo para o diário e
+    renomeia o arquivo antigo para '<nome>.migrado'. Não faz nada se o diário
+    já existir ou se não houver arquivo antigo.
+    Retorna a quantidade de transações migradas.
+    """
+    if os.path.exists(destino) or not os.path.exists(origem):
+        return 0
+    with open(origem, "r", encoding="utf-8") as file:
+        transacoes = json.load(file).get("transacoes", [])
+    temporario = destino + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as file:
+        for transacao in transacoes:
+            file.write(json.dumps(transacao, ensure_ascii=False) + "\n")
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporario, destino)  # O diário só aparece depois de completo
+    os.replace(origem, origem + ".migrado")
+    return len(transacoes)
+
+
+class Projecao:
+    """
+    Estado derivado do diário (saldo, índices) guardado em um arquivo JSON.
+
+    O arquivo registra a `posicao` do diário que ele reflete. Com isso cada
+    projeção pode ser atualizada incrementalmente a cada operação e, se ficar
+    para trás (ou for apagada), ser reconstruída reaplicando o diário.
+    Subclasses definem `vazio()` e `aplicar(transacao, posicao)`, onde
+    `posicao` é o fim da linha da transação no diário.
+    """
+
+    arquivo = None  # Nome do arquivo dentro do diretório do livro
+    versao = 1  # Mude ao alterar o formato: arquivos de outra versão são reconstruídos
+
+    def __init__(self, diretorio):
+        self.caminho = os.path.join(diretorio, self.arquivo)
+        self.estado = None
+        self._assinatura = None  # (inode, mtime, tamanho) do arquivo lido por último
+
+    def vazio(self):
+        raise NotImplementedError
+
+    def aplicar(self, transacao, posicao):
+        raise NotImplementedError
+
+    def afetada(self, transacao):
+        """
+        A transação muda o estado? As que não mudam não são regravadas a cada
+        operação (ver Livro._gravar_projecoes).
+        """
+        return True
+
+    def zerar(self):
+        """
+        Descarta o estado para recalculá-lo desde o início do diário.
+        """
+        self.estado = self.vazio()
+
+    def descartar(self):
+        """
+        Esquece alterações aplicadas e não gravadas: o próximo carregar()
+        relê o arquivo.
+        """
+        self.estado = self.vazio()
+        self._assinatura = None
+
+    def retomar(self, posicao, diario):
+        """
+        Chamado antes de reaplicar o diário a partir de `posicao`. Projeções
+        com pontos de controle podem pular para um ponto mais adiante;
+        retorna a posição de onde a reaplicação deve começar.
+        """
+        return posicao
+
+    def carregar(self, tamanho_diario):
+        """
+        Lê o arquivo (só se ele mudou desde a última leitura) e retorna a
+        posição do diário que ele reflete.
+        """
+        try:
+            info = os.stat(self.caminho)
+            assinatura = (info.st_ino, info.st_mtime_ns, info.st_size)
+        except FileNotFoundError:
+            assinatura = None
+        if assinatura is None:
+            self.estado = self.vazio()
+        elif assinatura != self._assinatura:
+            try:
+                self.estado = ler_json(self.caminho, self.vazio())
+            except ValueError:
+                self.estado = None
+            if not isinstance(self.estado, dict):
+                # Vazio ou pela metade (queda antes de chegar ao disco): como um arquivo
+                # ausente, é recalculado a partir do diário
+                self.estado = self.vazio()
+            elif self.estado.get("versao", 1) != self.versao:
+                self.zerar()  # Formato antigo: recalcula a partir do diário
+        self._assinatura = assinatura
+        return self.estado.get("posicao", 0)
+
+    def gravar(self, posicao):
+        self.estado["posicao"] = posicao
+        self.estado["versao"] = self.versao
+        gravar_json_atomico(self.caminho, self.estado)
+        info = os.stat(self.caminho)
+        self._assinatura = (info.st_ino, info.st_mtime_ns, info.st_size)
+
+
+class PontosDeControle:
+    """
+    saldo.pontos: pares (posição no diário, saldo em centavos) em inteiros
+    de 8 bytes, acrescentados a cada INTERVALO_PONTOS bytes do diário.
+
+    Se saldo.json se perder, o saldo é retomado do último ponto e só o
+    final do diário é reaplicado; verificar() usa os pontos para conferir
+    o saldo ao longo do histórico ou apenas a partir do último ponto.
+    """
+
+    LARGURA = 16  # Bytes por ponto
+
+    def __init__(self, diretorio):
+        self.caminho = os.path.join(diretorio, PONTOS_FILE)
+        self._ultimo = None  # Último ponto conhecido (cache; pode estar atrasado)
+
+    def quantidade(self):
+        try:
+            return os.path.getsize(self.caminho) // self.LARGURA
+        except FileNotFoundError:
+            return 0
+
+    def _ler(self, file, indice):
+        file.seek(indice * self.LARGURA)
+        dados = file.read(self.LARGURA)
+        return int.from_bytes(dados[:8], "little", signed=True), int.from_bytes(dados[8:], "little", signed=True)
+
+    def _contar_ate(self, file, quantidade, limite):
+        # Busca binária: quantos pontos têm posição <= limite (as posições são crescentes)
+        inicio, fim = 0, quantidade
+        while inicio < fim:
+            meio = (inicio + fim) // 2
+            if self._ler(file, meio)[0] <= limite:
+                inicio = meio + 1
+            else:
+                fim = meio
+        return inicio
+
+    def ultimo(self, limite=None):
+        """
+        Último ponto (posição, saldo) com posição <= `limite`, ou None.
+        """
+        quantidade = self.quantidade()
+        if quantidade == 0:
+            return None
+        with open(self.caminho, "rb") as file:
+            indice = quantidade if limite is None else self._contar_ate(file, quantidade, limite)
+            return self._ler(file, indice - 1) if indice else None
+
+    def ultima_posicao(self):
+        if self._ultimo is None:
+            self._ultimo = self.ultimo() or (0, 0)
+        return self._ultimo[0]
+
+    def anexar(self, pontos):
+        """
+        Acrescenta pontos novos, ignorando os que ficariam a menos de
+        INTERVALO_PONTOS do último já gravado (por este ou outro processo).
+        Deve ser chamado com a trava do livro adquirida.
+        """
+        self._ultimo = None
+        ultimo = (self.ultimo() or (0, 0))[0]
+        dados = bytearray()
+        for posicao, saldo in pontos:
+            if posicao - ultimo >= INTERVALO_PONTOS:
+                dados += posicao.to_bytes(8, "little", signed=True) + saldo.to_bytes(8, "little", signed=True)
+                ultimo = posicao
+        if dados:
+            with open(self.caminho, "ab") as file:
+                sobra = file.tell() % self.LARGURA
+                if sobra:
+                    file.truncate(file.tell() - sobra)  # Ponto escrito pela metade
+                file.write(dados)
+
+    def descartar_depois(self, tamanho_diario):
+        """
+        Remove os pontos além do fim do diário (que encolheu). Deve ser
+        chamado com a trava do livro adquirida.
+        """
+        quantidade = self.quantidade()
+        if quantidade == 0:
+            return
+        with open(self.caminho, "r+b") as file:
+            manter = self._contar_ate(file, quantidade, tamanho_diario)
+            if manter < quantidade:
+                file.truncate(manter * self.LARGURA)
+                self._ultimo = None
+
+    def remover(self):
+        if os.path.exists(self.caminho):
+            os.remove(self.caminho)
+        self._ultimo = None
+
+    def __iter__(self):
+        """
+        Percorre os pontos em ordem, lendo o arquivo em blocos.
+        """
+        if not os.path.exists(self.caminho):
+            return
+        with open(self.caminho, "rb") as file:
+            while True:
+                bloco = file.read(4096 * self.LARGURA)
+                bloco = bloco[:len(bloco) - len(bloco) % self.LARGURA]
+                if not bloco:
+                    return
+                numeros = array("q")
+                numeros.frombytes(bloco)
+                for i in range(0, len(numeros), 2):
+                    yield numeros[i], numeros[i + 1]
+
+
+class ProjecaoSaldo(Projecao):
+    """
+    saldo.json: {"saldo_centavos": ..., "posicao": ...}, com pontos de
+    controle periódicos em saldo.pontos (ver PontosDeControle).
+    """
+
+    arquivo = SALDO_FILE
+
+    def __init__(self, diretorio):
+        super().__init__(diretorio)
+        self.pontos = PontosDeControle(diretorio)
+        self._novos_pontos = []  # Pontos aplicados e ainda não gravados
+
+    def vazio(self):
+        return {"saldo_centavos": 0, "posicao": 0}
+
+    def carregar(self, tamanho_diario):
+        posicao = super().carregar(tamanho_diario)
+        if "saldo_centavos" not in self.estado:
+            # saldo.json antigo, com o saldo em float: converte para centavos
+            self.estado["saldo_centavos"] = para_centavos(self.estado.pop("saldo", 0.0))
+            if "posicao" not in self.estado:
+                # Sem posição: assume que ele já cobre o diário atual
+                posicao = tamanho_diario
+            self.gravar(posicao)
+        return posicao
+
+    def zerar(self):
+        super().zerar()
+        self._novos_pontos = []
+
+    def descartar(self):
+        super().descartar()
+        self._novos_pontos = []
+
+    def retomar(self, posicao, diario):
+        self.pontos.descartar_depois(diario.tamanho())
+        ponto = self.pontos.ultimo(diario.tamanho())
+        if ponto is None or ponto[0] <= posicao:
+            return posicao
+        # Só usa o ponto se a transação que termina nele tiver o mesmo saldo
+        # (protege contra um diário trocado por outro do mesmo tamanho)
+        with open(diario.caminho, "rb") as file:
+            file.seek(max(0, ponto[0] - 4096))
+            linhas = file.read(ponto[0] - file.tell()).splitlines()
+        try:
+            transacao = normalizar(json.loads(linhas[-1]))
+        except (IndexError, ValueError):
+            return posicao
+        if transacao.get("saldo_centavos") != ponto[1]:
+            return posicao
+        self.estado["saldo_centavos"] = ponto[1]
+        return ponto[0]
+
+    def aplicar(self, transacao, posicao):
+        if "saldo_centavos" in transacao:
+            self.estado["saldo_centavos"] = transacao["saldo_centavos"]
+        else:
+            self.estado["saldo_centavos"] += SINAIS.get(transacao.get("tipo"), 0) * transacao["centavos"]
+        ultimo = self._novos_pontos[-1][0] if self._novos_pontos else self.pontos.ultima_posicao()
+        if posicao - ultimo >= INTERVALO_PONTOS:
+            self._novos_pontos.append((posicao, self.estado["saldo_centavos"]))
+
+    def gravar(self, posicao):
+        # Os pontos vão antes do saldo.json: se o processo morrer entre os dois,
+        # a reaplicação encontra os mesmos pontos e não os duplica
+        if self._novos_pontos:
+            self.pontos.anexar(self._novos_pontos)
+            self._novos_pontos = []
+        super().gravar(posicao)
+
+
+class IndiceSaques(Projecao):
+    """
+    Índice de saques por dia: {"dias": {"dd/mm/aaaa": {"quantidade": n, "centavos": total}}}.
+    Permite verificar os limites diários em O(1), sem percorrer o diário.
+    """
+
+    arquivo = "saques_por_dia.json"
+    versao = 2  # Versão 1 guardava o total em float ("valor")
+
+    def vazio(self):
+        return {"dias": {}, "posicao": 0}
+
+    def aplicar(self, transacao, posicao):
+        if transacao.get("tipo") != "SAQUE":
+            return
+        dia = self.estado["dias"].setdefault(transacao["data"], {"quantidade": 0, "centavos": 0})
+        dia["quantidade"] += 1
+        dia["centavos"] += transacao["centavos"]
+
+    def afetada(self, transacao):
+        return transacao.get("tipo") == "SAQUE"
+
+    def gravar(self, posicao):
+        # Só os limites de hoje são consultados: os dias anteriores saem do arquivo,
+        # que assim não cresce com o histórico
+        hoje = agora().strftime("%d/%m/%Y")
+        dias = self.estado["dias"]
+        if len(dias) > 1 or (dias and hoje not in dias):
+            self.estado["dias"] = {hoje: dias[hoje]} if hoje in dias else {}
+        super().gravar(posicao)
+
+
+class ResumoMensal(Projecao):
+    """
+    Totais por mês: {"meses": {"aaaa-mm": {"depositos": centavos, "quantidade_depositos": n,
+    "saques": centavos, "quantidade_saques": n, "saldo_final": centavos}}, "saldo_centavos": ...}.
+    Atualizado a cada operação, então o resumo da conta custa O(meses), sem percorrer o diário.
+    """
+
+    arquivo = "resumo_mensal.json"
+
+    def vazio(self):
+        return {"meses": {}, "saldo_centavos": 0, "posicao": 0}
+
+    def aplicar(self, transacao, posicao):
+        tipo, data = transacao.get("tipo"), transacao["data"]
+        mes = self.estado["meses"].setdefault(f"{data[6:10]}-{data[3:5]}", {
+            "depositos": 0, "quantidade_depositos": 0, "saques": 0, "quantidade_saques": 0, "saldo_final": 0})
+        if tipo == "DEPOSITO":
+            mes["depositos"] += transacao["centavos"]
+            mes["quantidade_depositos"] += 1
+        elif tipo == "SAQUE":
+            mes["saques"] += transacao["centavos"]
+            mes["quantidade_saques"] += 1
+        # Transações antigas podem não ter o saldo encadeado: soma a partir do anterior
+        saldo = self.estado["saldo_centavos"] + SINAIS.get(tipo, 0) * transacao["centavos"]
+        self.estado["saldo_centavos"] = mes["saldo_final"] = transacao.get("saldo_centavos", saldo)
+
+
+class IndiceLinhas(Projecao):
+    """
+    Índice binário com a posição final de cada linha do diário (inteiros de
+    8 bytes). Permite ler qualquer página do extrato com um seek, sem
+    percorrer as transações anteriores, e contar transações em O(1).
+    """
+
+    arquivo = "transacoes.idx"
+    LARGURA = 8  # Bytes por entrada
+
+    def vazio(self):
+        return array("q")  # Posições ainda não gravadas no arquivo
+
+    def carregar(self, tamanho_diario):
+        self.estado = self.vazio()
+        try:
+            tamanho = os.path.getsize(self.caminho)
+        except FileNotFoundError:
+            return 0
+        tamanho -= tamanho % self.LARGURA  # Ignora uma entrada escrita pela metade
+        if tamanho == 0:
+            return 0
+        with open(self.caminho, "rb") as file:
+            file.seek(tamanho - self.LARGURA)
+            return int.from_bytes(file.read(self.LARGURA), "little", signed=True)
+
+    def zerar(self):
+        self.estado = self.vazio()
+        if os.path.exists(self.caminho):
+            os.remove(self.caminho)
+
+    def aplicar(self, transacao, posicao):
+        self.estado.append(posicao)
+
+    def gravar(self, posicao):
+        # Append-only: só as posições novas são escritas
+        if self.estado:
+            with open(self.caminho, "ab") as file:
+                sobra = file.tell() % self.LARGURA
+                if sobra:
+                    # Descarta uma entrada escrita pela metade antes de continuar
+                    file.truncate(file.tell() - sobra)
+                file.write(self.estado.tobytes())
+            self.estado = self.vazio()
+
+    def quantidade(self):
+        try:
+            return os.path.getsize(self.caminho) // self.LARGURA
+        except FileNotFoundError:
+            return 0
+
+    def intervalo(self, inicio, fim):
+        """
+        Retorna (posição inicial, posição final) no diário das transações
+        de número `inicio` até `fim` - 1.
+        """
+        with open(self.caminho, "rb") as file:
+            if inicio == 0:
+                file.seek(0)
+                posicoes = array("q", [0])
+            else:
+                file.seek((inicio - 1) * self.LARGURA)
+                posicoes = array("q")
+            posicoes.frombytes(file.read((fim - inicio + (inicio > 0)) * self.LARGURA))
+        return posicoes[0], posicoes[-1]
+
+
+class IndiceTempo(IndiceLinhas):
+    """
+    Índice de tempo: para cada transação do diário, em ordem, dois inteiros
+    de 8 bytes: (carimbo * 4 + código do tipo, posição final da linha).
+
+    O carimbo guardado nunca diminui (se o relógio voltar, repete o anterior),
+    então o arquivo está ordenado e um período vira uma busca binária mais
+    uma leitura sequencial. O código do tipo permite filtrar depósitos e
+    saques sem ler o diário.
+    """
+
+    arquivo = "transacoes.tempo"
+    LARGURA = 16
+    CODIGOS = {"DEPOSITO": 1, "SAQUE": 2}
+
+    def __init__(self, diretorio):
+        super().__init__(diretorio)
+        self._ultimo_ts = 0  # Carimbo da última entrada (para manter o arquivo ordenado)
+
+    def carregar(self, tamanho_diario):
+        self.estado = self.vazio()
+        try:
+            tamanho = os.path.getsize(self.caminho)
+        except FileNotFoundError:
+            self._ultimo_ts = 0
+            return 0
+        tamanho -= tamanho % self.LARGURA  # Ignora uma entrada escrita pela metade
+        if tamanho == 0:
+            self._ultimo_ts = 0
+            return 0
+        with open(self.caminho, "rb") as file:
+            file.seek(tamanho - self.LARGURA)
+            entrada = array("q")
+            entrada.frombytes(file.read(self.LARGURA))
+        self._ultimo_ts = entrada[0] >> 2
+        return entrada[1]
+
+    def zerar(self):
+        super().zerar()
+        self._ultimo_ts = 0
+
+    def aplicar(self, transacao, posicao):
+        self._ultimo_ts = max(self._ultimo_ts, transacao["ts"])
+        self.estado.extend((self._ultimo_ts * 4 + self.CODIGOS.get(transacao.get("tipo"), 0), posicao))
+
+    def entradas(self, inicio, fim):
+        """
+        Lê as entradas das transações `inicio` até `fim` - 1 (array com os
+        pares achatados: chave, posição, chave, posição...).
+        """
+        entradas = array("q")
+        with open(self.caminho, "rb") as file:
+            file.seek(inicio * self.LARGURA)
+            entradas.frombytes(file.read((fim - inicio) * self.LARGURA))
+        return entradas
+
+    def buscar(self, ts, quantidade):
+        """
+        Número da primeira transação com carimbo >= `ts` (busca binária no arquivo).
+        """
+        inicio, fim = 0, quantidade
+        with open(self.caminho, "rb") as file:
+            while inicio < fim:
+                meio = (inicio + fim) // 2
+                file.seek(meio * self.LARGURA)
+                if int.from_bytes(file.read(8), "little", signed=True) >> 2 < ts:
+                    inicio = meio + 1
+                else:
+                    fim = meio
+        return inicio
+
+
+class ColunaValores(IndiceLinhas):
+    """
+    Coluna binária com o valor de cada transação do diário, em ordem:
+    inteiros de 8 bytes com sinal, em centavos (saques negativos). Junto com
+    o índice de tempo (carimbo e tipo) forma o histórico em colunas usado
+    nas agregações (ver colunas.py), sem ler nem decodificar o diário.
+
+    As entradas não guardam a posição no diário: a posição coberta pela
+    coluna é a da última transação dela no índice de linhas, que é gravado
+    antes (ver Livro.projecoes).
+    """
+
+    arquivo = "transacoes.valores"
+
+    def __init__(self, diretorio, linhas):
+        super().__init__(diretorio)
+        self.linhas = linhas
+
+    def carregar(self, tamanho_diario):
+        self.estado = self.vazio()
+        try:
+            quantidade = os.path.getsize(self.caminho) // self.LARGURA  # Ignora uma entrada escrita pela metade
+        except FileNotFoundError:
+            return 0
+        if quantidade == 0:
+            return 0
+        if self.linhas.quantidade() < quantidade:
+            # Índice de linhas mais curto que a coluna (apagado ou reconstruído): recalcula do zero
+            self.zerar()
+            return 0
+        return self.linhas.intervalo(quantidade - 1, quantidade)[1]
+
+    def aplicar(self, transacao, posicao):
+        self.estado.append(SINAIS.get(transacao.get("tipo"), 0) * transacao["centavos"])
+
+
+class Selecao:
+    """
+    Transações de um livro que atendem a um filtro (período e/ou tipo),
+    com acesso por página como o extrato completo. Um período é um
+    intervalo contínuo de transações; com filtro de tipo, a seleção guarda
+    os números das transações escolhidas (8 bytes cada).
+    """
+
+    def __init__(self, livro, inicio, fim, numeros=None):
+        self.livro = livro
+        self.inicio = inicio
+        self.fim = fim
+        self.numeros = numeros
+
+    def quantidade(self):
+        return self.fim - self.inicio if self.numeros is None else len(self.numeros)
+
+    def pagina(self, inicio, quantidade):
+        if self.numeros is None:
+            quantidade = min(quantidade, self.fim - self.inicio - inicio)
+            return self.livro.pagina(self.inicio + inicio, quantidade) if quantidade > 0 and inicio >= 0 else []
+        return self.livro.ler_numeros(self.numeros[max(0, inicio):inicio + quantidade])
+
+    def __iter__(self):
+        inicio = 0
+        while True:
+            bloco = self.pagina(inicio, 1000)
+            if not bloco:
+                return
+            yield from bloco
+            inicio += len(bloco)
+
+
+class Livro:
+    """
+    Livro-caixa transacional: diário de transações + projeções em um diretório.
+
+    O diário é a fonte da verdade. Cada operação, com a trava entre processos
+    adquirida, acrescenta uma única linha (com o saldo resultante) ao diário e
+    só então atualiza as projeções (saldo.json, índice de saques) de forma
+    atômica. Cada projeção guarda a posição do diário que ela reflete; se um
+    processo morrer no meio do caminho, o próximo que pegar a trava percebe a
+    diferença e reaplica o final do diário.
+    """
+
+    def __init__(self, diretorio=".", sincronizar_a_cada=FSYNC_A_CADA):
+        self.diretorio = diretorio
+        self.trava_file = os.path.join(diretorio, TRAVA_FILE)
+        migrar_transacoes(os.path.join(diretorio, TRANSACOES_FILE), os.path.join(diretorio, DIARIO_FILE))
+        self.diario = Diario(os.path.join(diretorio, DIARIO_FILE), sincronizar_a_cada)
+        self.caminho_alteracoes = self.diario.caminho  # Cresce a cada operação gravada
+        self.saldos = ProjecaoSaldo(diretorio)
+        self.saques = IndiceSaques(diretorio)
+        self.resumo = ResumoMensal(diretorio)
+        self.linhas = IndiceLinhas(diretorio)
+        self.tempo = IndiceTempo(diretorio)
+        self.valores = ColunaValores(diretorio, self.linhas)
+        self.projecoes = [self.saldos, self.saques, self.resumo, self.linhas, self.tempo, self.valores]  # linhas antes de valores
+        self._selecao = None  # Última seleção filtrada: (filtro, quantidade de transações, Selecao)
+        self._mutex = threading.RLock()  # Trava entre threads do mesmo processo
+        self._trava = None  # Arquivo da trava entre processos, aberto sob demanda
+        self._profundidade = 0  # Permite reentrar em _travado() na mesma thread
+        self._dono = None  # Thread que está com a trava (as projeções em memória já estão em dia)
+
+    @contextmanager
+    def _travado(self):
+        """
+        Adquire a trava do livro (threads e processos) durante o bloco `with`.
+        """
+        with self._mutex:
+            if self._profundidade == 0:
+                if self._trava is None:
+                    self._trava = open(self.trava_file, "a+b")
+                if fcntl is not None:
+                    fcntl.flock(self._trava.fileno(), fcntl.LOCK_EX)
+                else:
+                    self._trava.seek(0)
+                    msvcrt.locking(self._trava.fileno(), msvcrt.LK_LOCK, 1)
+                self._dono = threading.get_ident()
+            self._profundidade += 1
+            try:
+                yield
+            finally:
+                self._profundidade -= 1
+                if self._profundidade == 0:
+                    self._dono = None
+                    if fcntl is not None:
+                        fcntl.flock(self._trava.fileno(), fcntl.LOCK_UN)
+                    else:
+                        self._trava.seek(0)
+                        msvcrt.locking(self._trava.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _sincronizar(self):
+        """
+        Garante que todas as projeções refletem o diário inteiro, reaplicando
+        o final do diário quando necessário. Deve ser chamado com a trava adquirida.
+        """
+        self._desfazer_lote_incompleto()
+        tamanho = self.diario.descartar_linha_incompleta()
+        atrasadas = []  # (projeção, posição a partir da qual precisa do diário)
+        for projecao in self.projecoes:
+            posicao = self._posicao(projecao, tamanho)
+            if posicao == tamanho:
+                continue
+            if posicao > tamanho:
+                # O diário encolheu (restaurado de backup?): recalcula do zero
+                projecao.zerar()
+                posicao = 0
+            atrasadas.append((projecao, projecao.retomar(posicao, self.diario)))
+        if not atrasadas:
+            return
+        # Uma única leitura do diário atende todas as projeções atrasadas
+        for fim, transacao in self.diario.ler(min(posicao for _, posicao in atrasadas), tamanho):
+            for projecao, posicao in atrasadas:
+                if fim > posicao:
+                    projecao.aplicar(transacao, fim)
+        if any(projecao is self.saldos for projecao, _ in atrasadas):
+            self.saldos.estado.pop("em_dia", None)  # Todas as projeções passam a cobrir o diário inteiro
+        for projecao, _ in atrasadas:
+            projecao.gravar(tamanho)
+
+    def _posicao(self, projecao, tamanho):
+        """
+        Carrega a projeção e retorna a posição do diário que ela reflete.
+        Uma projeção que as últimas operações não alteraram (e por isso não
+        foi regravada) vale até a posição de saldo.json, que anota em
+        "em_dia" a posição do arquivo dela naquele momento. saldo.json é o
+        primeiro de self.projecoes, então já foi carregado.
+        """
+        posicao = projecao.carregar(tamanho)
+        if projecao is not self.saldos and self.saldos.estado.get("em_dia", {}).get(projecao.arquivo) == posicao:
+            return max(posicao, self.saldos.estado.get("posicao", 0))
+        return posicao
+
+    def _gravar_projecoes(self, posicao, transacoes):
+        """
+        Grava as projeções depois de uma confirmação. As que nenhuma das
+        `transacoes` alterou (o índice de saques, em um depósito) não são
+        reescritas: saldo.json, sempre gravado, registra que elas continuam
+        valendo (ver _posicao).
+        """
+        em_dia = {}
+        for projecao in self.projecoes:
+            if projecao is not self.saldos and not any(projecao.afetada(transacao) for transacao in transacoes):
+                em_dia[projecao.arquivo] = projecao.estado["posicao"]
+        if em_dia:
+            self.saldos.estado["em_dia"] = em_dia
+        else:
+            self.saldos.estado.pop("em_dia", None)
+        for projecao in self.projecoes:
+            if projecao.arquivo not in em_dia:
+                projecao.gravar(posicao)
+
+    def _desfazer_lote_incompleto(self):
+        """
+        Se um lote começou a ser gravado e não foi confirmado (o processo
+        morreu no meio), corta o diário de volta ao tamanho de antes do lote.
+        """
+        caminho = os.path.join(self.diretorio, LOTE_FILE)
+        pendente = ler_json(caminho, None)
+        if pendente is None:
+            return
+        if self.diario.tamanho() > pendente["tamanho"]:
+            with open(self.diario.caminho, "r+b") as file:
+                file.truncate(pendente["tamanho"])
+        os.remove(caminho)
+
+    def reconstruir_indices(self):
+        """
+        Apaga todas as projeções e as recalcula a partir do diário.
+        """
+        with self._travado():
+            for projecao in self.projecoes:
+                if projecao is not self.saldos and os.path.exists(projecao.caminho):
+                    os.remove(projecao.caminho)
+            # O saldo é recalculado do zero; não pode ser confundido com um saldo.json antigo
+            self.saldos.pontos.remover()
+            self.saldos.zerar()
+            self.saldos.gravar(0)
+            self._sincronizar()
+
+    def _atualizado(self):
+        """
+        Verificação rápida, sem trava: as projeções já cobrem o diário inteiro?
+        Com a trava adquirida por esta thread (dentro de um validar), o estado
+        em memória já está em dia, inclusive com o lote em andamento.
+        """
+        if self._dono == threading.get_ident():
+            return True
+        tamanho = self.diario.tamanho()
+        return all(self._posicao(projecao, tamanho) == tamanho for projecao in self.projecoes)
+
+    def saldo(self):
+        """
+        Retorna o saldo atual, em centavos.
+        """
+        with self._mutex:  # Outra thread pode estar no meio de uma gravação
+            if not self._atualizado():
+                with self._travado():
+                    self._sincronizar()
+            return self.saldos.estado["saldo_centavos"]
+
+    def saques_do_dia(self, data):
+        """
+        Retorna (quantidade, total em centavos) dos saques feitos na data "dd/mm/aaaa".
+        """
+        with self._mutex:
+            if not self._atualizado():
+                with self._travado():
+                    self._sincronizar()
+            dia = self.saques.estado["dias"].get(data, {})
+            return dia.get("quantidade", 0), dia.get("centavos", 0)
+
+    def resumo_mensal(self):
+        """
+        Retorna os totais de cada mês com transações, em ordem: lista de
+        dicionários com "mes" ("aaaa-mm"), "depositos" e "saques" (centavos),
+        "quantidade_depositos", "quantidade_saques" e "saldo_final".
+        """
+        with self._mutex:
+            if not self._atualizado():
+                with self._travado():
+                    self._sincronizar()
+            return [dict(mes=mes, **totais) for mes, totais in sorted(self.resumo.estado["meses"].items())]
+
+    def contar(self):
+        """
+        Quantidade de transações no diário, em O(1).
+        """
+        with self._mutex:  # Outra thread pode estar no meio de uma gravação
+            if not self._atualizado():
+                with self._travado():
+                    self._sincronizar()
+            return self.linhas.quantidade()
+
+    def pagina(self, inicio, quantidade):
+        """
+        Retorna a lista de transações de número `inicio` até
+        `inicio + quantidade` - 1, lendo apenas esse trecho do diário.
+        """
+        fim = min(inicio + quantidade, self.contar())
+        if inicio >= fim:
+            return []
+        de, ate = self.linhas.intervalo(inicio, fim)
+        with open(self.diario.caminho, "rb") as file:
+            file.seek(de)
+            bloco = file.read(ate - de)
+        return [normalizar(_decodificar(linha.decode("utf-8"))) for linha in bloco.splitlines() if linha.strip()]
+
+    def colunas(self):
+        """
+        Retorna o histórico em colunas, uma entrada por transação em ordem:
+        (chaves, valores), dois array("q") lidos direto dos arquivos
+        binários. `chaves` é carimbo * 4 + código do tipo (ver IndiceTempo,
+        em ordem crescente) e `valores` o valor em centavos com sinal.
+        """
+        with self._travado():  # Outro processo não acrescenta entradas entre a contagem e a leitura
+            self._sincronizar()  # Como nas gravações: contar() confiaria no estado em memória
+            quantidade = self.linhas.quantidade()
+            entradas, valores = array("q"), array("q")
+            if quantidade:
+                with open(self.tempo.caminho, "rb") as file:
+                    entradas.fromfile(file, 2 * quantidade)
+                with open(self.valores.caminho, "rb") as file:
+                    valores.fromfile(file, quantidade)
+        return entradas[::2], valores
+
+    def ler_numeros(self, numeros):
+        """
+        Lê as transações com os números pedidos (em ordem crescente),
+        juntando números consecutivos em uma única leitura.
+        """
+        transacoes = []
+        with open(self.diario.caminho, "rb") as file:
+            i = 0
+            while i < len(numeros):
+                j = i + 1
+                while j < len(numeros) and numeros[j] == numeros[j - 1] + 1:
+                    j += 1
+                de, ate = self.linhas.intervalo(numeros[i], numeros[j - 1] + 1)
+                file.seek(de)
+                bloco = file.read(ate - de)
+                transacoes += [normalizar(_decodificar(linha.decode("utf-8"))) for linha in bloco.splitlines()
+                               if linha.strip()]
+                i = j
+        return transacoes
+
+    def selecionar(self, de=None, ate=None, tipo=None):
+        """
+        Retorna uma Selecao com as transações entre as datas `de` e `ate`
+        ("dd/mm/aaaa", inclusivas) e do `tipo` pedido ("DEPOSITO"/"SAQUE").
+        O período é localizado por busca binária no índice de tempo.
+        """
+        total = self.contar()
+        filtro = (de, ate, tipo)
+        anterior = self._selecao  # Lida uma vez: outra thread pode trocá-la ao mesmo tempo
+        if anterior is not None and anterior[:2] == (filtro, total):
+            return anterior[2]
+        inicio = self.tempo.buscar(carimbo(de), total) if de else 0
+        fim = self.tempo.buscar(carimbo(ate, "23:59:59") + 1, total) if ate else total
+        numeros = None
+        if tipo is not None and inicio < fim:
+            codigo = IndiceTempo.CODIGOS[tipo]
+            numeros = array("q")
+            for bloco in range(inicio, fim, 65536):
+                entradas = self.tempo.entradas(bloco, min(bloco + 65536, fim))
+                numeros.extend(bloco + i for i, chave in enumerate(entradas[::2]) if chave & 3 == codigo)
+        elif tipo is not None:
+            numeros = array("q")
+        selecao = Selecao(self, inicio, max(inicio, fim), numeros)
+        self._selecao = (filtro, total, selecao)
+        return selecao
+
+    def registrar(self, tipo, centavos, validar=None):
+        """
+        Registra uma transação de `centavos` de forma atômica e retorna o
+        registro gravado.
+
+        `validar(saldo_atual, livro)` é chamado com a trava adquirida e pode
+        levantar OperacaoRecusada para impedir a operação.
+        """
+        with self._travado():
+            self._sincronizar()
+            saldo_atual = self.saldos.estado["saldo_centavos"]
+            if validar is not None:
+                validar(saldo_atual, self)
+            transacao = self._montar(tipo, centavos, saldo_atual, agora())
+            posicao = self.diario.anexar(transacao)  # Ponto de confirmação
+            for projecao in self.projecoes:
+                projecao.aplicar(transacao, posicao)
+            self._gravar_projecoes(posicao, [transacao])
+            return transacao
+
+    @staticmethod
+    def _montar(tipo, centavos, saldo_atual, agora):
+        return {
+            "centavos": centavos,
+            "data": agora.strftime("%d/%m/%Y"),
+            "hora": agora.strftime("%H:%M:%S"),
+            "ts": int(agora.strftime("%Y%m%d%H%M%S")),
+            "tipo": tipo,
+            "saldo_centavos": saldo_atual + SINAIS[tipo] * centavos,
+        }
+
+    def registrar_lote(self, operacoes, aceitas=None, atomico=True):
+        """
+        Registra várias operações com uma única confirmação: todas as
+        aceitas são gravadas com uma escrita e um fsync, e um lote
+        interrompido no meio é desfeito por inteiro na próxima abertura.
+
+        `operacoes` são tuplas (chave, tipo, centavos, validar). Cada uma é
+        validada em ordem, vendo o saldo e os saques das anteriores do mesmo
+        lote. Retorna a lista de recusas: (chave, mensagem). Com `aceitas`
+        (um dicionário), guarda nele a transação gravada de cada operação
+        aceita: chave -> transação.
+
+        Com `atomico=False` o lote não é tudo-ou-nada: as operações são
+        independentes (confirmação em grupo, ver ConfirmacaoEmGrupo) e uma
+        escrita interrompida perde só as linhas incompletas do final, como
+        em registrar(). Isso dispensa o marcador .lote e seus fsyncs.
+        """
+        recusas, gravadas = [], []
+        with self._travado():
+            self._sincronizar()
+            inicio = posicao = self.diario.tamanho()
+            modelo = self._montar("DEPOSITO", 0, 0, agora())  # Data e hora iguais para todo o lote
+            # As linhas do lote só diferem em valor, tipo e saldo: monta o texto sem passar pelo json
+            molde = (f'{{"centavos": %d, "data": "{modelo["data"]}", "hora": "{modelo["hora"]}", '
+                     f'"ts": {modelo["ts"]}, "tipo": "%s", "saldo_centavos": %d}}\n')
+            linhas = []
+            try:
+                for chave, tipo, centavos, validar in operacoes:
+                    saldo_atual = self.saldos.estado["saldo_centavos"]
+                    if validar is not None:
+                        try:
+                            validar(saldo_atual, self)
+                        except OperacaoRecusada as erro:
+                            recusas.append((chave, str(erro)))
+                            continue
+                    transacao = dict(modelo, centavos=centavos, tipo=tipo,
+                                     saldo_centavos=saldo_atual + SINAIS[tipo] * centavos)
+                    linha = (molde % (centavos, tipo, transacao["saldo_centavos"])).encode("ascii")
+                    posicao += len(linha)
+                    linhas.append(linha)
+                    gravadas.append((chave, transacao))
+                    # Aplica só em memória: as próximas validações já enxergam esta operação
+                    for projecao in self.projecoes:
+                        projecao.aplicar(transacao, posicao)
+                if not linhas:
+                    return recusas
+                if atomico:
+                    caminho_lote = os.path.join(self.diretorio, LOTE_FILE)
+                    gravar_json_atomico(caminho_lote, {"tamanho": inicio}, sincronizar=True)
+                    sincronizar_pasta(self.diretorio)
+                self.diario.anexar_bloco(b"".join(linhas))
+                if atomico:
+                    os.remove(caminho_lote)  # Ponto de confirmação do lote
+                    sincronizar_pasta(self.diretorio)
+            except BaseException:
+                for projecao in self.projecoes:
+                    projecao.descartar()
+                raise
+            self._gravar_projecoes(posicao, [transacao for _, transacao in gravadas])
+        if aceitas is not None:
+            aceitas.update(gravadas)
+        return recusas
+
+    def verificar(self, desde_ultimo_ponto=False):
+        """
+        Recalcula o saldo somando o diário em uma única passada, com memória
+        constante, e confere o resultado com o saldo encadeado de cada
+        transação, com os pontos de controle e com saldo.json.
+
+        Com `desde_ultimo_ponto=True` a soma parte do último ponto de
+        controle (auditoria rápida, que só relê o final do diário).
+        Retorna um relatório (dicionário); "ok" indica se tudo confere.
+        """
+        # Só o tamanho e o saldo são lidos com a trava; o diário até esse tamanho não muda mais
+        with self._travado():
+            self._sincronizar()
+            tamanho = self.diario.tamanho()
+            saldo_registrado = self.saldos.estado["saldo_centavos"]
+        inicio, total = 0, 0
+        if desde_ultimo_ponto:
+            inicio, total = self.saldos.pontos.ultimo(tamanho) or (0, 0)
+        pontos = (ponto for ponto in self.saldos.pontos if inicio < ponto[0] <= tamanho)
+        proximo = next(pontos, None)
+        relatorio = {"inicio": inicio, "fim": tamanho, "transacoes": 0, "pontos_conferidos": 0, "divergencias": []}
+        quantidade_divergencias = 0
+
+        def divergencia(posicao, mensagem):
+            nonlocal quantidade_divergencias
+            quantidade_divergencias += 1
+            if len(relatorio["divergencias"]) < MAX_DIVERGENCIAS:
+                relatorio["divergencias"].append({"posicao": posicao, "mensagem": mensagem})
+
+        for fim, transacao in self.diario.ler(inicio, tamanho):
+            total += SINAIS.get(transacao.get("tipo"), 0) * transacao["centavos"]
+            relatorio["transacoes"] += 1
+            if "saldo_centavos" in transacao and transacao["saldo_centavos"] != total:
+                divergencia(fim, f"saldo gravado {transacao['saldo_centavos']}, soma do diário {total}")
+                total = transacao["saldo_centavos"]  # Continua a partir do saldo gravado
+            while proximo is not None and proximo[0] <= fim:
+                if proximo[0] < fim:
+                    divergencia(proximo[0], "ponto de controle fora do fim de uma linha")
+                elif proximo[1] != total:
+                    divergencia(fim, f"ponto de controle com saldo {proximo[1]}, soma do diário {total}")
+                relatorio["pontos_conferidos"] += 1
+                proximo = next(pontos, None)
+        if total != saldo_registrado:
+            divergencia(tamanho, f"{SALDO_FILE} com saldo {saldo_registrado}, soma do diário {total}")
+        relatorio.update(saldo_calculado=total, saldo_registrado=saldo_registrado,
+                         quantidade_divergencias=quantidade_divergencias, ok=quantidade_divergencias == 0)
+        return relatorio
+
+    def __iter__(self):
+        """
+        Percorre as transações do livro, em ordem, sem carregá-las todas.
+        """
+        return iter(self.diario)
+
+    def fechar(self):
+        """
+        Fecha o diário e a trava. Espera a gravação de outra thread terminar;
+        o livro continua utilizável depois (os arquivos reabrem sob demanda).
+        """
+        with self._mutex:
+            self.diario.fechar()
+            if self._trava is not None:
+                self._trava.close()
+                self._trava = None
+
+
+if __name__ == "__main__":
+    import sys
+
+    if sys.argv[1:2] == ["reconstruir"]:
+        # python armazenamento.py reconstruir <pasta da conta> -> recalcula saldo e índices a partir do diário
+        # (para as contas de um banco, pelo nome: python banco.py reconstruir [conta ...])
+        if len(sys.argv) != 3 or not os.path.exists(os.path.join(sys.argv[2], DIARIO_FILE)):
+            sys.exit(f"Uso: python armazenamento.py reconstruir <pasta da conta, com {DIARIO_FILE}>")
+        livro = Livro(sys.argv[2])
+        livro.reconstruir_indices()
+        livro.fechar()
+        print("Saldo e índices reconstruídos a partir do diário")
+    elif sys.argv[1:2] == ["verificar"]:
+        # python armazenamento.py verificar [--rapido] [diretório] -> confere o saldo com o diário
+        argumentos = [argumento for argumento in sys.argv[2:] if argumento != "--rapido"]
+        livro = Livro(argumentos[0] if argumentos else ".")
+        relatorio = livro.verificar(desde_ultimo_ponto="--rapido" in sys.argv)
+        livro.fechar()
+        print(json.dumps(relatorio, indent=4, ensure_ascii=False))
+        sys.exit(0 if relatorio["ok"] else 1)
+    else:
+        # Permite rodar a migração manualmente: python armazenamento.py
+        print(f"{migrar_transacoes()} transações migradas para {DIARIO_FILE}")
@@ -0,0 +1,434 @@
+import os  # Para manipular arquivos e pastas
+import sqlite3  # Motor SQLite (biblioteca padrão)
+import threading  # Uma conexão compartilhada entre threads, protegida por trava
+from array import array  # Colunas de inteiros para as agregações (ver colunas.py)
+from datetime import datetime  # Data e hora de cada transação
+from urllib.parse import unquote  # Nome da conta a partir do nome da pasta
+
+from armazenamento import (DIARIO_FILE, FSYNC_A_CADA, MAX_DIVERGENCIAS, SINAIS, IndiceTempo, Livro, OperacaoRecusada,
+                           data_valida)
+
+# Nome do banco SQLite dentro do diretório do banco
+SQLITE_FILE = "contas.db"
+
+# Versão do esquema, guardada em PRAGMA user_version
+VERSAO_ESQUEMA = 3
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS transacoes (
+    id INTEGER PRIMARY KEY,
+    conta TEXT NOT NULL,
+    seq INTEGER NOT NULL,   -- posição da transação no extrato da conta (0, 1, 2...)
+    tipo TEXT NOT NULL,
+    centavos INTEGER NOT NULL,
+    data TEXT NOT NULL,     -- dd/mm/aaaa, como no diário JSON
+    hora TEXT NOT NULL,
+    dia TEXT NOT NULL,      -- aaaa-mm-dd, ordenável, usado nas consultas por data
+    saldo_centavos INTEGER NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS transacoes_conta_seq ON transacoes (conta, seq);
+CREATE INDEX IF NOT EXISTS transacoes_conta_dia_tipo ON transacoes (conta, dia, tipo);
+-- Saldo materializado: atualizado na mesma transação de cada inserção
+CREATE TABLE IF NOT EXISTS saldos (
+    conta TEXT PRIMARY KEY,
+    saldo_centavos INTEGER NOT NULL,
+    quantidade INTEGER NOT NULL
+);
+-- Totais por mês (aaaa-mm), atualizados junto com cada inserção (ver armazenamento.ResumoMensal)
+CREATE TABLE IF NOT EXISTS meses (
+    conta TEXT NOT NULL,
+    mes TEXT NOT NULL,
+    depositos INTEGER NOT NULL,
+    quantidade_depositos INTEGER NOT NULL,
+    saques INTEGER NOT NULL,
+    quantidade_saques INTEGER NOT NULL,
+    saldo_final INTEGER NOT NULL,
+    PRIMARY KEY (conta, mes)
+);
+"""
+
+# Versão 1 -> 2: valores em reais (REAL) passam a ser centavos (INTEGER)
+MIGRACAO_CENTAVOS = """
+ALTER TABLE transacoes RENAME TO transacoes_v1;
+ALTER TABLE saldos RENAME TO saldos_v1;
+DROP INDEX IF EXISTS transacoes_conta_seq;
+DROP INDEX IF EXISTS transacoes_conta_dia_tipo;
+""" + ESQUEMA + """
+INSERT INTO transacoes (id, conta, seq, tipo, centavos, data, hora, dia, saldo_centavos)
+    SELECT id, conta, seq, tipo, CAST(ROUND(valor * 100) AS INTEGER), data, hora, dia,
+           CAST(ROUND(saldo * 100) AS INTEGER) FROM transacoes_v1;
+INSERT INTO saldos (conta, saldo_centavos, quantidade)
+    SELECT conta, CAST(ROUND(saldo * 100) AS INTEGER), quantidade FROM saldos_v1;
+DROP TABLE transacoes_v1;
+DROP TABLE saldos_v1;
+"""
+
+# Versão 2 -> 3 (e reconstruir_indices): recalcula a tabela de meses a partir das transações.
+# O saldo final de cada mês é o da transação de maior seq do mês.
+PREENCHER_MESES = """
+INSERT OR REPLACE INTO meses (conta, mes, depositos, quantidade_depositos, saques, quantidade_saques, saldo_final)
+    SELECT conta, mes, depositos, quantidade_depositos, saques, quantidade_saques, saldo_final FROM (
+        SELECT conta, substr(dia, 1, 7) AS mes,
+               SUM(CASE tipo WHEN 'DEPOSITO' THEN centavos ELSE 0 END) AS depositos,
+               SUM(tipo = 'DEPOSITO') AS quantidade_depositos,
+               SUM(CASE tipo WHEN 'SAQUE' THEN centavos ELSE 0 END) AS saques,
+               SUM(tipo = 'SAQUE') AS quantidade_saques,
+               saldo_centavos AS saldo_final, MAX(seq)
+        FROM transacoes WHERE {condicao} GROUP BY conta, mes);
+"""
+
+
+# Função para converter "dd/mm/aaaa" em "aaaa-mm-dd"
+def dia_iso(data):
+    if not data_valida(data):  # "1/2/2024" viraria "2024-2-1", que não se compara certo como texto
+        raise ValueError(f"Use datas no formato dd/mm/aaaa: {data!r}")
+    dia, mes, ano = data.split("/")
+    return f"{ano}-{mes}-{dia}"
+
+
+class BaseSQLite:
+    """
+    Conexão com contas.db compartilhada por todas as contas de um Banco.
+    Usa WAL (leitores não bloqueiam o escritor) e BEGIN IMMEDIATE nas
+    escritas, que serve de trava entre processos.
+    """
+
+    def __init__(self, caminho, sincronizar_a_cada=FSYNC_A_CADA):
+        self.caminho = caminho
+        self.conexao = sqlite3.connect(caminho, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        # FULL: cada operação confirmada está em disco; NORMAL troca durabilidade por velocidade
+        self.conexao.execute(f"PRAGMA synchronous={'FULL' if sincronizar_a_cada <= 1 else 'NORMAL'}")
+        self._criar_esquema()
+        self.trava = threading.RLock()
+
+    def _criar_esquema(self):
+        versao = self.conexao.execute("PRAGMA user_version").fetchone()[0]
+        tabelas = self.conexao.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'transacoes'").fetchone()[0]
+        if tabelas and versao < 2:
+            self.conexao.executescript("BEGIN IMMEDIATE;" + MIGRACAO_CENTAVOS + "COMMIT;")
+        else:
+            self.conexao.executescript(ESQUEMA)
+        if tabelas and versao < 3:
+            self.conexao.executescript("BEGIN IMMEDIATE;" + PREENCHER_MESES.format(condicao="1") + "COMMIT;")
+        self.conexao.execute(f"PRAGMA user_version = {VERSAO_ESQUEMA}")
+
+    def fechar(self):
+        with self.trava:
+            self.conexao.close()
+
+
+class LivroSQLite:
+    """
+    Livro de uma conta guardado em contas.db. Oferece os mesmos métodos de
+    armazenamento.Livro (valores em centavos), mas o extrato e o limite
+    diário são consultas indexadas em vez de arquivos de índice.
+    """
+
+    def __init__(self, base, conta):
+        self.base = base
+        self.conta = conta
+        self.caminho_alteracoes = base.caminho + "-wal"  # Em WAL, cada operação gravada altera este arquivo
+
+    def _saldo_e_quantidade(self):
+        linha = self.base.conexao.execute(
+            "SELECT saldo_centavos, quantidade FROM saldos WHERE conta = ?", (self.conta,)).fetchone()
+        return linha or (0, 0)
+
+    def saldo(self):
+        with self.base.trava:
+            return self._saldo_e_quantidade()[0]
+
+    def contar(self):
+        with self.base.trava:
+            return self._saldo_e_quantidade()[1]
+
+    def saques_do_dia(self, data):
+        with self.base.trava:
+            quantidade, centavos = self.base.conexao.execute(
+                "SELECT COUNT(*), COALESCE(SUM(centavos), 0) FROM transacoes "
+                "WHERE conta = ? AND dia = ? AND tipo = 'SAQUE'", (self.conta, dia_iso(data))).fetchone()
+            return quantidade, centavos
+
+    def resumo_mensal(self):
+        """
+        Mesma interface de Livro.resumo_mensal, lida da tabela de meses.
+        """
+        with self.base.trava:
+            linhas = self.base.conexao.execute(
+                "SELECT mes, depositos, quantidade_depositos, saques, quantidade_saques, saldo_final FROM meses "
+                "WHERE conta = ? ORDER BY mes", (self.conta,)).fetchall()
+        return [{"mes": mes, "depositos": d, "quantidade_depositos": qd, "saques": s, "quantidade_saques": qs,
+                 "saldo_final": f} for mes, d, qd, s, qs, f in linhas]
+
+    def registrar(self, tipo, centavos, validar=None):
+        """
+        Registra uma transação e atualiza o saldo materializado em uma única
+        transação SQLite. `validar(saldo_atual, livro)` pode levantar
+        OperacaoRecusada para desistir da operação.
+        """
+        with self.base.trava:
+            conexao = self.base.conexao
+            conexao.execute("BEGIN IMMEDIATE")
+            try:
+                saldo_atual, quantidade = self._saldo_e_quantidade()
+                if validar is not None:
+                    validar(saldo_atual, self)
+                agora = datetime.now()
+                transacao = {
+                    "centavos": centavos,
+                    "data": agora.strftime("%d/%m/%Y"),
+                    "hora": agora.strftime("%H:%M:%S"),
+                    "tipo": tipo,
+                    "saldo_centavos": saldo_atual + SINAIS[tipo] * centavos,
+                }
+                self._inserir(quantidade, transacao)
+                conexao.execute(
+                    "INSERT INTO saldos (conta, saldo_centavos, quantidade) VALUES (?, ?, ?) "
+                    "ON CONFLICT (conta) DO UPDATE SET saldo_centavos = excluded.saldo_centavos, "
+                    "quantidade = excluded.quantidade",
+                    (self.conta, transacao["saldo_centavos"], quantidade + 1))
+                conexao.execute("COMMIT")
+            except BaseException:
+                conexao.execute("ROLLBACK")
+                raise
+            return transacao
+
+    def registrar_lote(self, operacoes, aceitas=None, atomico=True):
+        """
+        Mesma interface de Livro.registrar_lote: todas as operações aceitas
+        entram em uma única transação SQLite (que já é tudo-ou-nada, então
+        `atomico` não muda nada).
+        """
+        recusas, gravadas = [], []
+        with self.base.trava:
+            conexao = self.base.conexao
+            conexao.execute("BEGIN IMMEDIATE")
+            try:
+                saldo, quantidade = self._saldo_e_quantidade()
+                inicial = quantidade
+                agora = datetime.now()
+                data, hora = agora.strftime("%d/%m/%Y"), agora.strftime("%H:%M:%S")
+                for chave, tipo, centavos, validar in operacoes:
+                    if validar is not None:
+                        try:
+                            validar(saldo, self)  # As consultas enxergam as inserções do próprio lote
+                        except OperacaoRecusada as erro:
+                            recusas.append((chave, str(erro)))
+                            continue
+                    saldo += SINAIS[tipo] * centavos
+                    transacao = {"centavos": centavos, "data": data, "hora": hora, "tipo": tipo, "saldo_centavos": saldo}
+                    self._inserir(quantidade, transacao)
+                    gravadas.append((chave, transacao))
+                    quantidade += 1
+                if quantidade > inicial:
+                    conexao.execute(
+                        "INSERT INTO saldos (conta, saldo_centavos, quantidade) VALUES (?, ?, ?) "
+                        "ON CONFLICT (conta) DO UPDATE SET saldo_centavos = excluded.saldo_centavos, "
+                        "quantidade = excluded.quantidade", (self.conta, saldo, quantidade))
+                conexao.execute("COMMIT")
+            except BaseException:
+                conexao.execute("ROLLBACK")
+                raise
+        if aceitas is not None:
+            aceitas.update(gravadas)
+        return recusas
+
+    def _inserir(self, seq, transacao):
+        self.base.conexao.execute(
+            "INSERT INTO transacoes (conta, seq, tipo, centavos, data, hora, dia, saldo_centavos) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (self.conta, seq, transacao["tipo"], transacao["centavos"], transacao["data"], transacao["hora"],
+             dia_iso(transacao["data"]), transacao["saldo_centavos"]))
+        deposito, saque = int(transacao["tipo"] == "DEPOSITO"), int(transacao["tipo"] == "SAQUE")
+        self.base.conexao.execute(
+            "INSERT INTO meses (conta, mes, depositos, quantidade_depositos, saques, quantidade_saques, saldo_final) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (conta, mes) DO UPDATE SET "
+            "depositos = depositos + excluded.depositos, "
+            "quantidade_depositos = quantidade_depositos + excluded.quantidade_depositos, "
+            "saques = saques + excluded.saques, quantidade_saques = quantidade_saques + excluded.quantidade_saques, "
+            "saldo_final = excluded.saldo_final",
+            (self.conta, dia_iso(transacao["data"])[:7], deposito * transacao["centavos"], deposito,
+             saque * transacao["centavos"], saque, transacao["saldo_centavos"]))
+
+    def pagina(self, inicio, quantidade):
+        with self.base.trava:
+            linhas = self.base.conexao.execute(
+                "SELECT centavos, data, hora, tipo, saldo_centavos FROM transacoes WHERE conta = ? AND seq >= ? "
+                "ORDER BY seq LIMIT ?", (self.conta, inicio, quantidade)).fetchall()
+        return [{"centavos": c, "data": d, "hora": h, "tipo": t, "saldo_centavos": s} for c, d, h, t, s in linhas]
+
+    def __iter__(self):
+        """
+        Percorre as transações em blocos, sem carregar o extrato inteiro.
+        """
+        inicio = 0
+        while True:
+            bloco = self.pagina(inicio, 1000)
+            if not bloco:
+                return
+            yield from bloco
+            inicio += len(bloco)
+
+    def colunas(self):
+        """
+        Mesma interface de Livro.colunas. O carimbo é montado a partir de
+        dia e hora e, como no índice de tempo, nunca diminui.
+        """
+        with self.base.trava:
+            cursor = self.base.conexao.execute(
+                "SELECT CAST(replace(dia, '-', '') || replace(hora, ':', '') AS INTEGER), tipo, centavos "
+                "FROM transacoes WHERE conta = ? ORDER BY seq", (self.conta,))
+            chaves, valores, ultimo = array("q"), array("q"), 0
+            for ts, tipo, centavos in cursor:
+                ultimo = max(ultimo, ts)
+                chaves.append(ultimo * 4 + IndiceTempo.CODIGOS.get(tipo, 0))
+                valores.append(SINAIS.get(tipo, 0) * centavos)
+        return chaves, valores
+
+    def selecionar(self, de=None, ate=None, tipo=None):
+        """
+        Mesma interface de Livro.selecionar, usando o índice (conta, dia, tipo).
+        """
+        condicoes, parametros = ["conta = ?"], [self.conta]
+        if de:
+            condicoes.append("dia >= ?")
+            parametros.append(dia_iso(de))
+        if ate:
+            condicoes.append("dia <= ?")
+            parametros.append(dia_iso(ate))
+        if tipo:
+            condicoes.append("tipo = ?")
+            parametros.append(tipo)
+        return SelecaoSQLite(self, " AND ".join(condicoes), parametros)
+
+    def reconstruir_indices(self):
+        """
+        Recalcula o saldo materializado e os totais por mês a partir das
+        transações da conta.
+        """
+        with self.base.trava:
+            conexao = self.base.conexao
+            conexao.execute("BEGIN IMMEDIATE")
+            conexao.execute(
+                "INSERT OR REPLACE INTO saldos (conta, saldo_centavos, quantidade) "
+                "SELECT ?, COALESCE(SUM(CASE tipo WHEN 'DEPOSITO' THEN centavos ELSE -centavos END), 0), COUNT(*) "
+                "FROM transacoes WHERE conta = ?", (self.conta, self.conta))
+            conexao.execute("DELETE FROM meses WHERE conta = ?", (self.conta,))
+            conexao.execute(PREENCHER_MESES.format(condicao="conta = ?"), (self.conta,))
+            conexao.execute("COMMIT")
+
+    def verificar(self, desde_ultimo_ponto=False):
+        """
+        Mesma conferência de Livro.verificar: soma as transações em blocos e
+        compara com o saldo encadeado e com o saldo materializado. Não há
+        pontos de controle no SQLite, então `desde_ultimo_ponto` é ignorado.
+        """
+        with self.base.trava:
+            saldo_registrado, quantidade = self._saldo_e_quantidade()
+        relatorio = {"inicio": 0, "fim": quantidade, "transacoes": 0, "pontos_conferidos": 0, "divergencias": []}
+        total, divergencias = 0, 0
+        for seq, transacao in enumerate(self):
+            if seq >= quantidade:
+                break
+            total += SINAIS[transacao["tipo"]] * transacao["centavos"]
+            relatorio["transacoes"] += 1
+            if transacao["saldo_centavos"] != total:
+                divergencias += 1
+                if len(relatorio["divergencias"]) < MAX_DIVERGENCIAS:
+                    relatorio["divergencias"].append(
+                        {"posicao": seq, "mensagem": f"saldo gravado {transacao['saldo_centavos']}, soma {total}"})
+                total = transacao["saldo_centavos"]
+        if total != saldo_registrado:
+            divergencias += 1
+            relatorio["divergencias"].append(
+                {"posicao": quantidade, "mensagem": f"saldo materializado {saldo_registrado}, soma {total}"})
+        relatorio.update(saldo_calculado=total, saldo_registrado=saldo_registrado,
+                         quantidade_divergencias=divergencias, ok=divergencias == 0)
+        return relatorio
+
+    def fechar(self):
+        pass  # A conexão pertence à BaseSQLite, fechada pelo Banco
+
+
+class SelecaoSQLite:
+    """
+    Transações filtradas de uma conta no SQLite (ver armazenamento.Selecao).
+    """
+
+    def __init__(self, livro, condicao, parametros):
+        self.livro = livro
+        self.condicao = condicao
+        self.parametros = parametros
+
+    def quantidade(self):
+        with self.livro.base.trava:
+            return self.livro.base.conexao.execute(
+                f"SELECT COUNT(*) FROM transacoes WHERE {self.condicao}", self.parametros).fetchone()[0]
+
+    def pagina(self, inicio, quantidade):
+        with self.livro.base.trava:
+            linhas = self.livro.base.conexao.execute(
+                f"SELECT centavos, data, hora, tipo, saldo_centavos FROM transacoes WHERE {self.condicao} "
+                "ORDER BY seq LIMIT ? OFFSET ?", self.parametros + [quantidade, max(0, inicio)]).fetchall()
+        return [{"centavos": c, "data": d, "hora": h, "tipo": t, "saldo_centavos": s} for c, d, h, t, s in linhas]
+
+    def __iter__(self):
+        inicio = 0
+        while True:
+            bloco = self.pagina(inicio, 1000)
+            if not bloco:
+                return
+            yield from bloco
+            inicio += len(bloco)
+
+
+# Função para importar as contas guardadas em JSON (contas/<prefixo>/<nome>/) para o SQLite
+def importar_json(pasta_contas, base):
+    """
+    Copia o diário de cada conta para contas.db. Contas que já existem no
+    SQLite são ignoradas, então a importação pode ser repetida com segurança.
+    Retorna {nome da conta: transações importadas}.
+    """
+    importadas = {}
+    for prefixo in sorted(os.listdir(pasta_contas)):
+        pasta_prefixo = os.path.join(pasta_contas, prefixo)
+        if not os.path.isdir(pasta_prefixo):
+            continue
+        for pasta in sorted(os.listdir(pasta_prefixo)):
+            caminho = os.path.join(pasta_prefixo, pasta)
+            if not os.path.exists(os.path.join(caminho, DIARIO_FILE)):
+                continue
+            conta = unquote(pasta)
+            livro_json = Livro(caminho)
+            livro = LivroSQLite(base, conta)
+            with base.trava:
+                if livro._saldo_e_quantidade()[1]:
+                    continue
+                base.conexao.execute("BEGIN IMMEDIATE")
+                saldo, seq = 0, 0
+                for transacao in livro_json:
+                    saldo = transacao.get("saldo_centavos", saldo + SINAIS[transacao["tipo"]] * transacao["centavos"])
+                    livro._inserir(seq, dict(transacao, saldo_centavos=saldo))
+                    seq += 1
+                # O saldo vem do livro JSON (que pode ter saldo inicial de antes do diário)
+                base.conexao.execute("INSERT OR REPLACE INTO saldos (conta, saldo_centavos, quantidade) VALUES (?, ?, ?)",
+                                     (conta, livro_json.saldo(), seq))
+                base.conexao.execute("COMMIT")
+            livro_json.fechar()
+            importadas[conta] = seq
+    return importadas
+
+
+if __name__ == "__main__":
+    import sys
+
+    # python armazenamento_sqlite.py importar [diretório] -> copia as contas JSON para contas.db
+    if sys.argv[1:2] == ["importar"]:
+        diretorio = sys.argv[2] if len(sys.argv) > 2 else "."
+        base = BaseSQLite(os.path.join(diretorio, SQLITE_FILE))
+        for conta, quantidade in importar_json(os.path.join(diretorio, "contas"), base).items():
+            print(f"{conta}: {quantidade} transações importadas")
+        base.fechar()
+    else:
+        print("Uso: python armazenamento_sqlite.py importar [diretório]")
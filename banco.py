@@ -0,0 +1,391 @@
+import atexit  # Para fechar os arquivos do livro ao sair
+import hashlib  # Prefixo das pastas das contas
+import os  # Para manipular arquivos e pastas
+import threading  # Protege a lista de contas abertas
+from collections import OrderedDict
+from datetime import datetime  # Data atual para as regras diárias de saque
+from urllib.parse import quote, unquote  # Nome da conta seguro para usar como nome de pasta
+
+from dinheiro import formatar
+from eventos import barramento
+from grupo import MAXIMO_GRUPO, ConfirmacaoEmGrupo
+from instrumentacao import medido
+from armazenamento import (DIARIO_FILE, FSYNC_A_CADA, PONTOS_FILE, SALDO_FILE, TRANSACOES_FILE, TRAVA_FILE,
+                           ColunaValores, IndiceLinhas, IndiceSaques, IndiceTempo, Livro, OperacaoRecusada,
+                           ResumoMensal)
+
+# Regras de saque (valores em centavos)
+LIMITE_SAQUES_DIA = 3  # Quantidade máxima de saques por dia
+LIMITE_POR_SAQUE = 500_00  # Valor máximo de cada saque (R$500,00)
+LIMITE_VALOR_DIA = None  # Valor máximo somado dos saques do dia (None = sem limite)
+
+
+# Pasta das contas e conta usada quando nenhuma é informada (a do usuário padrão)
+CONTAS_DIR = "contas"
+CONTA_PADRAO = "admin"
+CONTAS_ABERTAS = 256  # Máximo de contas mantidas abertas em memória por Banco
+MOTOR_PADRAO = "json"  # "json" (uma pasta por conta) ou "sqlite" (contas.db)
+
+# Arquivos do formato antigo, de conta única, guardados direto no diretório do banco
+ARQUIVOS_CONTA_UNICA = [SALDO_FILE, PONTOS_FILE, TRANSACOES_FILE, DIARIO_FILE, IndiceSaques.arquivo,
+                        ResumoMensal.arquivo, IndiceLinhas.arquivo, IndiceTempo.arquivo, ColunaValores.arquivo, TRAVA_FILE]
+
+
+# Função que monta a subpasta da conta: "<2 primeiros hex do SHA-1>/<nome escapado>"
+def _subpasta(nome):
+    if not nome:
+        raise ValueError("O nome da conta não pode ser vazio")
+    prefixo = hashlib.sha1(nome.encode("utf-8")).hexdigest()[:2]
+    pasta = quote(nome, safe="")
+    if pasta.strip(".") == "":  # "." e ".." apontariam para a pasta do prefixo ou para contas/
+        pasta = pasta.replace(".", "%2E")
+    return os.path.join(prefixo, pasta)
+
+
+# Função para mover o saldo e as transações da versão de conta única para a pasta de uma conta
+def migrar_conta_unica(diretorio, pasta_conta):
+    """
+    Antes havia um único saldo.json/transacoes para todo mundo. Na primeira
+    execução eles passam a pertencer à conta padrão. Não faz nada se a conta
+    padrão já existir ou se não houver arquivos antigos.
+    """
+    antigos = [nome for nome in ARQUIVOS_CONTA_UNICA if os.path.exists(os.path.join(diretorio, nome))]
+    if not antigos or os.path.exists(pasta_conta):
+        return
+    os.makedirs(pasta_conta)
+    for nome in antigos:
+        os.replace(os.path.join(diretorio, nome), os.path.join(pasta_conta, nome))
+
+
+class Conta:
+    """
+    Operações de uma conta: depósito, saque, saldo e extrato.
+    Não depende da interface gráfica; as telas apenas chamam estes métodos e
+    exibem o resultado (ou a mensagem de OperacaoRecusada).
+    Todos os valores são inteiros em centavos (ver dinheiro.py).
+    """
+
+    def __init__(self, livro, nome=CONTA_PADRAO, limite_saques_dia=LIMITE_SAQUES_DIA,
+                 limite_por_saque=LIMITE_POR_SAQUE, limite_valor_dia=LIMITE_VALOR_DIA, grupo=None):
+        self.livro = livro
+        self.nome = nome
+        self.limite_saques_dia = limite_saques_dia
+        self.limite_por_saque = limite_por_saque
+        self.limite_valor_dia = limite_valor_dia
+        self.grupo = grupo  # ConfirmacaoEmGrupo do livro (None: cada operação é confirmada sozinha)
+
+    @medido("conta.saldo")
+    def saldo(self):
+        return self.livro.saldo()
+
+    def arquivo_alterado(self):
+        """
+        Arquivo que muda a cada operação gravada na conta (por este ou por
+        outro processo); as telas o observam para atualizar o saldo.
+        """
+        return self.livro.caminho_alteracoes
+
+    def _avisar(self, transacao):
+        # Publica o novo saldo para as telas abertas neste processo (ver eventos.py)
+        barramento.publicar("saldo", conta=self.nome, saldo_centavos=transacao["saldo_centavos"])
+        return transacao
+
+    @medido("conta.depositar")
+    def depositar(self, centavos):
+        """
+        Registra um depósito e retorna a transação gravada.
+        """
+        return self._registrar("DEPOSITO", centavos)
+
+    @medido("conta.sacar")
+    def sacar(self, centavos):
+        """
+        Registra um saque respeitando as regras (quantidade e valor por dia,
+        valor por saque, saldo). As regras são conferidas com o livro travado,
+        então dois saques simultâneos não conseguem furar os limites.
+        """
+        return self._registrar("SAQUE", centavos)
+
+    def _preparar(self, tipo, centavos):
+        # Confere o valor e retorna a validação que o livro roda com a trava adquirida
+        if centavos <= 0:
+            raise OperacaoRecusada("Informe um valor maior que zero!")
+        return self._validar_saque(centavos) if tipo == "SAQUE" else None
+
+    def _registrar(self, tipo, centavos):
+        validar = self._preparar(tipo, centavos)
+        if self.grupo is not None:
+            return self._avisar(self.grupo.registrar(tipo, centavos, validar))
+        return self._avisar(self.livro.registrar(tipo, centavos, validar))
+
+    def enviar(self, tipo, centavos):
+        """
+        Versão sem espera de depositar()/sacar() ("DEPOSITO"/"SAQUE"), para
+        quem atende muitos clientes (ver servidor.py). Retorna um
+        concurrent.futures.Future com a transação gravada ou a
+        OperacaoRecusada. Só existe com confirmação em grupo.
+        """
+        futuro = self.grupo.enviar(tipo, centavos, self._preparar(tipo, centavos))
+        futuro.add_done_callback(lambda feito: feito.exception() is None and self._avisar(feito.result()))
+        return futuro
+
+    def _validar_saque(self, centavos):
+        """
+        Retorna a função que confere as regras de um saque de `centavos`,
+        chamada pelo livro com a trava adquirida.
+        """
+        def validar(saldo_atual, livro):
+            # Consulta o índice de saques do dia atual (O(1), sem percorrer o histórico)
+            saques_hoje, valor_hoje = livro.saques_do_dia(datetime.now().strftime("%d/%m/%Y"))
+
+            if saques_hoje >= self.limite_saques_dia:
+                raise OperacaoRecusada(f"Limite de {self.limite_saques_dia} saques diários atingido!")
+
+            if centavos > self.limite_por_saque:
+                raise OperacaoRecusada(f"Limite máximo por saque é R${formatar(self.limite_por_saque)}!")
+
+            if self.limite_valor_dia is not None and valor_hoje + centavos > self.limite_valor_dia:
+                raise OperacaoRecusada(f"Limite diário de R${formatar(self.limite_valor_dia)} em saques atingido!")
+
+            if saldo_atual < centavos:
+                raise OperacaoRecusada("Saldo insuficiente para saque!")
+
+        return validar
+
+    def saques_disponiveis(self):
+        """
+        Quanto ainda pode ser sacado hoje pelas regras de sacar():
+        {"saques": quantidade restante, "centavos": maior saque possível agora}.
+        """
+        saques_hoje, valor_hoje = self.livro.saques_do_dia(datetime.now().strftime("%d/%m/%Y"))
+        restantes = max(0, self.limite_saques_dia - saques_hoje)
+        maximo = min(self.limite_por_saque, max(0, self.saldo())) if restantes else 0
+        if self.limite_valor_dia is not None:
+            maximo = min(maximo, max(0, self.limite_valor_dia - valor_hoje))
+        return {"saques": restantes, "centavos": maximo}
+
+    @medido("conta.resumo")
+    def resumo(self):
+        """
+        Resumo da conta para o painel: totais e saldo final de cada mês (ver
+        Livro.resumo_mensal), saldo atual e saques disponíveis hoje. Usa só
+        agregados mantidos a cada operação, sem percorrer o histórico.
+        """
+        return {"meses": self.livro.resumo_mensal(), "saldo_centavos": self.saldo(),
+                "saques_disponiveis": self.saques_disponiveis()}
+
+    @medido("conta.lancar_lote")
+    def lancar_lote(self, operacoes):
+        """
+        Lança uma lista de operações (tipo, centavos) com uma única gravação
+        em disco. Cada saque passa pelas mesmas regras de sacar(), levando em
+        conta as operações anteriores do lote. Retorna as recusas como
+        (índice da operação, mensagem); as demais operações são gravadas.
+        """
+        preparadas, recusas = [], []
+        for indice, (tipo, centavos) in enumerate(operacoes):
+            if tipo not in ("DEPOSITO", "SAQUE"):
+                recusas.append((indice, f"Tipo de operação desconhecido: {tipo}"))
+            elif centavos <= 0:
+                recusas.append((indice, "Informe um valor maior que zero!"))
+            else:
+                preparadas.append((indice, tipo, centavos, self._validar_saque(centavos) if tipo == "SAQUE" else None))
+        recusas += self.livro.registrar_lote(preparadas)
+        recusas.sort()
+        if len(recusas) < len(operacoes):
+            self._avisar({"saldo_centavos": self.livro.saldo()})
+        return recusas
+
+    @medido("conta.quantidade_transacoes")
+    def quantidade_transacoes(self, de=None, ate=None, tipo=None):
+        """
+        Quantidade de transações, opcionalmente só as do período `de`-`ate`
+        ("dd/mm/aaaa", inclusivo) e do `tipo` ("DEPOSITO" ou "SAQUE").
+        """
+        if de or ate or tipo:
+            return self.livro.selecionar(de, ate, tipo).quantidade()
+        return self.livro.contar()
+
+    @medido("conta.extrato")
+    def extrato(self, inicio=0, quantidade=50, de=None, ate=None, tipo=None):
+        """
+        Retorna uma página do extrato (transações em ordem cronológica),
+        com os mesmos filtros de quantidade_transacoes().
+        """
+        if de or ate or tipo:
+            return self.livro.selecionar(de, ate, tipo).pagina(inicio, quantidade)
+        return self.livro.pagina(inicio, quantidade)
+
+    def transacoes(self, de=None, ate=None, tipo=None):
+        """
+        Percorre as transações (todas ou as filtradas) sem carregá-las na
+        memória de uma vez.
+        """
+        if de or ate or tipo:
+            return iter(self.livro.selecionar(de, ate, tipo))
+        return iter(self.livro)
+
+    @medido("conta.verificar")
+    def verificar(self, desde_ultimo_ponto=False):
+        """
+        Confere o saldo com a soma do diário (ver Livro.verificar).
+        """
+        return self.livro.verificar(desde_ultimo_ponto)
+
+    def fechar(self):
+        """
+        Grava as operações ainda na fila do grupo e fecha o livro.
+        """
+        if self.grupo is not None:
+            self.grupo.fechar()
+        self.livro.fechar()
+
+
+class Banco:
+    """
+    Ponto de entrada do núcleo bancário: dá acesso às contas guardadas em `diretorio`.
+
+    Cada conta tem o próprio livro (saldo, diário e índices) em
+    contas/<prefixo>/<nome>/, onde o prefixo são os 2 primeiros caracteres
+    do SHA-1 do nome. Assim abrir uma conta nunca lê dados de outra e
+    nenhuma pasta fica com milhares de entradas, mesmo com 100 mil contas.
+
+    Com motor="sqlite" (ou a variável de ambiente BANCO_MOTOR=sqlite) todas
+    as contas ficam em contas.db, com índices por conta/data/tipo; veja
+    armazenamento_sqlite.py para importar as contas JSON existentes.
+    """
+
+    def __init__(self, diretorio=".", sincronizar_a_cada=FSYNC_A_CADA, contas_abertas=CONTAS_ABERTAS, motor=None,
+                 janela_grupo=None, maximo_grupo=MAXIMO_GRUPO):
+        self.diretorio = diretorio
+        self.pasta_contas = os.path.join(diretorio, CONTAS_DIR)
+        self.sincronizar_a_cada = sincronizar_a_cada
+        self.contas_abertas = contas_abertas
+        self.motor = motor or os.environ.get("BANCO_MOTOR", MOTOR_PADRAO)
+        # Confirmação em grupo (ver grupo.py): None desliga; em segundos, ex.: 0.002
+        self.janela_grupo = janela_grupo
+        self.maximo_grupo = maximo_grupo
+        self._contas = OrderedDict()  # nome -> Conta, da menos para a mais usada
+        self._trava = threading.Lock()
+        self._sqlite = None
+        if self.motor == "sqlite":
+            from armazenamento_sqlite import SQLITE_FILE, BaseSQLite
+            self._sqlite = BaseSQLite(os.path.join(diretorio, SQLITE_FILE), sincronizar_a_cada)
+        elif self.motor == "json":
+            migrar_conta_unica(diretorio, os.path.join(self.pasta_contas, _subpasta(CONTA_PADRAO)))
+        else:
+            raise ValueError(f"Motor de armazenamento desconhecido: {self.motor!r}")
+
+    def pasta_da_conta(self, nome):
+        return os.path.join(self.pasta_contas, _subpasta(nome))
+
+    def existe(self, nome):
+        if self._sqlite is not None:
+            from armazenamento_sqlite import LivroSQLite
+            return LivroSQLite(self._sqlite, nome).contar() > 0
+        return os.path.isdir(self.pasta_da_conta(nome))
+
+    def nomes(self):
+        """
+        Percorre os nomes de todas as contas guardadas.
+        """
+        if self._sqlite is not None:
+            with self._sqlite.trava:
+                linhas = self._sqlite.conexao.execute("SELECT conta FROM saldos ORDER BY conta").fetchall()
+            yield from (conta for conta, in linhas)
+            return
+        if not os.path.isdir(self.pasta_contas):
+            return
+        for prefixo in sorted(os.listdir(self.pasta_contas)):
+            pasta_prefixo = os.path.join(self.pasta_contas, prefixo)
+            if os.path.isdir(pasta_prefixo):
+                for pasta in sorted(os.listdir(pasta_prefixo)):
+                    yield unquote(pasta)
+
+    def conta(self, nome=CONTA_PADRAO):
+        """
+        Retorna a conta `nome`, criando a pasta dela na primeira vez.
+        Mantém até `contas_abertas` contas em memória; a menos usada é fechada.
+        """
+        if not nome:
+            raise ValueError("O nome da conta não pode ser vazio")
+        with self._trava:
+            conta = self._contas.get(nome)
+            if conta is not None:
+                self._contas.move_to_end(nome)
+                return conta
+            livro = self._abrir_livro(nome)
+            grupo = None
+            if self.janela_grupo is not None:
+                grupo = ConfirmacaoEmGrupo(livro, self.janela_grupo, self.maximo_grupo)
+            conta = Conta(livro, nome, grupo=grupo)
+            self._contas[nome] = conta
+            if len(self._contas) > self.contas_abertas:
+                # Outra thread pode estar usando a conta: Livro.fechar espera a gravação
+                # dela terminar, e um uso posterior reabre os arquivos e a trava
+                _, antiga = self._contas.popitem(last=False)
+                antiga.fechar()
+            return conta
+
+    @medido("banco.abrir_conta")
+    def _abrir_livro(self, nome):
+        if self._sqlite is not None:
+            from armazenamento_sqlite import LivroSQLite
+            return LivroSQLite(self._sqlite, nome)
+        pasta = self.pasta_da_conta(nome)
+        os.makedirs(pasta, exist_ok=True)
+        return Livro(pasta, self.sincronizar_a_cada)
+
+    def fechar(self):
+        with self._trava:
+            for conta in self._contas.values():
+                conta.fechar()
+            self._contas.clear()
+            if self._sqlite is not None:
+                self._sqlite.fechar()
+                self._sqlite = None
+
+
+_banco = None  # Banco compartilhado pelas telas deste processo
+
+
+# Função para obter o banco padrão (contas em ./contas)
+def obter_banco():
+    global _banco
+    if _banco is None:
+        _banco = Banco()
+        atexit.register(_banco.fechar)
+    return _banco
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    # python banco.py verificar [--rapido] [conta ...] -> confere o saldo de cada conta com o diário
+    if sys.argv[1:2] == ["verificar"]:
+        banco = Banco()
+        nomes = [argumento for argumento in sys.argv[2:] if argumento != "--rapido"] or banco.nomes()
+        divergentes = 0
+        for nome in nomes:
+            relatorio = banco.conta(nome).verificar(desde_ultimo_ponto="--rapido" in sys.argv)
+            print(f"{nome}: {'ok' if relatorio['ok'] else 'DIVERGENTE'} "
+                  f"({relatorio['transacoes']} transações, saldo {formatar(relatorio['saldo_calculado'])})")
+            if not relatorio["ok"]:
+                divergentes += 1
+                print(json.dumps(relatorio["divergencias"], indent=4, ensure_ascii=False))
+        banco.fechar()
+        sys.exit(1 if divergentes else 0)
+    elif sys.argv[1:2] == ["reconstruir"]:
+        # python banco.py reconstruir [conta ...] -> recalcula saldo e índices de cada conta a partir do diário
+        banco = Banco()
+        for nome in sys.argv[2:] or banco.nomes():
+            if not banco.existe(nome):
+                print(f"{nome}: conta inexistente")
+                continue
+            banco.conta(nome).livro.reconstruir_indices()
+            print(f"{nome}: saldo e índices reconstruídos a partir do diário")
+        banco.fechar()
+    else:
+        print("Uso: python banco.py verificar [--rapido] [conta ...]")
+        print("     python banco.py reconstruir [conta ...]")
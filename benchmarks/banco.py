@@ -0,0 +1,56 @@
+"""
+Operações por segundo do núcleo bancário (banco.Banco/Conta), sem interface gráfica.
+
+Mede depósitos, saques (com as regras de limite conferidas a cada tentativa),
+consultas de saldo e leitura de páginas do extrato em um diretório temporário.
+
+Uso: python benchmarks/banco.py --operacoes 2000 --fsync-a-cada 1
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from banco import Banco, OperacaoRecusada  # noqa: E402
+
+
+# Função para medir quantas vezes por segundo `funcao` roda
+def vazao(nome, funcao, operacoes):
+    inicio = time.perf_counter()
+    for i in range(operacoes):
+        funcao(i)
+    duracao = time.perf_counter() - inicio
+    print(f"{nome:<22} {operacoes / duracao:>12,.0f} ops/s  ({duracao * 1e6 / operacoes:,.1f} µs/op)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operacoes", type=int, default=2000)
+    parser.add_argument("--fsync-a-cada", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        banco = Banco(diretorio, sincronizar_a_cada=args.fsync_a_cada)
+        conta = banco.conta()
+
+        vazao("depósito", lambda i: conta.depositar(100_00), args.operacoes)
+
+        # Depois de 3 saques no dia as tentativas são recusadas pelo índice diário
+        def sacar(i):
+            try:
+                conta.sacar(10_00)
+            except OperacaoRecusada:
+                pass
+        vazao("saque (c/ regras)", sacar, args.operacoes)
+
+        vazao("saldo", lambda i: conta.saldo(), args.operacoes * 10)
+        total = conta.quantidade_transacoes()
+        vazao("página do extrato", lambda i: conta.extrato((i * 37) % total, 10), args.operacoes * 5)
+        banco.fechar()
+
+
+if __name__ == "__main__":
+    main()
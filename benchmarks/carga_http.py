@@ -0,0 +1,181 @@
+"""
+Gerador de carga para a API HTTP (servidor.py).
+
+Sobe o servidor em um interpretador novo, com um banco e um cadastro
+temporários (ou usa um servidor já rodando, com --url), faz login de cada
+cliente e, para cada nível de concorrência, mantém esse número de clientes
+enviando requisições em conexões keep-alive durante --segundos. Cada
+cliente escolhe a próxima requisição pela mistura abaixo (saldo, extrato,
+depósito e saque) na conta do próprio usuário; com --contas menor que a
+concorrência, vários clientes disputam a mesma conta.
+
+Mostra, por nível: requisições por segundo, latência p50 e p99 (ms) e
+respostas de erro (saques recusados pelas regras contam como 422).
+
+Uso: python benchmarks/carga_http.py [--concorrencias 1 4 16 64] [--segundos 5] [--contas 64]
+                                     [--fsync-a-cada 1] [--grupo-ms 2] [--url http://127.0.0.1:8080]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from credenciais import USER_DATA_FILE, gerar_hash  # noqa: E402
+
+# Peso de cada requisição na mistura: (método, caminho, corpo)
+MISTURA = [
+    (50, ("GET", "/saldo", None)),
+    (20, ("GET", "/extrato?inicio=0&quantidade=20", None)),
+    (20, ("POST", "/deposito", {"valor": "10.00"})),
+    (10, ("POST", "/saque", {"valor": "1.00"})),
+]
+
+
+class Conexao:
+    """
+    Cliente HTTP/1.1 mínimo sobre uma conexão keep-alive.
+    """
+
+    def __init__(self, host, porta):
+        self.host, self.porta = host, porta
+        self.leitor = self.escritor = None
+
+    async def pedir(self, metodo, caminho, corpo=None, token=None):
+        if self.escritor is None:
+            self.leitor, self.escritor = await asyncio.open_connection(self.host, self.porta)
+        dados = json.dumps(corpo).encode("utf-8") if corpo is not None else b""
+        cabecalhos = f"{metodo} {caminho} HTTP/1.1\r\nHost: {self.host}\r\nContent-Length: {len(dados)}\r\n"
+        if token:
+            cabecalhos += f"Authorization: Bearer {token}\r\n"
+        self.escritor.write(cabecalhos.encode("ascii") + b"\r\n" + dados)
+        status = int((await self.leitor.readline()).split()[1])
+        tamanho, fechar = 0, False
+        while True:
+            linha = await self.leitor.readline()
+            if linha in (b"\r\n", b""):
+                break
+            nome, _, valor = linha.decode("latin-1").partition(":")
+            if nome.lower() == "content-length":
+                tamanho = int(valor)
+            elif nome.lower() == "connection":
+                fechar = valor.strip().lower() == "close"
+        resposta = json.loads(await self.leitor.readexactly(tamanho)) if tamanho else None
+        if fechar:
+            self.fechar()
+        return status, resposta
+
+    def fechar(self):
+        if self.escritor is not None:
+            self.escritor.close()
+            self.leitor = self.escritor = None
+
+
+# Função que faz o login dos usuários usuario0..usuarioN-1 (em 8 conexões) e retorna os tokens
+async def fazer_login(host, porta, contas, senha):
+    tokens = [None] * contas
+
+    async def entrar(primeiro):
+        conexao = Conexao(host, porta)
+        for i in range(primeiro, contas, 8):
+            status, resposta = await conexao.pedir("POST", "/login", {"usuario": f"usuario{i}", "senha": senha})
+            if status != 200:
+                raise SystemExit(f"login de usuario{i} falhou: {status} {resposta}")
+            tokens[i] = resposta["token"]
+        conexao.fechar()
+
+    await asyncio.gather(*(entrar(primeiro) for primeiro in range(min(8, contas))))
+    return tokens
+
+
+# Função que roda `concorrencia` clientes por `segundos` e retorna (latências em s, status por código)
+async def rodar_nivel(host, porta, tokens, concorrencia, segundos):
+    pesos = [peso for peso, _ in MISTURA]
+    pedidos = [pedido for _, pedido in MISTURA]
+    latencias, codigos = [], {}
+    fim = time.perf_counter() + segundos
+
+    async def cliente(numero):
+        aleatorio = random.Random(numero)
+        conexao = Conexao(host, porta)
+        token = tokens[numero % len(tokens)]
+        while time.perf_counter() < fim:
+            metodo, caminho, corpo = aleatorio.choices(pedidos, pesos)[0]
+            inicio = time.perf_counter()
+            status, _ = await conexao.pedir(metodo, caminho, corpo, token)
+            latencias.append(time.perf_counter() - inicio)
+            codigos[status] = codigos.get(status, 0) + 1
+        conexao.fechar()
+
+    await asyncio.gather(*(cliente(numero) for numero in range(concorrencia)))
+    return latencias, codigos
+
+
+def percentil(ordenados, fracao):
+    return ordenados[min(len(ordenados) - 1, int(fracao * len(ordenados)))]
+
+
+# Função que sobe o servidor em um interpretador novo e retorna (processo, host, porta)
+def subir_servidor(diretorio, contas, senha, fsync_a_cada, grupo_ms=None):
+    registro = gerar_hash(senha)  # O mesmo hash para todos: cadastrar mil usuários não leva minutos
+    with open(os.path.join(diretorio, USER_DATA_FILE), "w", encoding="utf-8") as arquivo:
+        json.dump({f"usuario{i}": registro for i in range(contas)}, arquivo)
+    comando = [sys.executable, os.path.join(RAIZ, "servidor.py"), "--porta", "0", "--diretorio", diretorio,
+               "--fsync-a-cada", str(fsync_a_cada)]
+    if grupo_ms is not None:
+        comando += ["--grupo-ms", str(grupo_ms)]
+    processo = subprocess.Popen(comando, stdout=subprocess.PIPE, text=True)
+    linha = processo.stdout.readline()  # "ouvindo em http://host:porta"
+    if not linha:
+        raise SystemExit("o servidor não subiu")
+    endereco = urlsplit(linha.split()[-1])
+    return processo, endereco.hostname, endereco.port
+
+
+async def medir(host, porta, args):
+    tokens = await fazer_login(host, porta, args.contas, args.senha)
+    print(f"{args.contas} sessões abertas; {args.segundos:g} s por nível\n")
+    print(f"{'concorrência':>12} {'req/s':>9} {'p50 (ms)':>9} {'p99 (ms)':>9} {'requisições':>12}  status")
+    for concorrencia in args.concorrencias:
+        latencias, codigos = await rodar_nivel(host, porta, tokens, concorrencia, args.segundos)
+        latencias.sort()
+        status = ", ".join(f"{codigo}: {quantidade}" for codigo, quantidade in sorted(codigos.items()))
+        print(f"{concorrencia:>12} {len(latencias) / args.segundos:>9.0f} {percentil(latencias, 0.5) * 1000:>9.2f} "
+              f"{percentil(latencias, 0.99) * 1000:>9.2f} {len(latencias):>12}  {status}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concorrencias", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--segundos", type=float, default=5)
+    parser.add_argument("--contas", type=int, default=64, help="usuários (e contas) usados pelos clientes")
+    parser.add_argument("--fsync-a-cada", type=int, default=1, help="repassado ao servidor iniciado pelo gerador")
+    parser.add_argument("--grupo-ms", type=float, default=None, help="liga a confirmação em grupo no servidor")
+    parser.add_argument("--url", help="servidor já rodando (os usuários usuario0.. precisam existir)")
+    parser.add_argument("--senha", default="senha")
+    args = parser.parse_args()
+
+    if args.url:
+        endereco = urlsplit(args.url)
+        asyncio.run(medir(endereco.hostname, endereco.port, args))
+        return
+    with tempfile.TemporaryDirectory() as diretorio:
+        processo, host, porta = subir_servidor(diretorio, args.contas, args.senha, args.fsync_a_cada,
+                                               args.grupo_ms)
+        try:
+            asyncio.run(medir(host, porta, args))
+        finally:
+            processo.terminate()
+            processo.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Carga e agregação do histórico em colunas (colunas.py) com 10 milhões de
+transações.
+
+Escreve direto os dois arquivos binários de uma conta com N transações
+(índice de tempo e coluna de valores, como Livro.colunas os lê), e mede:
+  - carga:     leitura das colunas para array("q");
+  - por mês:   totais por mês e tipo;
+  - saldos:    saldo acumulado de cada transação;
+com e sem NumPy, e o pico de memória da carga (tracemalloc, medido à parte
+para não pesar nos tempos). Para comparar, mede
+o formato de hoje (uma linha JSON por transação, lida como dicionário)
+em uma amostra e estima o custo para N.
+
+Uso: python benchmarks/colunas.py --transacoes 10000000 --amostra 500000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from armazenamento import IndiceTempo  # noqa: E402
+from colunas import Colunas, numpy  # noqa: E402
+
+
+# Função que gera as colunas de N transações ao longo de cinco anos
+def gerar_colunas(transacoes):
+    aleatorio = random.Random(7)
+    chaves, valores = array("q"), array("q")
+    inicio = time.mktime((2020, 1, 1, 0, 0, 0, 0, 0, -1))
+    passo = 5 * 365 * 86400 / transacoes
+    for bloco in range(0, transacoes, 100000):
+        for i in range(bloco, min(bloco + 100000, transacoes)):
+            ts = int(time.strftime("%Y%m%d%H%M%S", time.localtime(inicio + i * passo)))
+            if aleatorio.random() < 0.3:
+                chaves.append(ts * 4 + IndiceTempo.CODIGOS["SAQUE"])
+                valores.append(-aleatorio.randint(100, 20000))
+            else:
+                chaves.append(ts * 4 + IndiceTempo.CODIGOS["DEPOSITO"])
+                valores.append(aleatorio.randint(100, 50000))
+    return chaves, valores
+
+
+# Função que grava as colunas nos arquivos binários do livro (o de tempo com a posição de cada linha)
+def gravar_colunas(diretorio, chaves, valores):
+    entradas = array("q", bytes(16 * len(chaves)))
+    entradas[::2] = chaves
+    entradas[1::2] = array("q", range(110, 110 * len(chaves) + 1, 110))  # Posições fictícias
+    caminho_tempo = os.path.join(diretorio, IndiceTempo.arquivo)
+    caminho_valores = os.path.join(diretorio, "transacoes.valores")
+    with open(caminho_tempo, "wb") as arquivo:
+        entradas.tofile(arquivo)
+    with open(caminho_valores, "wb") as arquivo:
+        valores.tofile(arquivo)
+    return caminho_tempo, caminho_valores
+
+
+# Função que lê as colunas como Livro.colunas
+def carregar(caminho_tempo, caminho_valores, quantidade):
+    entradas, valores = array("q"), array("q")
+    with open(caminho_tempo, "rb") as arquivo:
+        entradas.fromfile(arquivo, 2 * quantidade)
+    with open(caminho_valores, "rb") as arquivo:
+        valores.fromfile(arquivo, quantidade)
+    return entradas[::2], valores
+
+
+# Função que retorna o pico de memória (bytes) alocada por funcao()
+def pico_de_memoria(funcao):
+    tracemalloc.start()
+    resultado = funcao()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del resultado
+    return pico
+
+
+def medir_colunas(caminhos, quantidade, usar_numpy):
+    pico = pico_de_memoria(lambda: Colunas(*carregar(*caminhos, quantidade), usar_numpy))
+    inicio = time.perf_counter()
+    chaves, valores = carregar(*caminhos, quantidade)
+    colunas = Colunas(chaves, valores, usar_numpy)
+    carga = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    totais = colunas.totais_por_mes()
+    por_mes = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    saldos = colunas.saldos()
+    tempo_saldos = time.perf_counter() - inicio
+    return carga, por_mes, tempo_saldos, pico, totais, int(saldos[-1])
+
+
+def ler_dicionarios(caminho):
+    with open(caminho, "r", encoding="utf-8") as arquivo:
+        return [json.loads(linha) for linha in arquivo]
+
+
+# Função que mede o formato de hoje: dicionários lidos do diário JSON Lines
+def medir_dicionarios(diretorio, chaves, valores, amostra):
+    caminho = os.path.join(diretorio, "amostra.jsonl")
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        saldo = 0
+        for chave, valor in zip(chaves[:amostra], valores[:amostra]):
+            ts, saldo = str(chave >> 2), saldo + valor
+            arquivo.write(json.dumps({"centavos": abs(valor), "data": f"{ts[6:8]}/{ts[4:6]}/{ts[:4]}",
+                                      "hora": f"{ts[8:10]}:{ts[10:12]}:{ts[12:]}", "ts": int(ts),
+                                      "tipo": "SAQUE" if valor < 0 else "DEPOSITO", "saldo_centavos": saldo}) + "\n")
+    pico = pico_de_memoria(lambda: ler_dicionarios(caminho))
+    inicio = time.perf_counter()
+    totais = {}
+    for transacao in ler_dicionarios(caminho):
+        chave = (transacao["data"][3:], transacao["tipo"])
+        totais[chave] = totais.get(chave, 0) + transacao["centavos"]
+    duracao = time.perf_counter() - inicio
+    return duracao, pico, os.path.getsize(caminho)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transacoes", type=int, default=10_000_000)
+    parser.add_argument("--amostra", type=int, default=500_000, help="transações lidas no formato JSON")
+    args = parser.parse_args()
+
+    print(f"gerando {args.transacoes:,} transações...", flush=True)
+    chaves, valores = gerar_colunas(args.transacoes)
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminhos = gravar_colunas(diretorio, chaves, valores)
+        tamanho = sum(os.path.getsize(caminho) for caminho in caminhos)
+        saldo_esperado = sum(valores)
+        amostra = min(args.amostra, args.transacoes)
+        duracao_json, pico_json, tamanho_json = medir_dicionarios(diretorio, chaves, valores, amostra)
+        del chaves, valores
+
+        escala = args.transacoes / amostra
+        print(f"\n{'formato':>22} {'carga (s)':>10} {'por mês (s)':>12} {'saldos (s)':>11} {'memória carga (MB)':>19} "
+              f"{'disco (MB)':>11}")
+        print(f"{'JSON, dicionários (*)':>22} {duracao_json * escala:>10.2f} {'':>12} {'':>11} "
+              f"{pico_json * escala / 2**20:>19.0f} {tamanho_json * escala / 2**20:>11.0f}")
+        resultados = []
+        for usar_numpy in ([True, False] if numpy is not None else [False]):
+            carga, por_mes, saldos, pico, totais, saldo_final = medir_colunas(caminhos, args.transacoes, usar_numpy)
+            assert saldo_final == saldo_esperado == totais[-1]["saldo_final"], (saldo_final, saldo_esperado)
+            resultados.append(totais)
+            nome = "colunas + NumPy" if usar_numpy else "colunas + array"
+            print(f"{nome:>22} {carga:>10.2f} {por_mes:>12.2f} {saldos:>11.2f} {pico / 2**20:>19.0f} "
+                  f"{tamanho / 2**20:>11.0f}")
+        assert all(totais == resultados[0] for totais in resultados)
+        print(f"\n(*) estimado a partir de {amostra:,} transações; a carga inclui a soma por mês e tipo"
+              + ("" if numpy is not None else "\nNumPy não instalado: só o caminho com array foi medido"))
+
+
+if __name__ == "__main__":
+    main()
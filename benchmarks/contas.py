@@ -0,0 +1,59 @@
+"""
+Latência para abrir uma conta e ler o saldo em função do número de contas.
+
+Cria N contas (cada uma com um depósito) e mede, para contas sorteadas, o
+tempo de Banco.conta(nome).saldo() com a conta fora da memória (fria) e já
+aberta (quente). Com uma pasta por conta a latência não deve crescer com N.
+
+Uso: python benchmarks/contas.py --contas 100 10000 100000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from banco import Banco  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contas", type=int, nargs="+", default=[100, 10000])
+    parser.add_argument("--amostras", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'contas':>8} {'criação (s)':>12} {'fria p50 (µs)':>14} {'fria p99 (µs)':>14} {'quente p50 (µs)':>16}")
+    for quantidade in args.contas:
+        with tempfile.TemporaryDirectory() as diretorio:
+            # Sem fsync na criação: o objetivo é medir a consulta, não a durabilidade
+            banco = Banco(diretorio, sincronizar_a_cada=10**9, contas_abertas=64)
+            inicio = time.perf_counter()
+            for i in range(quantidade):
+                banco.conta(f"cliente{i}").depositar(100_00)
+            criacao = time.perf_counter() - inicio
+            banco.fechar()
+
+            sorteio = random.Random(42)
+            frias, quentes = [], []
+            for _ in range(args.amostras):
+                nome = f"cliente{sorteio.randrange(quantidade)}"
+                banco = Banco(diretorio)  # Nada em memória: simula a primeira consulta
+                inicio = time.perf_counter()
+                banco.conta(nome).saldo()
+                frias.append((time.perf_counter() - inicio) * 1e6)
+                inicio = time.perf_counter()
+                banco.conta(nome).saldo()
+                quentes.append((time.perf_counter() - inicio) * 1e6)
+                banco.fechar()
+
+            frias.sort()
+            print(f"{quantidade:>8} {criacao:>12.1f} {statistics.median(frias):>14.0f} "
+                  f"{frias[int(len(frias) * 0.99) - 1]:>14.0f} {statistics.median(quentes):>16.0f}")
+
+
+if __name__ == "__main__":
+    main()
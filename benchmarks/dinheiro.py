@@ -0,0 +1,113 @@
+"""
+Valores em centavos (int) contra float e Decimal.
+
+1. Vazão: soma de N lançamentos com cada representação e o erro acumulado
+   em relação ao total exato.
+2. Propriedade: sequências aleatórias de depósitos e saques (valores com
+   centavos) em um Livro; depois de cada rodada o saldo precisa ser
+   exatamente igual à soma do diário e ao saldo encadeado do último registro.
+3. Entradas inválidas: para_centavos recusa com ValueError (e nunca outra
+   exceção) textos com expoente, NaN, infinito, mais de duas casas e bool.
+
+Uso: python benchmarks/dinheiro.py --lancamentos 1000000 --rodadas 20
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from armazenamento import SINAIS, Livro, OperacaoRecusada  # noqa: E402
+from dinheiro import formatar, para_centavos  # noqa: E402
+
+
+# Função que soma os lançamentos convertidos por `converter` e mede o tempo
+def somar(nome, converter, lancamentos, exato):
+    valores = [converter(sinal, centavos) for sinal, centavos in lancamentos]
+    inicio = time.perf_counter()
+    total = valores[0] * 0
+    for valor in valores:
+        total += valor
+    duracao = time.perf_counter() - inicio
+    # Volta para centavos sem arredondar, para expor o erro de cada representação
+    em_centavos = Decimal(total) if nome == "int" else Decimal(str(total)) * 100
+    erro = abs(em_centavos - exato)
+    print(f"{nome:<8} {len(valores) / duracao:>14,.0f} somas/s   erro acumulado: {erro} centavos")
+
+
+# Entradas que para_centavos precisa recusar com ValueError
+INVALIDOS = ["sNaN", "NaN", "-nan", "Infinity", "inf", "1e2", "1E2", "2.5e-1", "1_000", "12.345", "", " ",
+             "1..2", "--1", "abc", "R$ 10", "٣", True, False, float("nan"), float("inf"), None, [1]]
+
+
+# Função que confere que cada entrada inválida levanta ValueError
+def conferir_invalidos():
+    for valor in INVALIDOS:
+        try:
+            centavos = para_centavos(valor)
+        except ValueError:
+            continue
+        raise AssertionError(f"para_centavos({valor!r}) deveria ser recusado, retornou {centavos!r}")
+
+
+# Função que roda uma sequência aleatória de operações e confere o saldo contra o diário
+def rodada(diretorio, aleatorio, operacoes):
+    livro = Livro(diretorio, sincronizar_a_cada=10**9)
+    for _ in range(operacoes):
+        tipo = "SAQUE" if aleatorio.random() < 0.4 else "DEPOSITO"
+        # Texto como o digitado na tela: "12.34", "0,1", "7"
+        texto = f"{aleatorio.randint(0, 500)}{aleatorio.choice(['', '.', ','])}{aleatorio.randint(0, 99)}"
+        try:
+            centavos = para_centavos(texto)
+        except ValueError:
+            continue
+
+        def validar(saldo_atual, livro, centavos=centavos, tipo=tipo):
+            if tipo == "SAQUE" and centavos > saldo_atual:
+                raise OperacaoRecusada("Saldo insuficiente!")
+        try:
+            livro.registrar(tipo, centavos, validar)
+        except OperacaoRecusada:
+            pass
+
+    total, saldo_encadeado = 0, 0
+    for transacao in livro:
+        total += SINAIS[transacao["tipo"]] * transacao["centavos"]
+        saldo_encadeado = transacao["saldo_centavos"]
+    saldo = livro.saldo()
+    livro.fechar()
+    assert type(saldo) is int, f"saldo não é inteiro: {saldo!r}"
+    assert saldo == total == saldo_encadeado, f"saldo={saldo} diário={total} encadeado={saldo_encadeado}"
+    return saldo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lancamentos", type=int, default=1_000_000)
+    parser.add_argument("--rodadas", type=int, default=20)
+    parser.add_argument("--operacoes", type=int, default=500)
+    args = parser.parse_args()
+
+    aleatorio = random.Random(7)
+    lancamentos = [(1 if aleatorio.random() < 0.6 else -1, aleatorio.randint(1, 50000))
+                   for _ in range(args.lancamentos)]
+    exato = sum(sinal * centavos for sinal, centavos in lancamentos)
+    print(f"total exato: R$ {formatar(exato, milhar=True)}")
+    somar("int", lambda sinal, centavos: sinal * centavos, lancamentos, exato)
+    somar("float", lambda sinal, centavos: sinal * centavos / 100, lancamentos, exato)
+    somar("Decimal", lambda sinal, centavos: sinal * Decimal(centavos) / 100, lancamentos, exato)
+
+    for i in range(args.rodadas):
+        with tempfile.TemporaryDirectory() as diretorio:
+            rodada(diretorio, random.Random(i), args.operacoes)
+    print(f"OK: {args.rodadas} rodadas, saldo sempre igual à soma do diário")
+    conferir_invalidos()
+    print(f"OK: {len(INVALIDOS)} entradas inválidas recusadas com ValueError")
+
+
+if __name__ == "__main__":
+    main()
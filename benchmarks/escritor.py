@@ -0,0 +1,117 @@
+"""
+Atraso dos quadros da interface enquanto o livro é gravado.
+
+Imita o mainloop do Tk (callbacks agendados com after()) com um quadro a
+cada 16 ms e, durante o teste, abre uma conta com N transações sem índices
+(que precisam ser reconstruídos) e faz D depósitos. Compara:
+  - direto:   as operações rodam no próprio callback, como antes;
+  - escritor: as operações vão para a thread do escritor (escritor.py).
+Mostra o atraso dos quadros (mediana, p99 e máximo) em ms.
+
+Uso: python benchmarks/escritor.py --transacoes 300000 --depositos 200
+"""
+import argparse
+import heapq
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from armazenamento import DIARIO_FILE  # noqa: E402
+from banco import Banco  # noqa: E402
+from escritor import Escritor  # noqa: E402
+
+QUADRO = 16  # ms
+
+
+class LacoFalso:
+    """
+    Executa callbacks agendados com after(ms, funcao), como o mainloop do Tk.
+    """
+
+    def __init__(self):
+        self.agenda = []
+        self.sequencia = 0
+
+    def after(self, ms, funcao):
+        self.sequencia += 1
+        heapq.heappush(self.agenda, (time.perf_counter() + ms / 1000, self.sequencia, funcao))
+
+    def rodar(self, ate):
+        while self.agenda and time.perf_counter() < ate:
+            momento, _, funcao = self.agenda[0]
+            espera = momento - time.perf_counter()
+            if espera > 0:
+                time.sleep(min(espera, 0.001))
+                continue
+            heapq.heappop(self.agenda)
+            funcao()
+
+
+# Função que cria a conta com um diário grande e sem índices
+def preparar(diretorio, transacoes):
+    banco = Banco(diretorio)
+    pasta = banco.pasta_da_conta("cliente")
+    os.makedirs(pasta)
+    with open(os.path.join(pasta, DIARIO_FILE), "w", encoding="utf-8") as file:
+        for i in range(1, transacoes + 1):
+            file.write(json.dumps({"centavos": 100, "data": "01/01/2024", "hora": "10:00:00", "ts": 20240101100000,
+                                   "tipo": "DEPOSITO", "saldo_centavos": i * 100}) + "\n")
+    return banco
+
+
+def medir(modo, transacoes, depositos):
+    with tempfile.TemporaryDirectory() as diretorio:
+        banco = preparar(diretorio, transacoes)
+        laco = LacoFalso()
+        escritor = Escritor(laco.after)
+        atrasos, feitos = [], []
+        esperado = [time.perf_counter() + QUADRO / 1000]
+
+        def quadro():
+            agora = time.perf_counter()
+            atrasos.append((agora - esperado[0]) * 1000)
+            esperado[0] = agora + QUADRO / 1000
+            laco.after(QUADRO, quadro)
+
+        def operacoes():
+            conta = banco.conta("cliente")
+            if modo == "direto":
+                conta.saldo()  # Reconstrói os índices no próprio callback
+                for _ in range(depositos):
+                    feitos.append(conta.depositar(100))
+            else:
+                escritor.enviar(conta.saldo)
+                for _ in range(depositos):
+                    escritor.enviar(conta.depositar, 100, ao_terminar=feitos.append)
+
+        laco.after(QUADRO, quadro)
+        laco.after(50, operacoes)
+        inicio = time.perf_counter()
+        while len(feitos) < depositos and time.perf_counter() - inicio < 300:
+            laco.rodar(time.perf_counter() + 0.1)
+        duracao = time.perf_counter() - inicio
+        laco.rodar(time.perf_counter() + 0.1)  # Registra também os quadros que ficaram para trás
+        escritor.parar()
+        banco.fechar()
+    atrasos.sort()
+    return duracao, atrasos[len(atrasos) // 2], atrasos[int(len(atrasos) * 0.99)], atrasos[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transacoes", type=int, default=300000)
+    parser.add_argument("--depositos", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'modo':>9} {'total (s)':>10} {'atraso p50':>11} {'p99':>8} {'máximo':>9}   (ms)")
+    for modo in ("direto", "escritor"):
+        duracao, p50, p99, maximo = medir(modo, args.transacoes, args.depositos)
+        print(f"{modo:>9} {duracao:>10.2f} {p50:>11.1f} {p99:>8.1f} {maximo:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
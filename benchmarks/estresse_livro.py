@@ -0,0 +1,83 @@
+"""
+Teste de estresse do livro-caixa com vários processos simultâneos.
+
+Cada processo dispara depósitos e saques aleatórios no mesmo diretório. No final
+o script confere que o saldo é igual à soma do diário e que nenhuma operação
+aceita foi perdida, e mostra a vazão (operações por segundo).
+
+Uso: python benchmarks/estresse_livro.py --processos 8 --operacoes 500
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from armazenamento import Livro, OperacaoRecusada, SINAIS  # noqa: E402
+from dinheiro import formatar  # noqa: E402
+
+
+# Função executada por cada processo: dispara operações aleatórias e conta as aceitas
+def trabalhador(diretorio, operacoes, semente, fsync_a_cada):
+    aleatorio = random.Random(semente)
+    livro = Livro(diretorio, sincronizar_a_cada=fsync_a_cada)
+    aceitas = 0
+    for _ in range(operacoes):
+        valor = aleatorio.randint(1, 10000)  # Centavos
+        try:
+            if aleatorio.random() < 0.5:
+                livro.registrar("DEPOSITO", valor)
+            else:
+                def validar(saldo_atual, livro, valor=valor):
+                    if saldo_atual < valor:
+                        raise OperacaoRecusada("Saldo insuficiente para saque!")
+                livro.registrar("SAQUE", valor, validar)
+            aceitas += 1
+        except OperacaoRecusada:
+            pass
+    livro.fechar()
+    return aceitas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processos", type=int, default=8)
+    parser.add_argument("--operacoes", type=int, default=500, help="operações por processo")
+    parser.add_argument("--fsync-a-cada", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        inicio = time.perf_counter()
+        with multiprocessing.Pool(args.processos) as pool:
+            aceitas = sum(pool.starmap(
+                trabalhador,
+                [(diretorio, args.operacoes, semente, args.fsync_a_cada) for semente in range(args.processos)],
+            ))
+        duracao = time.perf_counter() - inicio
+
+        livro = Livro(diretorio)
+        saldo = livro.saldo()
+        total = 0
+        registros = 0
+        for transacao in livro:
+            total += SINAIS[transacao["tipo"]] * transacao["centavos"]
+            registros += 1
+            assert transacao["saldo_centavos"] == total, f"saldo encadeado divergente no registro {registros}"
+        livro.fechar()
+
+    disparadas = args.processos * args.operacoes
+    print(f"processos={args.processos} disparadas={disparadas} aceitas={aceitas} registradas={registros}")
+    print(f"saldo={formatar(saldo)} soma do diário={formatar(total)}")
+    print(f"duração={duracao:.2f}s vazão={disparadas / duracao:.0f} ops/s")
+    if registros != aceitas or saldo != total:
+        print("FALHA: saldo e diário divergem")
+        sys.exit(1)
+    print("OK: saldo igual à soma do diário")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Tempo até a janela perceber uma operação feita por outro processo.
+
+Um processo filho faz D depósitos na mesma conta, um a cada `--pausa`
+segundos; o processo principal observa o diário com eventos.Observador e,
+a cada aviso, lê o saldo (como painel_principal.App). Compara o inotify com
+a consulta periódica de os.stat e mostra o atraso entre a gravação e o
+saldo novo lido (mediana, p99 e máximo, em ms) e quantas leituras do
+livro foram feitas.
+
+Uso: python benchmarks/eventos.py --depositos 50 --pausa 0.05
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from banco import Banco  # noqa: E402
+from eventos import Observador  # noqa: E402
+
+
+# Função do processo filho: deposita e informa o momento de cada gravação
+def depositar(diretorio, depositos, pausa, momentos):
+    banco = Banco(diretorio)
+    conta = banco.conta("cliente")
+    for _ in range(depositos):
+        time.sleep(pausa)
+        transacao = conta.depositar(100)
+        momentos.put((transacao["saldo_centavos"], time.time()))
+    banco.fechar()
+
+
+def medir(usar_inotify, depositos, pausa, intervalo):
+    with tempfile.TemporaryDirectory() as diretorio:
+        banco = Banco(diretorio)
+        conta = banco.conta("cliente")
+        conta.depositar(100)
+        vistos, leituras = {}, [0]
+        terminou = threading.Event()
+        final = (depositos + 1) * 100
+
+        def alterado(caminho):
+            leituras[0] += 1
+            saldo = conta.saldo()
+            vistos.setdefault(saldo, time.time())
+            if saldo == final:
+                terminou.set()
+
+        observador = Observador(intervalo=intervalo, usar_inotify=usar_inotify)
+        observador.observar(conta.arquivo_alterado(), alterado)
+        momentos = multiprocessing.Queue()
+        filho = multiprocessing.Process(target=depositar, args=(diretorio, depositos, pausa, momentos))
+        filho.start()
+        gravados = dict(momentos.get(timeout=60) for _ in range(depositos))
+        filho.join()
+        terminou.wait(10)
+        modo = observador.modo
+        observador.parar()
+        banco.fechar()
+    atrasos = sorted((vistos[saldo] - momento) * 1000 for saldo, momento in gravados.items() if saldo in vistos)
+    return modo, len(atrasos), leituras[0], atrasos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--depositos", type=int, default=50)
+    parser.add_argument("--pausa", type=float, default=0.05)
+    parser.add_argument("--intervalo", type=float, default=0.5, help="intervalo da consulta periódica (s)")
+    args = parser.parse_args()
+
+    print(f"{'modo':>9} {'vistos':>7} {'leituras':>9} {'atraso p50':>11} {'p99':>8} {'máximo':>9}   (ms)")
+    for usar_inotify in (True, False):
+        modo, vistos, leituras, atrasos = medir(usar_inotify, args.depositos, args.pausa, args.intervalo)
+        if not atrasos:
+            print(f"{modo:>9} {0:>7} {leituras:>9}")
+            continue
+        p50, p99 = atrasos[len(atrasos) // 2], atrasos[int(len(atrasos) * 0.99)]
+        print(f"{modo:>9} {vistos:>7} {leituras:>9} {p50:>11.1f} {p99:>8.1f} {atrasos[-1]:>9.1f}")
+    print(f"(saldos gravados: {args.depositos}; os não vistos foram sobrepostos por uma gravação seguinte)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Exportação do extrato (exportar.py) para históricos grandes.
+
+Gera uma conta com N transações espalhadas por um ano e mede, para CSV, OFX
+e PDF, o tempo da exportação completa e de um mês filtrado. Com --memoria o
+pico de memória é medido com tracemalloc (que deixa a execução mais lenta).
+
+Uso: python benchmarks/exportar.py --transacoes 1000000 --memoria
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from armazenamento import DIARIO_FILE  # noqa: E402
+from banco import Banco  # noqa: E402
+from exportar import FORMATOS, exportar  # noqa: E402
+
+
+# Função que escreve o diário da conta direto no disco (N transações ao longo de um ano)
+def gerar_diario(pasta, quantidade):
+    inicio = datetime(2024, 1, 1)
+    passo = timedelta(days=366) / quantidade
+    saldo = 0
+    with open(os.path.join(pasta, DIARIO_FILE), "w", encoding="utf-8") as file:
+        for i in range(quantidade):
+            momento = inicio + passo * i
+            tipo = "SAQUE" if i % 4 == 3 else "DEPOSITO"
+            saldo += 50_00 if tipo == "DEPOSITO" else -50_00
+            file.write(json.dumps({"centavos": 50_00, "data": momento.strftime("%d/%m/%Y"),
+                                   "hora": momento.strftime("%H:%M:%S"), "tipo": tipo,
+                                   "saldo_centavos": saldo}) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transacoes", type=int, default=200000)
+    parser.add_argument("--memoria", action="store_true", help="mede o pico de memória com tracemalloc")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        banco = Banco(diretorio)
+        pasta = banco.pasta_da_conta("cliente")
+        os.makedirs(pasta)
+        gerar_diario(pasta, args.transacoes)
+        conta = banco.conta("cliente")
+        print(f"{'formato':>8} {'filtro':>10} {'linhas':>9} {'tempo (s)':>10} {'linhas/s':>11} "
+              f"{'arquivo (MB)':>13}" + (f" {'memória (KiB)':>14}" if args.memoria else ""))
+        for formato in FORMATOS:
+            for filtro, periodo in (("ano", (None, None)), ("junho", ("01/06/2024", "30/06/2024"))):
+                caminho = os.path.join(diretorio, f"extrato.{formato}")
+                if args.memoria:
+                    tracemalloc.start()
+                inicio = time.perf_counter()
+                linhas = exportar(conta, caminho, formato, *periodo)
+                duracao = time.perf_counter() - inicio
+                resultado = (f"{formato:>8} {filtro:>10} {linhas:>9} {duracao:>10.2f} {linhas / duracao:>11,.0f} "
+                             f"{os.path.getsize(caminho) / 1e6:>13.1f}")
+                if args.memoria:
+                    resultado += f" {tracemalloc.get_traced_memory()[1] / 1024:>14.0f}"
+                    tracemalloc.stop()
+                print(resultado)
+        banco.fechar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Vazão de depósitos simultâneos com e sem confirmação em grupo (grupo.py).
+
+Para cada número de threads, todas depositam na mesma conta durante
+--segundos, com fsync a cada confirmação, e mede: operações por segundo,
+latência p50 e p99 de cada depósito e o tamanho médio dos grupos (quantas
+operações cada fsync confirmou). Modos:
+  sozinha   cada operação confirmada por Livro.registrar (um fsync cada)
+  grupo     ConfirmacaoEmGrupo com janela de --janela-ms (esperada só quando há disputa)
+  grupo 0   ConfirmacaoEmGrupo sem janela: o grupo é o que chegou durante o fsync anterior
+No fim confere o saldo com o diário e roda saques simultâneos para mostrar
+que as regras de saque continuam valendo para cada chamador.
+
+Uso: python benchmarks/grupo.py [--threads 1 4 16 64 256] [--segundos 3] [--janela-ms 2]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from armazenamento import Livro, OperacaoRecusada  # noqa: E402
+from banco import Conta  # noqa: E402
+from grupo import ConfirmacaoEmGrupo  # noqa: E402
+
+
+class GrupoContado(ConfirmacaoEmGrupo):
+    """
+    ConfirmacaoEmGrupo que conta os grupos gravados.
+    """
+
+    grupos = 0
+
+    def _confirmar(self, grupo):
+        self.grupos += 1
+        super()._confirmar(grupo)
+
+
+# Função que roda `threads` threads depositando por `segundos` e retorna (latências, operações por fsync)
+def medir(conta, threads, segundos):
+    latencias = []
+    fim = time.perf_counter() + segundos
+
+    def depositar():
+        minhas = []
+        while time.perf_counter() < fim:
+            inicio = time.perf_counter()
+            conta.depositar(100)
+            minhas.append(time.perf_counter() - inicio)
+        latencias.extend(minhas)
+
+    grupos_antes = conta.grupo.grupos if conta.grupo is not None else 0
+    trabalhadores = [threading.Thread(target=depositar) for _ in range(threads)]
+    for trabalhador in trabalhadores:
+        trabalhador.start()
+    for trabalhador in trabalhadores:
+        trabalhador.join()
+    grupos = conta.grupo.grupos - grupos_antes if conta.grupo is not None else len(latencias)
+    return sorted(latencias), len(latencias) / max(1, grupos)
+
+
+# Função que tenta `threads` saques simultâneos e retorna (aceitos, mensagens das recusas)
+def saques_simultaneos(conta, threads):
+    aceitos, recusas = [], {}
+    largada = threading.Barrier(threads)
+
+    def sacar():
+        largada.wait()
+        try:
+            aceitos.append(conta.sacar(100))
+        except OperacaoRecusada as erro:
+            recusas[str(erro)] = recusas.get(str(erro), 0) + 1
+
+    trabalhadores = [threading.Thread(target=sacar) for _ in range(threads)]
+    for trabalhador in trabalhadores:
+        trabalhador.start()
+    for trabalhador in trabalhadores:
+        trabalhador.join()
+    return aceitos, recusas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16, 64, 256])
+    parser.add_argument("--segundos", type=float, default=3)
+    parser.add_argument("--janela-ms", type=float, default=2)
+    args = parser.parse_args()
+
+    modos = [("sozinha", None), (f"grupo {args.janela_ms:g}ms", args.janela_ms / 1000), ("grupo 0", 0.0)]
+    print(f"{'modo':>12} {'threads':>8} {'ops/s':>9} {'p50 (ms)':>9} {'p99 (ms)':>9} {'ops/fsync':>10}")
+    with tempfile.TemporaryDirectory() as diretorio:
+        for nome, janela in modos:
+            pasta = os.path.join(diretorio, nome.replace(" ", "_"))
+            os.makedirs(pasta)
+            livro = Livro(pasta, sincronizar_a_cada=1)
+            conta = Conta(livro, "cliente", grupo=None if janela is None else GrupoContado(livro, janela))
+            for threads in args.threads:
+                latencias, por_fsync = medir(conta, threads, args.segundos)
+                print(f"{nome:>12} {threads:>8} {len(latencias) / args.segundos:>9.0f} "
+                      f"{statistics.median(latencias) * 1000:>9.2f} "
+                      f"{latencias[int(0.99 * (len(latencias) - 1))] * 1000:>9.2f} {por_fsync:>10.1f}")
+            relatorio = conta.verificar()
+            aceitos, recusas = saques_simultaneos(conta, 64)
+            print(f"{'':>12} saldo confere com o diário: {relatorio['ok']} ({relatorio['transacoes']} transações); "
+                  f"64 saques simultâneos: {len(aceitos)} aceitos, recusas {recusas}")
+            conta.fechar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Relatório do tempo de importação (python -X importtime) da tela de login
+e das telas do painel.
+
+Para cada alvo, roda um interpretador novo com -X importtime algumas vezes
+e mostra o tempo total de importação (mediana) e os módulos mais caros
+entre os importados pelo alvo e os importados diretamente por eles:
+  acumulado  tempo do módulo somado ao dos que ele importou
+  próprio    só o tempo do próprio módulo
+O alvo "login" executa a parte de login.py.py que roda antes da janela
+(imports e cadastro do admin), sem abrir a janela.
+
+Uso: python benchmarks/importacao.py [--alvos login painel_principal deposito] [--mais-caros 15]
+"""
+import argparse
+import compileall
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Código que importa cada alvo em um interpretador novo
+CODIGO = {
+    "login": "import runpy; runpy.run_path('login.py.py', run_name='login')",
+}
+
+
+# Função que roda o alvo com -X importtime e retorna [(módulo, próprio µs, acumulado µs, nível)]
+def medir_importacao(alvo):
+    codigo = CODIGO.get(alvo, f"import {alvo}")
+    saida = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo], cwd=RAIZ,
+                           capture_output=True, text=True, check=True)
+    modulos = []
+    for linha in saida.stderr.splitlines():
+        if not linha.startswith("import time:") or "self [us]" in linha:
+            continue
+        proprio, acumulado, nome = linha[len("import time:"):].split("|")
+        nivel = (len(nome) - len(nome.lstrip())) // 2
+        modulos.append((nome.strip(), int(proprio), int(acumulado), nivel))
+    return modulos
+
+
+# Função que soma o tempo de todos os imports feitos pelo interpretador (os de nível mais alto)
+def total_ms(modulos):
+    return sum(acumulado for _, _, acumulado, nivel in modulos if nivel == 0) / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alvos", nargs="+", default=["login", "painel_principal", "deposito", "saque", "extrato"])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--mais-caros", type=int, default=10)
+    args = parser.parse_args()
+
+    # Garante os .pyc do projeto em dia (com PYTHONDONTWRITEBYTECODE o Python não os grava
+    # sozinho, e a compilação dos fontes entraria no tempo de importação)
+    compileall.compile_dir(RAIZ, maxlevels=0, quiet=1)
+    for alvo in args.alvos:
+        execucoes = [medir_importacao(alvo) for _ in range(args.repeticoes)]
+        totais = [total_ms(modulos) for modulos in execucoes]
+        print(f"\n{alvo}: {statistics.median(totais):.1f} ms de importação (mediana de {len(totais)}; "
+              f"mínimo {min(totais):.1f} ms, {len(execucoes[0])} módulos)")
+        melhor = execucoes[totais.index(min(totais))]
+        print(f"  {'módulo':<52} {'acumulado':>10} {'próprio':>9}   (ms)")
+        principais = [modulo for modulo in melhor if modulo[3] <= 1]
+        for nome, proprio, acumulado, nivel in sorted(principais, key=lambda modulo: -modulo[2])[:args.mais_caros]:
+            print(f"  {'  ' * nivel + nome:<52} {acumulado / 1000:>10.1f} {proprio / 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Custo da instrumentação (instrumentacao.py) nas operações mais frequentes.
+
+Mede o tempo médio de Conta.saldo() e Conta.depositar() com a
+instrumentação desligada e ligada, e mostra as métricas coletadas.
+
+Uso: python benchmarks/instrumentacao.py --leituras 100000 --depositos 500
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import instrumentacao  # noqa: E402
+from banco import Banco  # noqa: E402
+
+
+def medir(conta, leituras, depositos):
+    inicio = time.perf_counter()
+    for _ in range(leituras):
+        conta.saldo()
+    saldo = (time.perf_counter() - inicio) / leituras
+    inicio = time.perf_counter()
+    for _ in range(depositos):
+        conta.depositar(100)
+    deposito = (time.perf_counter() - inicio) / depositos
+    return saldo * 1e6, deposito * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--leituras", type=int, default=100000)
+    parser.add_argument("--depositos", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        banco = Banco(diretorio, sincronizar_a_cada=0)
+        conta = banco.conta("cliente")
+        print(f"{'instrumentação':>15} {'saldo() (µs)':>13} {'depositar() (µs)':>17}")
+        for ligada in (False, True):
+            instrumentacao.ativar() if ligada else instrumentacao.desativar()
+            saldo, deposito = medir(conta, args.leituras, args.depositos)
+            print(f"{'ligada' if ligada else 'desligada':>15} {saldo:>13.2f} {deposito:>17.1f}")
+        print()
+        for nome, metrica in sorted(instrumentacao.resumo().items()):
+            print(f"{nome:>26}: {metrica['contagem']:>7} chamadas, p50 <= {metrica['p50'] * 1e6:.0f} µs, "
+                  f"p99 <= {metrica['p99'] * 1e6:.0f} µs, {metrica['bytes_lidos']:,} bytes lidos, "
+                  f"{metrica['bytes_gravados']:,} bytes gravados")
+        instrumentacao.desativar()
+        banco.fechar()
+
+
+if __name__ == "__main__":
+    main()
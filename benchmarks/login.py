@@ -0,0 +1,63 @@
+"""
+Latência do login em função do tamanho do cadastro de usuários.
+
+Para cada tamanho, gera um users.json temporário e mede:
+  - antigo:  reler e interpretar o JSON inteiro a cada tentativa (login antes da cache);
+  - consulta: busca do usuário com a cache em memória (sem o custo do hash);
+  - login:   verificação completa (consulta + PBKDF2 com o custo atual).
+
+Uso: python benchmarks/login.py --tamanhos 10 1000 100000
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from credenciais import Credenciais, gerar_hash  # noqa: E402
+
+
+# Função para medir a mediana (em ms) de `repeticoes` chamadas
+def medir(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[10, 1000, 100000])
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    # Todos os usuários compartilham um hash para gerar cadastros grandes rapidamente
+    hash_padrao = gerar_hash("senha")
+    print(f"{'usuários':>10} {'antigo (ms)':>12} {'consulta (ms)':>14} {'login (ms)':>11}")
+    with tempfile.TemporaryDirectory() as diretorio:
+        for tamanho in args.tamanhos:
+            caminho = os.path.join(diretorio, f"users_{tamanho}.json")
+            usuarios = {f"usuario{i}": hash_padrao for i in range(tamanho)}
+            with open(caminho, "w") as file:
+                json.dump(usuarios, file)
+            alvo = f"usuario{tamanho - 1}"
+
+            def antigo():
+                with open(caminho) as file:
+                    return alvo in json.load(file)
+
+            credenciais = Credenciais(caminho)
+            credenciais.usuarios()  # Aquece a cache
+            consulta = medir(lambda: alvo in credenciais.usuarios(), args.repeticoes)
+            login = medir(lambda: credenciais.verificar(alvo, "senha"), max(3, args.repeticoes // 4))
+            print(f"{tamanho:>10} {medir(antigo, args.repeticoes):>12.3f} {consulta:>14.4f} {login:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Vazão dos lançamentos em lote (lote.py) nos dois motores de armazenamento.
+
+Gera um arquivo com N operações distribuídas entre C contas (depósitos e
+saques, alguns acima do limite por saque ou além dos 3 saques do dia, que
+devem ser recusados), lança o arquivo e confere o saldo de cada conta.
+
+Uso: python benchmarks/lote.py --operacoes 100000 --contas 100
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from banco import Banco  # noqa: E402
+from lote import lancar_arquivo  # noqa: E402
+
+
+# Função que escreve o arquivo de lote em CSV
+def gerar_arquivo(caminho, operacoes, contas):
+    aleatorio = random.Random(3)
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        arquivo.write("conta;tipo;valor\n")
+        for _ in range(operacoes):
+            conta = f"cliente{aleatorio.randrange(contas)}"
+            if aleatorio.random() < 0.9:
+                arquivo.write(f"{conta};DEPOSITO;{aleatorio.randint(1, 5000)},{aleatorio.randint(0, 99):02d}\n")
+            else:
+                arquivo.write(f"{conta};SAQUE;{aleatorio.randint(1, 700)}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operacoes", type=int, default=100000)
+    parser.add_argument("--contas", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'motor':>7} {'operações':>10} {'aceitas':>9} {'recusadas':>10} {'tempo (s)':>10} {'ops/s':>10}")
+    for motor in ("json", "sqlite"):
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho = os.path.join(diretorio, "lote.csv")
+            gerar_arquivo(caminho, args.operacoes, args.contas)
+            banco = Banco(diretorio, motor=motor)
+            relatorio = lancar_arquivo(banco, caminho, criar_contas=True)
+            for nome in banco.nomes():
+                resultado = banco.conta(nome).verificar()
+                assert resultado["ok"], (nome, resultado["divergencias"])
+                assert banco.conta(nome).livro.saques_do_dia(
+                    banco.conta(nome).extrato(0, 1)[0]["data"])[0] <= banco.conta(nome).limite_saques_dia
+            banco.fechar()
+            print(f"{motor:>7} {relatorio['linhas']:>10} {relatorio['aceitas']:>9} {len(relatorio['recusas']):>10} "
+                  f"{relatorio['segundos']:>10.2f} {relatorio['operacoes_por_segundo']:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
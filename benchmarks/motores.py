@@ -0,0 +1,128 @@
+"""
+Compara os motores de armazenamento JSON (diário + índices) e SQLite.
+
+Para cada tamanho de histórico gera uma conta sintética nos dois motores e mede:
+  - depósito:     latência de uma operação confirmada;
+  - limite saque: tentativa de saque (consulta do limite diário + gravação);
+  - saldo:        leitura do saldo com a conta já aberta;
+  - página:       leitura de 10 transações em uma posição aleatória do extrato.
+
+Uso: python benchmarks/motores.py --tamanhos 1000 100000 1000000
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from armazenamento import DIARIO_FILE  # noqa: E402
+from armazenamento_sqlite import SQLITE_FILE, BaseSQLite, LivroSQLite, dia_iso  # noqa: E402
+from banco import Banco, OperacaoRecusada  # noqa: E402
+
+
+# Função que gera um histórico sintético: (tipo, centavos, data, hora, saldo em centavos)
+def historico(tamanho):
+    aleatorio = random.Random(1)
+    inicio = datetime.now() - timedelta(minutes=tamanho)
+    saldo = 0
+    for i in range(tamanho):
+        momento = inicio + timedelta(minutes=i)
+        if saldo >= 50_00 and aleatorio.random() < 0.4:
+            tipo, valor = "SAQUE", 50_00
+            saldo -= valor
+        else:
+            tipo, valor = "DEPOSITO", 100_00
+            saldo += valor
+        yield tipo, valor, momento.strftime("%d/%m/%Y"), momento.strftime("%H:%M:%S"), saldo
+
+
+# Função para medir a mediana (em µs) de `repeticoes` chamadas
+def medir(funcao, repeticoes):
+    tempos = []
+    for i in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(i)
+        tempos.append((time.perf_counter() - inicio) * 1e6)
+    return statistics.median(tempos)
+
+
+# Função que mede as operações de uma conta (mesmas para os dois motores)
+def medir_conta(conta, tamanho, repeticoes):
+    def sacar(i):
+        try:
+            conta.sacar(1_00)
+        except OperacaoRecusada:
+            pass
+    return {
+        "depósito": medir(lambda i: conta.depositar(1_00), repeticoes),
+        "limite saque": medir(sacar, repeticoes),
+        "saldo": medir(lambda i: conta.saldo(), repeticoes * 10),
+        "página": medir(lambda i: conta.extrato(random.randrange(tamanho), 10), repeticoes * 10),
+    }
+
+
+# Função que imprime uma linha da tabela de resultados
+def imprimir(tamanho, motor, carga, abertura, resultado):
+    print(f"{tamanho:>11} {motor:>7} {carga:>10.2f} {abertura:>14.1f} {resultado['depósito']:>10.0f} "
+          f"{resultado['limite saque']:>13.0f} {resultado['saldo']:>8.0f} {resultado['página']:>8.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--repeticoes", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'transações':>11} {'motor':>7} {'carga (s)':>10} {'abertura (ms)':>14} "
+          f"{'depósito':>10} {'limite saque':>13} {'saldo':>8} {'página':>8}   (µs, mediana)")
+    for tamanho in args.tamanhos:
+        with tempfile.TemporaryDirectory() as diretorio:
+            # Motor JSON: escreve o diário direto e deixa o livro reconstruir os índices na abertura
+            banco = Banco(diretorio, motor="json")
+            pasta = banco.pasta_da_conta("cliente")
+            os.makedirs(pasta)
+            inicio = time.perf_counter()
+            with open(os.path.join(pasta, DIARIO_FILE), "w", encoding="utf-8") as file:
+                for tipo, valor, data, hora, saldo in historico(tamanho):
+                    file.write(json.dumps({"centavos": valor, "data": data, "hora": hora, "tipo": tipo,
+                                           "saldo_centavos": saldo}) + "\n")
+            carga = time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            conta = banco.conta("cliente")
+            conta.saldo()
+            abertura = (time.perf_counter() - inicio) * 1000
+            resultado = medir_conta(conta, tamanho, args.repeticoes)
+            banco.fechar()
+            imprimir(tamanho, "json", carga, abertura, resultado)
+
+            # Motor SQLite: carga em massa com executemany
+            base = BaseSQLite(os.path.join(diretorio, SQLITE_FILE), sincronizar_a_cada=10**9)
+            inicio = time.perf_counter()
+            base.conexao.execute("BEGIN")
+            base.conexao.executemany(
+                "INSERT INTO transacoes (conta, seq, tipo, centavos, data, hora, dia, saldo_centavos) "
+                "VALUES ('cliente', ?, ?, ?, ?, ?, ?, ?)",
+                ((seq, tipo, valor, data, hora, dia_iso(data), saldo)
+                 for seq, (tipo, valor, data, hora, saldo) in enumerate(historico(tamanho))))
+            base.conexao.execute("COMMIT")
+            LivroSQLite(base, "cliente").reconstruir_indices()
+            carga = time.perf_counter() - inicio
+            base.fechar()
+            banco = Banco(diretorio, motor="sqlite")
+            inicio = time.perf_counter()
+            conta = banco.conta("cliente")
+            conta.saldo()
+            abertura = (time.perf_counter() - inicio) * 1000
+            resultado = medir_conta(conta, tamanho, args.repeticoes)
+            banco.fechar()
+            imprimir(tamanho, "sqlite", carga, abertura, resultado)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Consulta de um mês do extrato: índice de tempo contra varredura do diário.
+
+Gera N transações ao longo de um ano e mede, para um mês, o tempo para
+contar as transações e ler a primeira página (com e sem filtro de tipo),
+comparado com percorrer o diário inteiro filtrando data e tipo.
+
+Uso: python benchmarks/periodo.py --transacoes 1000000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from banco import Banco  # noqa: E402
+from exportar import chave_data  # noqa: E402
+
+
+# Função que escreve o diário da conta direto no disco (N transações ao longo de 2024)
+def gerar_diario(pasta, quantidade):
+    inicio = datetime(2024, 1, 1)
+    passo = timedelta(days=366) / quantidade
+    saldo = 0
+    with open(os.path.join(pasta, "transacoes.jsonl"), "w", encoding="utf-8") as file:
+        for i in range(quantidade):
+            momento = inicio + passo * i
+            tipo = "SAQUE" if i % 4 == 3 else "DEPOSITO"
+            saldo += 50_00 if tipo == "DEPOSITO" else -50_00
+            file.write(json.dumps({"centavos": 50_00, "data": momento.strftime("%d/%m/%Y"),
+                                   "hora": momento.strftime("%H:%M:%S"), "ts": int(momento.strftime("%Y%m%d%H%M%S")),
+                                   "tipo": tipo, "saldo_centavos": saldo}) + "\n")
+
+
+# Função que mede o tempo (ms) de uma chamada
+def medir(funcao):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return (time.perf_counter() - inicio) * 1000, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transacoes", type=int, default=200000)
+    args = parser.parse_args()
+    de, ate = "01/06/2024", "30/06/2024"
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        banco = Banco(diretorio)
+        pasta = banco.pasta_da_conta("cliente")
+        os.makedirs(pasta)
+        gerar_diario(pasta, args.transacoes)
+        conta = banco.conta("cliente")
+        duracao, _ = medir(conta.saldo)
+        print(f"criação dos índices: {duracao:.0f} ms")
+
+        for tipo in (None, "SAQUE"):
+            def varredura():
+                return sum(1 for transacao in conta.transacoes()
+                           if chave_data(de) <= chave_data(transacao["data"]) <= chave_data(ate)
+                           and (tipo is None or transacao["tipo"] == tipo))
+            # Cada filtro novo desfaz a seleção guardada pelo livro
+            indice, quantidade = medir(lambda: (conta.quantidade_transacoes(de, ate, tipo),
+                                                conta.extrato(0, 20, de, ate, tipo))[0])
+            varrido, esperado = medir(varredura)
+            assert quantidade == esperado
+            print(f"junho, tipo={tipo or 'todos':<8} {quantidade:>8} transações   "
+                  f"índice: {indice:>8.1f} ms   varredura: {varrido:>9.1f} ms")
+        banco.fechar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Tempo de recuperação do saldo e custo da verificação em função do histórico.
+
+Para cada tamanho gera um diário sintético, cria os pontos de controle e mede:
+  - recuperação com pontos: saldo.json apagado, o saldo é retomado do último ponto;
+  - recuperação sem pontos: saldo.json e saldo.pontos apagados (reaplica tudo);
+  - verificar / verificar --rapido: tempo e pico de memória (tracemalloc).
+
+Uso: python benchmarks/recuperacao.py --tamanhos 100000 1000000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from armazenamento import DIARIO_FILE, PONTOS_FILE, SALDO_FILE, Livro  # noqa: E402
+
+
+# Função que escreve um diário sintético com `tamanho` depósitos de R$1,00
+def gerar_diario(diretorio, tamanho):
+    agora = datetime.now()
+    data, hora = agora.strftime("%d/%m/%Y"), agora.strftime("%H:%M:%S")
+    with open(os.path.join(diretorio, DIARIO_FILE), "w", encoding="utf-8") as file:
+        for i in range(1, tamanho + 1):
+            file.write(json.dumps({"centavos": 100, "data": data, "hora": hora, "tipo": "DEPOSITO",
+                                   "saldo_centavos": i * 100}) + "\n")
+
+
+# Função que mede o tempo (ms) para um Livro recém-aberto devolver o saldo
+def recuperar(diretorio, apagar):
+    for nome in apagar:
+        os.remove(os.path.join(diretorio, nome))
+    livro = Livro(diretorio)
+    inicio = time.perf_counter()
+    livro.saldo()
+    duracao = (time.perf_counter() - inicio) * 1000
+    livro.fechar()
+    return duracao
+
+
+# Função que mede tempo (s) e pico de memória (KiB) de Livro.verificar
+def medir_verificacao(diretorio, desde_ultimo_ponto):
+    livro = Livro(diretorio)
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    relatorio = livro.verificar(desde_ultimo_ponto)
+    duracao = time.perf_counter() - inicio
+    pico = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+    livro.fechar()
+    assert relatorio["ok"], relatorio["divergencias"]
+    return duracao, pico
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    print(f"{'transações':>11} {'c/ pontos (ms)':>15} {'s/ pontos (ms)':>15} "
+          f"{'verificar (s)':>14} {'memória (KiB)':>14} {'rápido (ms)':>12}")
+    for tamanho in args.tamanhos:
+        with tempfile.TemporaryDirectory() as diretorio:
+            gerar_diario(diretorio, tamanho)
+            Livro(diretorio).reconstruir_indices()  # Cria saldo.json, índices e pontos de controle
+            completo, memoria = medir_verificacao(diretorio, False)
+            rapido, _ = medir_verificacao(diretorio, True)
+            com_pontos = recuperar(diretorio, [SALDO_FILE])
+            sem_pontos = recuperar(diretorio, [SALDO_FILE, PONTOS_FILE])
+        print(f"{tamanho:>11} {com_pontos:>15.1f} {sem_pontos:>15.1f} "
+              f"{completo:>14.2f} {memoria:>14.0f} {rapido * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Custo de conferir uma sessão (sessoes.py) comparado ao login por senha.
+
+Mede, com --sessoes sessões abertas:
+  - validar:     GerenciadorSessoes.validar de um token aleatório (µs por chamada);
+  - re-entrada:  validar um token de outro processo (mesma chave), como a
+                 tela de login faz com a sessão salva;
+  - senha:       Credenciais.verificar (PBKDF2), o que cada tela pagaria sem sessão;
+  - memória:     pico de memória das sessões abertas (tracemalloc, medido à parte);
+  - ociosas:     com um relógio falso, quanto custa descartar todas depois de
+                 OCIOSO segundos sem uso, e quantas sobram.
+Também confere que o limite de sessões em memória é respeitado.
+
+Uso: python benchmarks/sessoes.py [--sessoes 100000] [--repeticoes 100000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from credenciais import Credenciais  # noqa: E402
+from sessoes import OCIOSO, GerenciadorSessoes  # noqa: E402
+
+
+# Função que retorna os microssegundos por chamada de `funcao` sobre cada item
+def por_chamada(funcao, itens):
+    inicio = time.perf_counter()
+    for item in itens:
+        funcao(item)
+    return (time.perf_counter() - inicio) / len(itens) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessoes", type=int, default=100_000)
+    parser.add_argument("--repeticoes", type=int, default=100_000)
+    args = parser.parse_args()
+
+    chave = os.urandom(32)
+    relogio = [time.time()]
+    sessoes = GerenciadorSessoes(chave, maximo=args.sessoes, relogio=lambda: relogio[0])
+    tokens = [sessoes.criar(f"usuario{i}") for i in range(args.sessoes)]
+    aleatorio = random.Random(1)
+    amostra = [aleatorio.choice(tokens) for _ in range(args.repeticoes)]
+    print(f"{f'validar ({args.sessoes} sessões abertas)':<40} {por_chamada(sessoes.validar, amostra):8.2f} µs")
+
+    outro = GerenciadorSessoes(chave, maximo=args.sessoes)  # Outro processo com a mesma chave
+    print(f"{'re-entrada (token de outro processo)':<40} {por_chamada(outro.validar, tokens[:args.repeticoes]):8.2f} µs")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        credenciais = Credenciais(os.path.join(diretorio, "users.json"))
+        credenciais.definir_senha("usuario0", "senha")
+        print(f"{'senha (Credenciais.verificar)':<40} {por_chamada(lambda _: credenciais.verificar('usuario0', 'senha'), range(20)):8.0f} µs")
+
+    tracemalloc.start()
+    medidas = GerenciadorSessoes(chave, maximo=args.sessoes)
+    for i in range(args.sessoes):
+        medidas.criar(f"usuario{i}")
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{f'memória de {args.sessoes} sessões':<40} {pico / 2**20:8.1f} MB ({pico / args.sessoes:.0f} bytes cada)")
+
+    for i in range(args.sessoes // 10):  # Limite: as mais antigas saem
+        medidas.criar(f"extra{i}")
+    print(f"limite de {args.sessoes} sessões respeitado: {len(medidas) == args.sessoes}")
+
+    relogio[0] += OCIOSO + 1
+    inicio = time.perf_counter()
+    restante = sessoes.validar(tokens[0])
+    print(f"ociosas descartadas em {(time.perf_counter() - inicio) * 1000:.1f} ms; "
+          f"sobraram {len(sessoes)}; token antigo aceito: {restante is not None}")
+
+
+if __name__ == "__main__":
+    main()
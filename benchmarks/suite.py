@@ -0,0 +1,269 @@
+"""
+Conjunto de benchmarks do livro, do extrato, do login e da abertura das
+telas, com comparação contra uma base guardada.
+
+Para cada tamanho de histórico (padrão: 1 mil, 100 mil e 1 milhão de
+transações) gera uma conta sintética e mede, em ms (mediana de várias
+repetições):
+  abrir            abrir a conta já existente (carregar saldo e índices)
+  deposito         gravar um depósito
+  saque            gravar um saque (conferindo as regras de saque)
+  limite_diario    só a conferência das regras de saque usada por saque.salvar_valor
+  extrato_inicio   quantidade + primeira página do extrato (como a ListaVirtual)
+  extrato_fim      última página do extrato
+  extrato_filtrado saques de um mês: quantidade + primeira página
+  resumo           resumo da conta (totais por mês e saques disponíveis hoje)
+Além disso: login (consulta no cadastro e verificação completa da senha) e,
+em um interpretador novo para cada tela (inclusive a de login), o tempo de
+importação e, se houver tela gráfica (DISPLAY ou xvfb-run), o de criação
+da tela até o primeiro quadro. Para ver quais módulos pesam na importação,
+use benchmarks/importacao.py.
+
+Os resultados vão para um JSON (--saida) e são comparados com a base
+(--base, padrão benchmarks/base.json): casos mais lentos que a base além
+de --limiar (comparando o mínimo das repetições) são listados e o
+processo termina com código 1.
+
+Uso: python benchmarks/suite.py [--tamanhos 1000 100000 1000000] [--gravar-base]
+"""
+import argparse
+import compileall
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from armazenamento import DIARIO_FILE  # noqa: E402
+from banco import Banco  # noqa: E402
+from credenciais import Credenciais, gerar_hash  # noqa: E402
+
+BASE = os.path.join(RAIZ, "benchmarks", "base.json")
+TELAS = ("login", "painel_principal", "deposito", "saque", "extrato", "resumo")
+PISO_MS = 0.5  # Diferenças menores que isso são ruído (fsync, cache da máquina), mesmo que passem do limiar
+
+# Script rodado em um interpretador novo para medir a abertura de cada tela
+ABRIR_TELA = """
+import json, time
+inicio = time.perf_counter()
+import {modulo}
+resultado = {{"importar": (time.perf_counter() - inicio) * 1000}}
+if {construir}:
+    import painel_principal
+    from banco import Banco
+    inicio = time.perf_counter()
+    app = painel_principal.App(tela_inicial={tela!r}, conta=Banco({diretorio!r}).conta("cliente"))
+    app.update()
+    resultado["criar"] = (time.perf_counter() - inicio) * 1000
+    app.fechar()
+print(json.dumps(resultado))
+"""
+
+# O mesmo para a tela de login: importação e primeiro quadro da janela
+ABRIR_LOGIN = """
+import json, runpy, time
+inicio = time.perf_counter()
+login = runpy.run_path("login.py.py", run_name="login")
+resultado = {{"importar": (time.perf_counter() - inicio) * 1000}}
+if {construir}:
+    inicio = time.perf_counter()
+    janela = login["criar_janela_login"]()
+    janela.update()
+    resultado["criar"] = (time.perf_counter() - inicio) * 1000
+    janela.destroy()
+print(json.dumps(resultado))
+"""
+
+
+# Função para medir a mediana (em ms) de `repeticoes` chamadas
+def medir(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return {"mediana": statistics.median(tempos), "minimo": min(tempos), "repeticoes": repeticoes}
+
+
+# Função que gera o diário de uma conta com `transacoes` lançamentos em dois anos, sem índices
+def gerar_conta(banco, nome, transacoes):
+    aleatorio = random.Random(transacoes)
+    pasta = banco.pasta_da_conta(nome)
+    os.makedirs(pasta)
+    saldo, inicio = 0, time.mktime((2023, 1, 1, 8, 0, 0, 0, 0, -1))
+    passo = 2 * 365 * 86400 / transacoes
+    with open(os.path.join(pasta, DIARIO_FILE), "w", encoding="utf-8") as arquivo:
+        for i in range(transacoes):
+            momento = time.localtime(inicio + i * passo)
+            centavos = aleatorio.randint(100, 50000)
+            tipo = "SAQUE" if saldo >= centavos and aleatorio.random() < 0.3 else "DEPOSITO"
+            saldo += centavos if tipo == "DEPOSITO" else -centavos
+            arquivo.write(json.dumps({"centavos": centavos, "data": time.strftime("%d/%m/%Y", momento),
+                                      "hora": time.strftime("%H:%M:%S", momento),
+                                      "ts": int(time.strftime("%Y%m%d%H%M%S", momento)),
+                                      "tipo": tipo, "saldo_centavos": saldo}) + "\n")
+
+
+# Função que roda os casos do livro e do extrato para um tamanho de histórico
+def casos_do_livro(diretorio, transacoes, repeticoes):
+    banco = Banco(diretorio)
+    gerar_conta(banco, "cliente", transacoes)
+    pasta = banco.pasta_da_conta("cliente")
+
+    def reconstruir():
+        # Apaga tudo menos o diário: a abertura seguinte reconstrói saldo e índices
+        for arquivo in os.listdir(pasta):
+            if arquivo != DIARIO_FILE:
+                os.remove(os.path.join(pasta, arquivo))
+        novo = Banco(diretorio)
+        novo.conta("cliente").saldo()
+        novo.fechar()
+    resultados = {"reconstruir": medir(reconstruir, 3 if transacoes <= 100000 else 1)}
+
+    def abrir():
+        novo = Banco(diretorio)
+        novo.conta("cliente").saldo()
+        novo.fechar()
+    resultados["abrir"] = medir(abrir, max(repeticoes // 4, 3))
+
+    banco = Banco(diretorio)
+    conta = banco.conta("cliente")
+    conta.limite_saques_dia = 10 ** 9  # O benchmark saca várias vezes no mesmo dia
+    resultados["deposito"] = medir(lambda: conta.depositar(10000), repeticoes)
+    resultados["saque"] = medir(lambda: conta.sacar(100), repeticoes)
+    validar = conta._validar_saque(100)
+    resultados["limite_diario"] = medir(lambda: validar(conta.saldo(), conta.livro), repeticoes * 10)
+
+    total = conta.quantidade_transacoes()
+    resultados["extrato_inicio"] = medir(lambda: (conta.quantidade_transacoes(), conta.extrato(0, 50)), repeticoes)
+    resultados["extrato_fim"] = medir(lambda: conta.extrato(total - 50, 50), repeticoes)
+    resultados["extrato_filtrado"] = medir(
+        lambda: (conta.quantidade_transacoes("01/06/2024", "30/06/2024", "SAQUE"),
+                 conta.extrato(0, 50, "01/06/2024", "30/06/2024", "SAQUE")), repeticoes)
+    resultados["resumo"] = medir(conta.resumo, repeticoes)
+    banco.fechar()
+    return resultados
+
+
+# Função que mede o login com um cadastro de mil usuários
+def casos_do_login(diretorio, repeticoes):
+    caminho = os.path.join(diretorio, "users.json")
+    registro = gerar_hash("senha")
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump({f"usuario{i}": registro for i in range(1000)}, arquivo)
+    credenciais = Credenciais(caminho)
+    return {
+        "consulta": medir(lambda: credenciais.usuarios().get("usuario500"), repeticoes * 10),
+        "verificar": medir(lambda: credenciais.verificar("usuario500", "senha"), max(repeticoes // 10, 3)),
+    }
+
+
+# Função que mede, em interpretadores novos, a importação e a criação de cada tela
+def casos_das_telas(diretorio, repeticoes):
+    Banco(diretorio).conta("cliente").depositar(100)
+    compileall.compile_dir(RAIZ, maxlevels=0, quiet=1)  # .pyc em dia: mede a importação, não a compilação
+    comando = [sys.executable]
+    construir = bool(os.environ.get("DISPLAY"))
+    if not construir and shutil.which("xvfb-run"):
+        comando, construir = ["xvfb-run", "-a", sys.executable], True
+    resultados = {}
+    for modulo in TELAS:
+        tela = "painel" if modulo == "painel_principal" else modulo
+        if modulo == "login":
+            script = ABRIR_LOGIN.format(construir=construir)
+        else:
+            script = ABRIR_TELA.format(modulo=modulo, construir=construir, tela=tela, diretorio=diretorio)
+        tempos = {}
+        for _ in range(max(repeticoes // 5, 3)):
+            saida = subprocess.run(comando + ["-c", script], cwd=RAIZ, capture_output=True, text=True, check=True)
+            for chave, valor in json.loads(saida.stdout.strip().splitlines()[-1]).items():
+                tempos.setdefault(chave, []).append(valor)
+        for chave, valores in tempos.items():
+            resultados[f"{chave}_{tela}"] = {"mediana": statistics.median(valores), "minimo": min(valores),
+                                              "repeticoes": len(valores)}
+        if not construir:
+            resultados[f"criar_{tela}"] = {"pulado": "sem DISPLAY nem xvfb-run"}
+    return resultados
+
+
+# Função que compara os resultados com a base e retorna os casos que ficaram mais lentos.
+# Compara o mínimo das repetições, bem menos sujeito a ruído da máquina que a mediana.
+def comparar(casos, base, limiar):
+    regressoes = []
+    for nome, atual in sorted(casos.items()):
+        anterior = base.get(nome)
+        if anterior is None or "minimo" not in atual or "minimo" not in anterior:
+            continue
+        diferenca = atual["minimo"] - anterior["minimo"]
+        variacao = diferenca / anterior["minimo"] if anterior["minimo"] else 0.0
+        marca = ""
+        if variacao > limiar and diferenca > PISO_MS:
+            marca = "  <-- mais lento"
+            regressoes.append(nome)
+        print(f"{nome:>34} {anterior['minimo']:>11.3f} {atual['minimo']:>11.3f} {variacao:>+8.1%}{marca}")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--repeticoes", type=int, default=40)
+    parser.add_argument("--saida", default="resultados_benchmarks.json")
+    parser.add_argument("--base", default=BASE)
+    parser.add_argument("--limiar", type=float, default=1.0,
+                        help="piora tolerada em relação à base (1.0 = duas vezes mais lento)")
+    parser.add_argument("--gravar-base", action="store_true", help="grava os resultados como a nova base")
+    args = parser.parse_args()
+
+    casos = {}
+    with tempfile.TemporaryDirectory() as diretorio:
+        for transacoes in args.tamanhos:
+            print(f"livro com {transacoes:,} transações...", flush=True)
+            pasta = os.path.join(diretorio, f"livro{transacoes}")
+            for nome, resultado in casos_do_livro(pasta, transacoes, args.repeticoes).items():
+                casos[f"livro_{transacoes}/{nome}"] = resultado
+        print("login...", flush=True)
+        for nome, resultado in casos_do_login(diretorio, args.repeticoes).items():
+            casos[f"login/{nome}"] = resultado
+        print("telas...", flush=True)
+        for nome, resultado in casos_das_telas(os.path.join(diretorio, "telas"), args.repeticoes).items():
+            casos[f"telas/{nome}"] = resultado
+
+    relatorio = {
+        "gerado_em": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "ambiente": {"python": platform.python_version(), "sistema": platform.platform(),
+                     "processador": platform.processor() or platform.machine(), "cpus": os.cpu_count()},
+        "unidade": "ms",
+        "casos": casos,
+    }
+    with open(args.saida, "w", encoding="utf-8") as arquivo:
+        json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+    print(f"\nresultados gravados em {args.saida}\n")
+
+    if args.gravar_base:
+        shutil.copyfile(args.saida, args.base)
+        print(f"base atualizada: {args.base}")
+        return
+    if not os.path.exists(args.base):
+        print(f"sem base para comparar ({args.base}); use --gravar-base")
+        return
+    with open(args.base, "r", encoding="utf-8") as arquivo:
+        base = json.load(arquivo)
+    print(f"{'caso (mínimo)':>34} {'base (ms)':>11} {'atual (ms)':>11} {'variação':>8}")
+    regressoes = comparar(casos, base["casos"], args.limiar)
+    if regressoes:
+        print(f"\n{len(regressoes)} casos mais lentos que a base (limiar {args.limiar:.0%})")
+        sys.exit(1)
+    print("\nnenhuma regressão em relação à base")
+
+
+if __name__ == "__main__":
+    main()
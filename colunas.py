@@ -0,0 +1,145 @@
+import bisect  # Limites de cada mês na coluna de chaves (sem NumPy)
+import time  # Medição do tempo de carga e de agregação
+from array import array  # Colunas compactas de inteiros de 8 bytes
+from itertools import accumulate  # Saldo acumulado (sem NumPy)
+
+try:
+    import numpy  # Agregações vetorizadas (opcional: pip install numpy)
+except ImportError:
+    numpy = None
+
+from armazenamento import IndiceTempo
+from dinheiro import formatar
+from instrumentacao import medido
+
+# Histórico em colunas: em vez de um dicionário por transação, duas colunas
+# de inteiros de 8 bytes, uma entrada por transação (ver Livro.colunas):
+#   chaves:  carimbo aaaammddhhmmss * 4 + código do tipo (1 depósito, 2 saque), em ordem
+#   valores: centavos com sinal (saques negativos)
+# São 24 bytes por transação no disco (índice de tempo + coluna de valores) e
+# 16 na memória, contra ~110 bytes no diário e ~400 de um dicionário Python.
+# Com NumPy as agregações rodam vetorizadas; sem ele, em array e funções
+# nativas (sum, filter, accumulate), mais lentas mas sem laço em Python por transação.
+
+DEPOSITO = IndiceTempo.CODIGOS["DEPOSITO"]
+SAQUE = IndiceTempo.CODIGOS["SAQUE"]
+
+
+# Função que extrai o mês (aaaamm) de uma chave
+def mes_da_chave(chave):
+    return (chave >> 2) // 100_000_000
+
+
+class Colunas:
+    """
+    Histórico de uma conta em colunas, com os totais por mês e tipo e o
+    saldo acumulado. `chaves` e `valores` são buffers de inteiros de 8 bytes
+    (array("q")); com NumPy eles são usados sem cópia.
+    """
+
+    def __init__(self, chaves, valores, usar_numpy=True):
+        self.usar_numpy = usar_numpy and numpy is not None
+        if self.usar_numpy:
+            self.chaves = numpy.frombuffer(chaves, dtype=numpy.int64)
+            self.valores = numpy.frombuffer(valores, dtype=numpy.int64)
+        else:
+            self.chaves, self.valores = chaves, valores
+
+    def __len__(self):
+        return len(self.valores)
+
+    def saldos(self):
+        """
+        Saldo depois de cada transação (array de inteiros, em centavos).
+        """
+        if self.usar_numpy:
+            return numpy.cumsum(self.valores)
+        return array("q", accumulate(self.valores))
+
+    def _meses(self):
+        """
+        Meses com transações e o trecho de cada um nas colunas: [(aaaamm, início, fim)].
+        As chaves estão em ordem, então cada mês é um trecho contínuo.
+        """
+        if not len(self):
+            return []
+        meses, mes, ultimo = [], mes_da_chave(int(self.chaves[0])), mes_da_chave(int(self.chaves[-1]))
+        while mes <= ultimo:
+            meses.append(mes)
+            mes = mes + 1 if mes % 100 < 12 else (mes // 100 + 1) * 100 + 1
+        limites = [mes * 100_000_000 * 4 for mes in meses[1:]]  # Primeira chave possível de cada mês seguinte
+        if self.usar_numpy:
+            fins = numpy.searchsorted(self.chaves, limites).tolist()
+        else:
+            fins = [bisect.bisect_left(self.chaves, limite) for limite in limites]
+        fins.append(len(self))
+        trechos, inicio = [], 0
+        for mes, fim in zip(meses, fins):
+            if fim > inicio:
+                trechos.append((mes, inicio, fim))
+            inicio = fim
+        return trechos
+
+    @medido("colunas.totais_por_mes")
+    def totais_por_mes(self):
+        """
+        Totais de cada mês com transações, em ordem: lista de dicionários com
+        "mes" ("aaaa-mm"), "depositos" e "saques" (centavos, positivos),
+        "quantidade_depositos", "quantidade_saques" e "saldo_final".
+        """
+        trechos = self._meses()
+        if not trechos:
+            return []
+        if self.usar_numpy:
+            inicios = numpy.array([inicio for _, inicio, _ in trechos], dtype=numpy.intp)
+            tipos = self.chaves & 3
+            eh_deposito, eh_saque = tipos == DEPOSITO, tipos == SAQUE
+            depositos = numpy.add.reduceat(numpy.where(eh_deposito, self.valores, 0), inicios).tolist()
+            saques = (-numpy.add.reduceat(numpy.where(eh_saque, self.valores, 0), inicios)).tolist()
+            quantidade_depositos = numpy.add.reduceat(eh_deposito, inicios, dtype=numpy.int64).tolist()
+            quantidade_saques = numpy.add.reduceat(eh_saque, inicios, dtype=numpy.int64).tolist()
+        else:
+            # Sem NumPy o tipo vem do sinal do valor: depósitos positivos, saques negativos
+            depositos, saques, quantidade_depositos, quantidade_saques = [], [], [], []
+            for _, inicio, fim in trechos:
+                fatia = self.valores[inicio:fim]
+                depositos.append(sum(filter((0).__lt__, fatia)))
+                saques.append(-sum(filter((0).__gt__, fatia)))
+                quantidade_depositos.append(sum(map((0).__lt__, fatia)))
+                quantidade_saques.append(sum(map((0).__gt__, fatia)))
+        totais, saldo = [], 0
+        for i, (mes, _, _) in enumerate(trechos):
+            saldo += depositos[i] - saques[i]
+            totais.append({
+                "mes": f"{mes // 100:04d}-{mes % 100:02d}",
+                "depositos": depositos[i],
+                "quantidade_depositos": quantidade_depositos[i],
+                "saques": saques[i],
+                "quantidade_saques": quantidade_saques[i],
+                "saldo_final": saldo,
+            })
+        return totais
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from banco import CONTA_PADRAO, obter_banco
+
+    # python colunas.py [--conta admin] [--sem-numpy]
+    parser = argparse.ArgumentParser(description="Totais por mês e tipo de uma conta, a partir das colunas binárias.")
+    parser.add_argument("--conta", default=CONTA_PADRAO)
+    parser.add_argument("--sem-numpy", action="store_true", help="usa só array, mesmo com NumPy instalado")
+    args = parser.parse_args()
+    inicio = time.perf_counter()
+    colunas = Colunas(*obter_banco().conta(args.conta).livro.colunas(), usar_numpy=not args.sem_numpy)
+    carga = time.perf_counter() - inicio
+    totais = colunas.totais_por_mes()
+    agregacao = time.perf_counter() - inicio - carga
+    print(f"{'mês':<8} {'depósitos':>16} {'qtd':>8} {'saques':>16} {'qtd':>8} {'saldo final':>18}")
+    for total in totais:
+        print(f"{total['mes']:<8} {formatar(total['depositos'], True):>16} {total['quantidade_depositos']:>8} "
+              f"{formatar(total['saques'], True):>16} {total['quantidade_saques']:>8} "
+              f"{formatar(total['saldo_final'], True):>18}")
+    print(f"\n{len(colunas)} transações: carga {carga * 1000:.0f} ms, agregação {agregacao * 1000:.0f} ms "
+          f"({'NumPy' if colunas.usar_numpy else 'array'})")
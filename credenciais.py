@@ -0,0 +1,143 @@
+import hashlib  # PBKDF2 para derivar o hash das senhas
+import hmac  # Comparação de hashes em tempo constante
+import os  # Para manipular arquivos do sistema
+import threading  # Protege a cache quando a verificação roda em outra thread
+
+from armazenamento import gravar_json_atomico, ler_json
+from instrumentacao import medido
+
+# Nome do arquivo JSON onde os dados dos usuários são armazenados
+USER_DATA_FILE = "users.json"
+
+# Custo do hash: número de iterações do PBKDF2-SHA256. Aumente com o tempo;
+# senhas com custo menor são refeitas automaticamente no próximo login.
+ITERACOES = 240_000
+ALGORITMO = "pbkdf2_sha256"
+
+
+# Função para gerar o hash de uma senha: "pbkdf2_sha256$iterações$sal$hash"
+def gerar_hash(senha, iteracoes=ITERACOES, sal=None):
+    sal = sal or os.urandom(16)
+    derivado = hashlib.pbkdf2_hmac("sha256", senha.encode("utf-8"), sal, iteracoes)
+    return f"{ALGORITMO}${iteracoes}${sal.hex()}${derivado.hex()}"
+
+
+# Função para conferir uma senha com um hash gerado por gerar_hash
+def conferir_hash(senha, registro):
+    try:
+        algoritmo, iteracoes, sal, esperado = registro.split("$")
+    except ValueError:
+        return False
+    if algoritmo != ALGORITMO:
+        return False
+    derivado = hashlib.pbkdf2_hmac("sha256", senha.encode("utf-8"), bytes.fromhex(sal), int(iteracoes))
+    return hmac.compare_digest(derivado.hex(), esperado)
+
+
+# Função que diz se o valor guardado ainda é uma senha em texto puro (formato antigo)
+def em_texto_puro(registro):
+    return not registro.startswith(ALGORITMO + "$")
+
+
+# Função que diz se o hash foi gerado com um custo menor que o atual
+def precisa_refazer(registro):
+    return em_texto_puro(registro) or int(registro.split("$")[1]) < ITERACOES
+
+
+class Credenciais:
+    """
+    Usuários e hashes de senha guardados em users.json ({"usuario": "hash"}).
+
+    O arquivo é lido uma vez e mantido em memória; a cache só é descartada
+    quando o arquivo muda no disco (inode, mtime ou tamanho diferentes).
+    Senhas em texto puro do formato antigo ({"admin": "admin"}) continuam
+    funcionando e são convertidas para hash no primeiro login ou em migrar().
+    """
+
+    def __init__(self, caminho=USER_DATA_FILE):
+        self.caminho = caminho
+        self._usuarios = {}
+        self._assinatura = None
+        self._trava = threading.Lock()
+        self._hash_falso = None  # Usado para gastar o mesmo tempo com usuários inexistentes
+
+    def _assinatura_atual(self):
+        try:
+            info = os.stat(self.caminho)
+            return (info.st_ino, info.st_mtime_ns, info.st_size)
+        except FileNotFoundError:
+            return None
+
+    def usuarios(self):
+        """
+        Retorna o dicionário {usuario: hash}, relendo o arquivo só se ele mudou.
+        """
+        with self._trava:
+            assinatura = self._assinatura_atual()
+            if assinatura != self._assinatura:
+                self._usuarios = ler_json(self.caminho, {})
+                self._assinatura = assinatura
+            return self._usuarios
+
+    def _salvar(self, usuarios):
+        with self._trava:
+            gravar_json_atomico(self.caminho, usuarios, sincronizar=True)
+            self._usuarios = usuarios
+            self._assinatura = self._assinatura_atual()
+
+    @medido("credenciais.verificar")
+    def verificar(self, usuario, senha):
+        """
+        Retorna True se a senha confere. Pode ser lento (custo do hash), por
+        isso a tela de login chama este método em uma thread separada.
+        """
+        registro = self.usuarios().get(usuario)
+        if registro is None:
+            # Calcula um hash mesmo assim, para não revelar quais usuários existem
+            if self._hash_falso is None:
+                self._hash_falso = gerar_hash("")
+            conferir_hash(senha, self._hash_falso)
+            return False
+        if em_texto_puro(registro):
+            correta = hmac.compare_digest(registro.encode("utf-8"), senha.encode("utf-8"))
+        else:
+            correta = conferir_hash(senha, registro)
+        if correta and precisa_refazer(registro):
+            self.definir_senha(usuario, senha)
+        return correta
+
+    def definir_senha(self, usuario, senha):
+        """
+        Cadastra o usuário ou troca a senha dele.
+        """
+        usuarios = dict(self.usuarios())
+        usuarios[usuario] = gerar_hash(senha)
+        self._salvar(usuarios)
+
+    def migrar(self):
+        """
+        Converte todas as senhas em texto puro para hash. Retorna quantas mudaram.
+        """
+        usuarios = dict(self.usuarios())
+        antigas = [usuario for usuario, registro in usuarios.items() if em_texto_puro(registro)]
+        for usuario in antigas:
+            usuarios[usuario] = gerar_hash(usuarios[usuario])
+        if antigas:
+            self._salvar(usuarios)
+        return len(antigas)
+
+
+_credenciais = None  # Instância compartilhada deste processo
+
+
+# Função para obter o cadastro de usuários padrão (users.json)
+def obter_credenciais():
+    global _credenciais
+    if _credenciais is None:
+        _credenciais = Credenciais()
+    return _credenciais
+
+
+if __name__ == "__main__":
+    # python credenciais.py -> converte as senhas em texto puro de users.json para hash
+    print(f"{obter_credenciais().migrar()} senhas convertidas para hash em {USER_DATA_FILE}")
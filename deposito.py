@@ -1,126 +1,92 @@
 import customtkinter as ctk
-import os
-import json
-import subprocess 
-from datetime import datetime  # Importa a data e hora
-
-# Nome dos arquivos JSON para armazenar o saldo e as transações
-SALDO_FILE = "saldo.json"
-TRANSACOES_FILE = "transacoes.json"
-
-# Função para carregar o saldo do arquivo JSON
-def load_saldo():
-    if os.path.exists(SALDO_FILE):
-        with open(SALDO_FILE, "r") as file:
-            return json.load(file).get("saldo", 0.0)  # Retorna o saldo ou 0.0 se não existir
-    return 0.0  # Retorna 0.0 se o arquivo não existir
-
-# Função para carregar transações do arquivo JSON
-def load_transacoes():
-    if os.path.exists(TRANSACOES_FILE):
-        with open(TRANSACOES_FILE, "r") as file:
-            return json.load(file).get("transacoes", [])  # Retorna a lista de transações ou vazia
-    return []  # Retorna lista vazia se o arquivo não existir
-
-# Função para salvar o saldo no arquivo JSON
-def save_saldo(valor):
-    with open(SALDO_FILE, "w") as file:
-        json.dump({"saldo": valor}, file, indent=4)
-
-# Função para salvar transações no arquivo JSON
-def save_transacoes(transacoes):
-    with open(TRANSACOES_FILE, "w") as file:
-        json.dump({"transacoes": transacoes}, file, indent=4)
-
-# Função para atualizar o saldo na tela
-def atualizar_saldo():
-    novo_saldo = load_saldo()
-    saldo_label.configure(text=f"Saldo disponível: R${novo_saldo:.2f}")
+
+from banco import OperacaoRecusada  # Erro das regras do núcleo bancário (ver banco.py)
+from dinheiro import formatar, para_centavos  # Valores em centavos (inteiros)
+from instrumentacao import medido  # Métricas opcionais (ver instrumentacao.py)
 
 # Função para validar a entrada (apenas números)
 def validar_entrada(value):
     return value.isdigit() or value == ""  # Aceita apenas números ou campo vazio
 
-# Função para salvar valor digitado, incluindo data e hora separadas e atualizar o saldo
-def salvar_valor():
-    valor = valor_entry.get()
-    if valor.isdigit():
-        valor_float = float(valor)
-        novo_saldo = load_saldo() + valor_float  # Atualiza saldo
-
-        # Obtém data e hora separadamente
-        agora = datetime.now()
-        data = agora.strftime("%d/%m/%Y")  # Alterado para formato dd/mm/aaaa
-        hora = agora.strftime("%H:%M:%S")
-
-        transacao = {
-            "valor": valor_float,
-            "data": data,
-            "hora": hora,
-            "tipo": "DEPOSITO"  # Marca como depósito
-        }
-
-        # Carrega as transações e adiciona a nova
-        transacoes = load_transacoes()
-        transacoes.append(transacao)
-
-        # Salva o saldo e as transações
-        save_saldo(novo_saldo)
-        save_transacoes(transacoes)
-
-        atualizar_saldo()  # Atualiza o saldo na tela
-        valor_entry.delete(0, "end")  # Limpa o campo de entrada
-
-# Função para abrir a janela de depósito
-def abrir_deposito():
-    app.destroy()  # Fecha a janela principal antes de abrir o depósito
-    subprocess.run(["python", "painel_principal.py"], check=True)  # Chama o outro arquivo Python (deposito.py)
-
-# Criando a interface
-ctk.set_appearance_mode("dark")
-ctk.set_default_color_theme("blue")
-
-app = ctk.CTk()
-app.geometry("350x520")
-app.title("Banco QAR V1")
-app.configure(bg="#1E1E1E")
-
-# Criando um frame
-frame = ctk.CTkFrame(app, width=350, height=520, corner_radius=15, fg_color="#2C2F33")
-frame.place(relx=0.5, rely=0.5, anchor="center")
-frame.pack_propagate(False)
-
-# Cabeçalho azul
-header = ctk.CTkFrame(frame, width=350, height=100, fg_color="#3B82F6")
-header.pack_propagate(False)
-header.pack(side="top", fill="x")
-
-title_label = ctk.CTkLabel(header, text="Qual é o valor da\nTransferência?", font=("Arial", 22, "bold"), text_color="white")
-title_label.pack(expand=True)
-
-# Exibir saldo atual
-saldo_label = ctk.CTkLabel(frame, text="", font=("Arial", 16), text_color="white")
-saldo_label.pack(pady=10)
-atualizar_saldo()  # Atualiza o saldo na inicialização
-
-header2 = ctk.CTkFrame(frame, width=330, height=5, fg_color="#3B82F6")
-header2.pack(pady=10)
-
-# Texto fixo acima da entrada
-valor_label = ctk.CTkLabel(frame, text="Digite seu valor aqui:", font=("Arial", 14), text_color="white")
-valor_label.pack()
-
-# Campo de entrada (aceita apenas números)
-validacao = app.register(validar_entrada)
-valor_entry = ctk.CTkEntry(frame, width=280, height=40, corner_radius=10, validate="key", validatecommand=(validacao, "%P"))
-valor_entry.pack(pady=10)
-
-# Botão para salvar o valor no JSON
-salvar_button = ctk.CTkButton(frame, text="Depositar", command=salvar_valor)
-salvar_button.pack(pady=10)
-
-# Botão Voltar
-voltar_button2 = ctk.CTkButton(frame, width=40, height=40, text="<", command=abrir_deposito)
-voltar_button2.place(x=25, y=440)  # Ajuste a posição para a parte inferior esquerda
-
-app.mainloop()
+# Tela de depósito, exibida dentro da janela principal (painel_principal.App)
+class TelaDeposito(ctk.CTkFrame):
+    titulo = "Banco QAR V1"
+
+    def __init__(self, master, app):
+        super().__init__(master, width=350, height=520, corner_radius=15, fg_color="#2C2F33")
+        self.app = app
+        self.pack_propagate(False)
+
+        # Cabeçalho azul
+        header = ctk.CTkFrame(self, width=350, height=100, fg_color="#3B82F6")
+        header.pack_propagate(False)
+        header.pack(side="top", fill="x")
+
+        title_label = ctk.CTkLabel(header, text="Qual é o valor da\nTransferência?", font=("Arial", 22, "bold"), text_color="white")
+        title_label.pack(expand=True)
+
+        # Exibir saldo atual
+        self.saldo_label = ctk.CTkLabel(self, text="", font=("Arial", 16), text_color="white")
+        self.saldo_label.pack(pady=10)
+
+        header2 = ctk.CTkFrame(self, width=330, height=5, fg_color="#3B82F6")
+        header2.pack(pady=10)
+
+        # Texto fixo acima da entrada
+        valor_label = ctk.CTkLabel(self, text="Digite seu valor aqui:", font=("Arial", 14), text_color="white")
+        valor_label.pack()
+
+        # Campo de entrada (aceita apenas números)
+        validacao = self.register(validar_entrada)
+        self.valor_entry = ctk.CTkEntry(self, width=280, height=40, corner_radius=10, validate="key", validatecommand=(validacao, "%P"))
+        self.valor_entry.pack(pady=10)
+
+        # Botão para salvar o valor no JSON
+        self.salvar_button = ctk.CTkButton(self, text="Depositar", command=self.salvar_valor)
+        self.salvar_button.pack(pady=10)
+
+        # Botão Voltar
+        voltar_button2 = ctk.CTkButton(self, width=40, height=40, text="<", command=lambda: self.app.mostrar_tela("painel"))
+        voltar_button2.place(x=25, y=440)  # Ajuste a posição para a parte inferior esquerda
+
+    # Chamado pelo painel sempre que a tela volta a ser exibida
+    def ao_mostrar(self):
+        self.atualizar_saldo()
+
+    # Função para atualizar o saldo na tela (o App só lê o livro se ainda não souber o saldo)
+    def atualizar_saldo(self):
+        self.app.exibir_saldo()
+
+    # Função para exibir um saldo já lido (chamada pelo App a cada mudança, ver eventos.py)
+    def mostrar_saldo(self, novo_saldo):
+        self.saldo_label.configure(text=f"Saldo disponível: R${formatar(novo_saldo)}")
+
+    # Função para salvar valor digitado, incluindo data e hora separadas e atualizar o saldo
+    @medido("deposito.salvar_valor")
+    def salvar_valor(self):
+        valor = self.valor_entry.get()
+        if valor.isdigit():
+            centavos = para_centavos(valor)
+
+            # Registra o depósito na thread do escritor: a janela continua respondendo
+            # enquanto o diário é gravado. O botão fica desativado até a resposta.
+            self.salvar_button.configure(state="disabled", text="Processando...")
+            self.app.escritor.enviar(self.app.conta.depositar, centavos,
+                                     ao_terminar=self.deposito_concluido, ao_falhar=self.deposito_recusado)
+
+    # Função chamada quando o depósito foi gravado
+    def deposito_concluido(self, transacao):
+        self.salvar_button.configure(state="normal", text="Depositar")
+        self.app.mostrar_saldo(transacao["saldo_centavos"])  # Saldo resultante, sem ler o livro de novo
+        self.valor_entry.delete(0, "end")  # Limpa o campo de entrada
+
+    # Função chamada quando o depósito não pôde ser gravado
+    def deposito_recusado(self, erro):
+        self.salvar_button.configure(state="normal", text="Depositar")
+        if not isinstance(erro, OperacaoRecusada):
+            raise erro
+        self.saldo_label.configure(text=str(erro))
+
+if __name__ == "__main__":
+    import painel_principal
+    painel_principal.executar("deposito")  # Abre a janela principal já na tela de depósito
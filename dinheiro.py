@@ -0,0 +1,50 @@
+# Valores em dinheiro são sempre inteiros em centavos (R$ 12,34 -> 1234).
+# Somas de inteiros são exatas, então o saldo nunca se afasta da soma do diário,
+# como acontecia com float (0.1 + 0.2 != 0.3).
+
+
+# Função para converter o valor digitado (ou um número antigo em float) para centavos
+def para_centavos(valor):
+    """
+    Aceita "12", "12.5", "12,50", int, Decimal ou float (formato antigo do
+    diário, arredondado). Levanta ValueError se o texto não for um número
+    com no máximo duas casas decimais (notação com expoente, "NaN",
+    "Infinity" e bool também são recusados).
+    """
+    if isinstance(valor, bool):  # bool é int para o Python, mas True não é R$ 1,00
+        raise ValueError(f"Valor inválido: {valor!r}")
+    if isinstance(valor, int):
+        return valor * 100
+    # decimal (conversão exata) só é importado fora do caminho rápido: importá-lo custa
+    # alguns ms na abertura do programa, e a tela de login não converte valores
+    if isinstance(valor, float):
+        from decimal import Decimal
+        # Valores antigos em float são arredondados para o centavo mais próximo.
+        # repr() devolve o decimal mais curto que gera o float: 0.1 -> "0.1"
+        try:
+            return round(Decimal(repr(valor)) * 100)
+        except (ArithmeticError, ValueError):  # nan e inf
+            raise ValueError(f"Valor inválido: {valor!r}") from None
+    texto = str(valor).strip().replace(",", ".")
+    # Caminho rápido para o caso comum ("12", "12.5", "12.50"), usado nos lançamentos em lote
+    reais, ponto, fracao = texto.partition(".")
+    if reais.isdigit() and reais.isascii() and len(fracao) <= 2 and (fracao.isdigit() or not ponto):
+        return int(reais) * 100 + int(fracao.ljust(2, "0") if fracao else 0)
+    # Texto só com dígitos, sinal e ponto: o Decimal aceitaria também "1e2", "1_000", "NaN" e "sNaN"
+    if isinstance(valor, str) and (not texto or texto.strip("0123456789.+-")):
+        raise ValueError(f"Valor inválido: {valor!r}")
+    from decimal import Decimal
+    try:
+        centavos = Decimal(texto) * 100
+        if not centavos.is_finite() or centavos != centavos.to_integral_value():
+            raise ValueError
+        return int(centavos)
+    except (ArithmeticError, ValueError):  # InvalidOperation é um ArithmeticError
+        raise ValueError(f"Valor inválido: {valor!r}") from None
+
+
+# Função para exibir centavos como texto: 123456 -> "1234.56" (ou "1,234.56" com milhar=True)
+def formatar(centavos, milhar=False):
+    sinal = "-" if centavos < 0 else ""
+    reais, resto = divmod(abs(centavos), 100)
+    return f"{sinal}{reais:,}.{resto:02d}" if milhar else f"{sinal}{reais}.{resto:02d}"
@@ -0,0 +1,97 @@
+import queue  # Filas de trabalhos e de resultados
+import sys  # Relato padrão dos erros dos callbacks
+import threading  # Thread que faz a leitura e a gravação do livro
+
+# Tempo entre duas verificações de resultados prontos, em ms (mesmo intervalo do login)
+INTERVALO_ENTREGA = 15
+
+
+class Escritor:
+    """
+    Thread única, em segundo plano, dona de todo o acesso ao livro feito
+    pelas telas (depósitos, saques, leitura do saldo).
+
+    As telas enviam trabalhos com enviar(); a função roda fora da thread da
+    interface e o resultado volta por `ao_terminar` (ou a exceção por
+    `ao_falhar`), chamados pela thread da interface através de
+    `agendar(ms, funcao)` - na janela, o próprio after() do Tk. Como só uma
+    thread executa os trabalhos, eles são gravados na ordem em que chegaram.
+    Erros de um callback (ou de um trabalho sem `ao_falhar`) vão para
+    `relatar(tipo, erro, traceback)` - na janela, report_callback_exception
+    do Tk - depois que a entrega terminou, sem interromper as seguintes.
+    """
+
+    def __init__(self, agendar, relatar=sys.excepthook):
+        self.agendar = agendar
+        self.relatar = relatar
+        self._trabalhos = queue.Queue()
+        self._resultados = queue.Queue()
+        self._thread = None
+        self._pendentes = 0  # Trabalhos enviados cujo resultado ainda não foi entregue
+        self._entregando = False  # Já existe uma verificação agendada?
+
+    def enviar(self, funcao, *args, ao_terminar=None, ao_falhar=None):
+        """
+        Agenda `funcao(*args)` na thread do escritor. Deve ser chamado pela
+        thread da interface.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._trabalhar, name="escritor", daemon=True)
+            self._thread.start()
+        self._pendentes += 1
+        self._trabalhos.put((funcao, args, ao_terminar, ao_falhar))
+        if not self._entregando:
+            self._entregando = True
+            self.agendar(INTERVALO_ENTREGA, self._entregar)
+
+    def ocupado(self):
+        return self._pendentes > 0
+
+    def _trabalhar(self):
+        while True:
+            trabalho = self._trabalhos.get()
+            if trabalho is None:
+                return
+            funcao, args, ao_terminar, ao_falhar = trabalho
+            try:
+                resultado = funcao(*args)
+            except Exception as erro:
+                self._resultados.put((ao_falhar, erro, True))
+            else:
+                self._resultados.put((ao_terminar, resultado, False))
+
+    def _entregar(self):
+        """
+        Roda na thread da interface: chama os callbacks dos trabalhos
+        concluídos e volta a verificar enquanto houver trabalho pendente.
+        """
+        erros = []
+        while True:
+            try:
+                callback, valor, falhou = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+            self._pendentes -= 1
+            try:
+                if callback is not None:
+                    callback(valor)
+                elif falhou:
+                    raise valor  # Sem ao_falhar: o erro é relatado como qualquer erro de callback do Tk
+            except Exception as erro:
+                erros.append(erro)
+        if self._pendentes:
+            self.agendar(INTERVALO_ENTREGA, self._entregar)
+        else:
+            self._entregando = False
+        for erro in erros:
+            self.relatar(type(erro), erro, erro.__traceback__)
+
+    def parar(self, timeout=10):
+        """
+        Espera os trabalhos já enviados terminarem (usado ao fechar a janela,
+        para nenhuma operação confirmada na tela ficar sem gravar).
+        """
+        if self._thread is not None:
+            self._trabalhos.put(None)
+            self._thread.join(timeout)
+            self._thread = None
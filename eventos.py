@@ -0,0 +1,164 @@
+import ctypes  # Acesso ao inotify da libc (Linux)
+import ctypes.util
+import os  # Para consultar arquivos (os.stat) e ler o descritor do inotify
+import select  # Espera por eventos do inotify com tempo limite
+import struct  # Leitura dos registros de evento do inotify
+import sys
+import threading  # Thread do observador de arquivos
+
+# Eventos do processo: quem altera algo publica, quem exibe assina.
+#   "saldo": conta=<nome>, saldo_centavos=<int>  -> publicado a cada operação gravada
+# As funções assinantes rodam na thread de quem publicou; as telas usam
+# painel_principal.App, que repassa os eventos para a thread da interface.
+
+
+class Barramento:
+    """
+    Barramento de eventos em memória, seguro para várias threads.
+    """
+
+    def __init__(self):
+        self._assinantes = {}  # evento -> lista de funções
+        self._trava = threading.Lock()
+
+    def assinar(self, evento, funcao):
+        """
+        Registra `funcao(**dados)` para o evento. Retorna uma função que
+        cancela a assinatura.
+        """
+        with self._trava:
+            self._assinantes.setdefault(evento, []).append(funcao)
+
+        def cancelar():
+            with self._trava:
+                if funcao in self._assinantes.get(evento, []):
+                    self._assinantes[evento].remove(funcao)
+        return cancelar
+
+    def publicar(self, evento, **dados):
+        with self._trava:
+            funcoes = list(self._assinantes.get(evento, ()))
+        for funcao in funcoes:
+            funcao(**dados)
+
+
+barramento = Barramento()  # Barramento compartilhado pelo processo
+
+
+# Constantes do inotify (linux/inotify.h)
+IN_MODIFY = 0x002
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENTO = struct.Struct("iIII")  # wd, mask, cookie, len (seguido do nome)
+
+
+# Função que carrega o inotify da libc, ou retorna None (Windows, macOS, libc sem inotify)
+def _carregar_inotify():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class Observador:
+    """
+    Observa arquivos e chama `funcao(caminho)` quando um deles muda, em uma
+    thread própria. Usa inotify no Linux (sem custo enquanto nada muda) e,
+    nos outros sistemas, consulta os.stat a cada `intervalo` segundos.
+    Várias mudanças seguidas no mesmo arquivo geram uma única chamada.
+    """
+
+    def __init__(self, intervalo=0.5, usar_inotify=True):
+        self.intervalo = intervalo
+        self._arquivos = {}  # caminho -> lista de funções
+        self._assinaturas = {}  # caminho -> (mtime, tamanho), no modo de consulta
+        self._pastas = {}  # wd do inotify -> pasta
+        self._trava = threading.Lock()
+        self._parar = threading.Event()
+        self._libc = _carregar_inotify() if usar_inotify else None
+        self._fd = None
+        if self._libc is not None:
+            self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if self._fd < 0:
+                self._libc, self._fd = None, None
+        self._thread = threading.Thread(target=self._observar, name="observador", daemon=True)
+        self._thread.start()
+
+    @property
+    def modo(self):
+        return "inotify" if self._fd is not None else "consulta"
+
+    def observar(self, caminho, funcao):
+        caminho = os.path.abspath(caminho)
+        with self._trava:
+            self._arquivos.setdefault(caminho, []).append(funcao)
+            self._assinaturas.setdefault(caminho, self._assinatura(caminho))
+            if self._fd is not None:
+                # Observa a pasta: o arquivo pode ainda não existir ou ser substituído
+                pasta = os.path.dirname(caminho)
+                if pasta not in self._pastas.values():
+                    wd = self._libc.inotify_add_watch(self._fd, os.fsencode(pasta), IN_MODIFY | IN_CREATE | IN_MOVED_TO)
+                    if wd >= 0:
+                        self._pastas[wd] = pasta
+
+    @staticmethod
+    def _assinatura(caminho):
+        try:
+            info = os.stat(caminho)
+            return info.st_mtime_ns, info.st_size
+        except FileNotFoundError:
+            return None
+
+    def _avisar(self, caminhos):
+        for caminho in caminhos:
+            with self._trava:
+                funcoes = list(self._arquivos.get(caminho, ()))
+            for funcao in funcoes:
+                funcao(caminho)
+
+    def _observar(self):
+        while not self._parar.is_set():
+            if self._fd is None:
+                self._parar.wait(self.intervalo)
+                with self._trava:
+                    mudaram = []
+                    for caminho in self._arquivos:
+                        assinatura = self._assinatura(caminho)
+                        if assinatura != self._assinaturas.get(caminho):
+                            self._assinaturas[caminho] = assinatura
+                            mudaram.append(caminho)
+                self._avisar(mudaram)
+                continue
+            prontos, _, _ = select.select([self._fd], [], [], self.intervalo)
+            if not prontos:
+                continue
+            self._parar.wait(0.02)  # Junta as mudanças que chegam em sequência (lotes, fsync)
+            mudaram = set()
+            while True:
+                try:
+                    dados = os.read(self._fd, 65536)
+                except BlockingIOError:
+                    break
+                deslocamento = 0
+                while deslocamento < len(dados):
+                    wd, _, _, tamanho = _EVENTO.unpack_from(dados, deslocamento)
+                    nome = dados[deslocamento + _EVENTO.size:deslocamento + _EVENTO.size + tamanho].rstrip(b"\0")
+                    deslocamento += _EVENTO.size + tamanho
+                    caminho = os.path.join(self._pastas.get(wd, ""), os.fsdecode(nome))
+                    if caminho in self._arquivos:
+                        mudaram.add(caminho)
+            self._avisar(sorted(mudaram))
+
+    def parar(self):
+        self._parar.set()
+        self._thread.join(self.intervalo * 2 + 1)
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,209 @@
+import csv  # Escrita do extrato em CSV
+import zlib  # Compressão das páginas do PDF
+from datetime import datetime  # Data de geração do arquivo
+
+from armazenamento import SINAIS
+from dinheiro import formatar
+from instrumentacao import medido
+
+# Exportação do extrato em CSV, OFX ou PDF.
+# As transações passam por geradores (conta filtrada -> formato) e são
+# escritas uma a uma, então a memória usada não depende do tamanho do histórico.
+
+FORMATOS = ("csv", "ofx", "pdf")
+LINHAS_POR_PAGINA = 50  # Transações por página do PDF
+
+
+# Função que converte "dd/mm/aaaa" em "aaaammdd", que pode ser comparado como texto
+def chave_data(data):
+    return data[6:10] + data[3:5] + data[0:2]
+
+
+# Função para escrever as transações em CSV (separador ";" e vírgula decimal, como no Excel em português)
+def escrever_csv(transacoes, arquivo):
+    escritor = csv.writer(arquivo, delimiter=";", lineterminator="\n")
+    escritor.writerow(["data", "hora", "tipo", "valor", "saldo"])
+    quantidade = 0
+    for transacao in transacoes:
+        escritor.writerow([
+            transacao["data"],
+            transacao["hora"],
+            transacao["tipo"],
+            formatar(SINAIS[transacao["tipo"]] * transacao["centavos"]).replace(".", ","),
+            formatar(transacao["saldo_centavos"]).replace(".", ",") if "saldo_centavos" in transacao else "",
+        ])
+        quantidade += 1
+    return quantidade
+
+
+# Função que converte data e hora do extrato para o formato do OFX (aaaammddhhmmss)
+def _data_ofx(data, hora="00:00:00"):
+    return chave_data(data) + hora.replace(":", "")
+
+
+# Função para escrever as transações no formato OFX 1.02 (importado por bancos e planilhas financeiras)
+def escrever_ofx(transacoes, arquivo, conta="", inicio=None, fim=None):
+    """
+    O período (DTSTART/DTEND) vem do filtro; sem filtro, vai da primeira
+    transação até hoje. O saldo final (LEDGERBAL) é escrito depois da lista,
+    quando já é conhecido.
+    """
+    agora = datetime.now().strftime("%Y%m%d%H%M%S")
+    transacoes = iter(transacoes)
+    primeira = next(transacoes, None)
+    dtstart = _data_ofx(inicio) if inicio else (_data_ofx(primeira["data"]) if primeira else agora)
+    dtend = _data_ofx(fim, "23:59:59") if fim else agora
+    arquivo.write(
+        "OFXHEADER:100\nDATA:OFXSGML\nVERSION:102\nSECURITY:NONE\nENCODING:USASCII\n"
+        "CHARSET:1252\nCOMPRESSION:NONE\nOLDFILEUID:NONE\nNEWFILEUID:NONE\n\n"
+        "<OFX>\n<SIGNONMSGSRSV1><SONRS>\n<STATUS><CODE>0<SEVERITY>INFO</STATUS>\n"
+        f"<DTSERVER>{agora}\n<LANGUAGE>POR\n</SONRS></SIGNONMSGSRSV1>\n"
+        "<BANKMSGSRSV1><STMTTRNRS>\n<TRNUID>1\n<STATUS><CODE>0<SEVERITY>INFO</STATUS>\n"
+        f"<STMTRS>\n<CURDEF>BRL\n<BANKACCTFROM><BANKID>0<ACCTID>{conta}<ACCTTYPE>CHECKING</BANKACCTFROM>\n"
+        f"<BANKTRANLIST>\n<DTSTART>{dtstart}\n<DTEND>{dtend}\n"
+    )
+    quantidade, saldo, ultima_data = 0, 0, agora
+    if primeira is not None:
+        for transacao in _encadear(primeira, transacoes):
+            quantidade += 1
+            ultima_data = _data_ofx(transacao["data"], transacao["hora"])
+            saldo = transacao.get("saldo_centavos", saldo)
+            credito = transacao["tipo"] == "DEPOSITO"
+            arquivo.write(
+                f"<STMTTRN><TRNTYPE>{'CREDIT' if credito else 'DEBIT'}"
+                f"<DTPOSTED>{ultima_data}"
+                f"<TRNAMT>{formatar(SINAIS[transacao['tipo']] * transacao['centavos'])}"
+                f"<FITID>{quantidade}<MEMO>{transacao['tipo']}</STMTTRN>\n"
+            )
+    arquivo.write(
+        "</BANKTRANLIST>\n"
+        f"<LEDGERBAL><BALAMT>{formatar(saldo)}<DTASOF>{ultima_data}</LEDGERBAL>\n"
+        "</STMTRS>\n</STMTTRNRS></BANKMSGSRSV1>\n</OFX>\n"
+    )
+    return quantidade
+
+
+# Função geradora que devolve `primeira` e depois o restante de `transacoes`
+def _encadear(primeira, transacoes):
+    yield primeira
+    yield from transacoes
+
+
+class EscritorPDF:
+    """
+    Gerador mínimo de PDF (texto em Helvetica) escrito página a página.
+    Cada página é gravada assim que fica pronta; só os deslocamentos dos
+    objetos (para a tabela xref) ficam em memória.
+    """
+
+    def __init__(self, arquivo):
+        self.arquivo = arquivo  # Aberto em modo binário
+        self.posicao = 0
+        self.deslocamentos = {}  # número do objeto -> posição no arquivo
+        self.paginas = []  # números dos objetos de página
+        self._escrever(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        # 1: catálogo, 2: árvore de páginas (escrita no fim), 3: fonte
+        self._objeto(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        self._objeto(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+        self.proximo = 4
+
+    def _escrever(self, dados):
+        self.arquivo.write(dados)
+        self.posicao += len(dados)
+
+    def _objeto(self, numero, conteudo):
+        self.deslocamentos[numero] = self.posicao
+        self._escrever(b"%d 0 obj\n" % numero + conteudo + b"\nendobj\n")
+
+    @staticmethod
+    def _texto(texto):
+        texto = texto.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        return texto.encode("cp1252", "replace")
+
+    def pagina(self, linhas, tamanho_fonte=10):
+        """
+        Acrescenta uma página A4 com `linhas` de texto, de cima para baixo.
+        """
+        comandos = [b"BT /F1 %d Tf 14 TL 40 800 Td" % tamanho_fonte]
+        for linha in linhas:
+            comandos.append(b"(" + self._texto(linha) + b") '")
+        comandos.append(b"ET")
+        conteudo = zlib.compress(b"\n".join(comandos))
+        numero_conteudo, numero_pagina = self.proximo, self.proximo + 1
+        self.proximo += 2
+        self._objeto(numero_conteudo, b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(conteudo)
+                     + conteudo + b"\nendstream")
+        self._objeto(numero_pagina, b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                     b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % numero_conteudo)
+        self.paginas.append(numero_pagina)
+
+    def fechar(self):
+        if not self.paginas:
+            self.pagina([])
+        filhos = b" ".join(b"%d 0 R" % numero for numero in self.paginas)
+        self._objeto(2, b"<< /Type /Pages /Kids [" + filhos + b"] /Count %d >>" % len(self.paginas))
+        inicio_xref = self.posicao
+        tabela = [b"xref\n0 %d\n0000000000 65535 f \n" % self.proximo]
+        tabela += [b"%010d 00000 n \n" % self.deslocamentos[numero] for numero in range(1, self.proximo)]
+        self._escrever(b"".join(tabela))
+        self._escrever(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (self.proximo, inicio_xref))
+
+
+# Função para escrever as transações em um PDF paginado (arquivo em modo binário)
+def escrever_pdf(transacoes, arquivo, conta=""):
+    pdf = EscritorPDF(arquivo)
+    cabecalho = [f"Extrato - conta {conta}", "", f"{'DATA':<12}{'HORA':<10}{'TIPO':<10}{'VALOR':>16}{'SALDO':>18}", ""]
+    linhas, quantidade, numero_pagina = [], 0, 1
+    for transacao in transacoes:
+        linhas.append(f"{transacao['data']:<12}{transacao['hora']:<10}{transacao['tipo']:<10}"
+                      f"{formatar(SINAIS[transacao['tipo']] * transacao['centavos'], milhar=True):>16}"
+                      f"{formatar(transacao.get('saldo_centavos', 0), milhar=True):>18}")
+        quantidade += 1
+        if len(linhas) == LINHAS_POR_PAGINA:
+            pdf.pagina(cabecalho + linhas + ["", f"Página {numero_pagina}"])
+            linhas, numero_pagina = [], numero_pagina + 1
+    if linhas or quantidade == 0:
+        pdf.pagina(cabecalho + linhas + ["", f"Página {numero_pagina}"])
+    pdf.fechar()
+    return quantidade
+
+
+# Função principal: exporta o extrato da conta para `caminho` no formato pedido
+@medido("exportar.exportar")
+def exportar(conta, caminho, formato=None, inicio=None, fim=None, tipo=None):
+    """
+    `formato` é "csv", "ofx" ou "pdf" (por padrão, a extensão do arquivo).
+    Datas no formato "dd/mm/aaaa"; `tipo` é "DEPOSITO" ou "SAQUE".
+    Retorna a quantidade de transações exportadas.
+    """
+    formato = (formato or caminho.rsplit(".", 1)[-1]).lower()
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconhecido: {formato!r} (use {', '.join(FORMATOS)})")
+    # O filtro usa o índice de tempo da conta: só o período pedido é lido do diário
+    transacoes = conta.transacoes(inicio, fim, tipo)
+    if formato == "pdf":
+        with open(caminho, "wb") as arquivo:
+            return escrever_pdf(transacoes, arquivo, conta.nome)
+    with open(caminho, "w", encoding="utf-8" if formato == "csv" else "cp1252", newline="") as arquivo:
+        if formato == "csv":
+            return escrever_csv(transacoes, arquivo)
+        return escrever_ofx(transacoes, arquivo, conta.nome, inicio, fim)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from banco import CONTA_PADRAO, obter_banco
+
+    # python exportar.py extrato.csv [--conta admin] [--de 01/01/2024] [--ate 31/12/2024] [--tipo SAQUE]
+    parser = argparse.ArgumentParser(description="Exporta o extrato de uma conta para CSV, OFX ou PDF.")
+    parser.add_argument("arquivo", help="arquivo de saída (.csv, .ofx ou .pdf)")
+    parser.add_argument("--conta", default=CONTA_PADRAO)
+    parser.add_argument("--formato", choices=FORMATOS)
+    parser.add_argument("--de", help="data inicial, dd/mm/aaaa")
+    parser.add_argument("--ate", help="data final, dd/mm/aaaa")
+    parser.add_argument("--tipo", choices=sorted(SINAIS))
+    args = parser.parse_args()
+    inicio = datetime.now()
+    quantidade = exportar(obter_banco().conta(args.conta), args.arquivo, args.formato, args.de, args.ate, args.tipo)
+    print(f"{quantidade} transações exportadas para {args.arquivo} em {(datetime.now() - inicio).total_seconds():.1f}s")
@@ -1,113 +1,203 @@
+from datetime import datetime  # Validação das datas do filtro
+
 import customtkinter as ctk  # Importa a biblioteca customtkinter para criar a interface gráfica
-import os  # Importa o módulo os para interagir com o sistema de arquivos
-import json  # Importa o módulo json para manipular dados em formato JSON
-import subprocess  # Importa o módulo subprocess para executar comandos do sistema operacional
-from datetime import datetime  # Importa a classe datetime para manipulação de datas e horas
-
-# Nome dos arquivos JSON para armazenar o saldo e as transações
-SALDO_FILE = "saldo.json"  # Arquivo onde o saldo será armazenado
-TRANSACOES_FILE = "transacoes.json"  # Arquivo onde as transações serão armazenadas
-
-# Função para carregar o saldo do arquivo JSON
-def load_saldo():
-    if os.path.exists(SALDO_FILE):  # Verifica se o arquivo do saldo existe
-        with open(SALDO_FILE, "r") as file:  # Abre o arquivo em modo leitura
-            return json.load(file).get("saldo", 0.0)  # Retorna o saldo ou 0.0 se não encontrado
-    return 0.0  # Retorna 0.0 caso o arquivo não exista
-
-# Função para carregar transações do arquivo JSON
-def load_transacoes():
-    if os.path.exists(TRANSACOES_FILE):  # Verifica se o arquivo de transações existe
-        with open(TRANSACOES_FILE, "r") as file:  # Abre o arquivo em modo leitura
-            return json.load(file).get("transacoes", [])  # Retorna a lista de transações ou uma lista vazia
-    return []  # Retorna uma lista vazia caso o arquivo não exista
-
-# Função para salvar o saldo no arquivo JSON
-def save_saldo(valor):
-    with open(SALDO_FILE, "w") as file:  # Abre o arquivo do saldo em modo escrita (sobrescreve)
-        json.dump({"saldo": valor}, file, indent=4)  # Salva o saldo no arquivo JSON com indentação de 4 espaços
-
-# Função para salvar transações no arquivo JSON
-def save_transacoes(transacoes):
-    with open(TRANSACOES_FILE, "w") as file:  # Abre o arquivo das transações em modo escrita (sobrescreve)
-        json.dump({"transacoes": transacoes}, file, indent=4)  # Salva a lista de transações no arquivo JSON com indentação de 4 espaços
-
-# Função para abrir a janela de depósito
-def abrir_deposito():
-    app.destroy()  # Fecha a janela principal antes de abrir a janela de depósito
-    subprocess.run(["python", "painel_principal.py"], check=True)  # Chama o script painel_principal.py
-
-# Criando a interface gráfica
-ctk.set_appearance_mode("dark")  # Define o modo de aparência da interface como "escuro"
-ctk.set_default_color_theme("blue")  # Define o tema de cores como "azul"
-
-app = ctk.CTk()  # Cria a janela principal da aplicação
-app.geometry("350x520")  # Define as dimensões da janela principal
-app.title("Sistema Bancário")  # Define o título da janela
-app.configure(bg="#1E1E1E")  # Define a cor de fundo da janela principal
-
-frame = ctk.CTkFrame(app, width=350, height=520, corner_radius=15, fg_color="#2C2F33")  # Cria um frame para o conteúdo principal
-frame.place(relx=0.5, rely=0.5, anchor="center")  # Posiciona o frame no centro da janela
-frame.pack_propagate(False)  # Impede que o frame ajuste o tamanho baseado no conteúdo
-
-header = ctk.CTkFrame(frame, width=350, height=100, fg_color="#3B82F6")  # Cria um header com fundo azul
-header.pack_propagate(False)  # Impede que o header ajuste seu tamanho baseado no conteúdo
-header.pack(side="top", fill="x")  # Posiciona o header no topo e o preenche horizontalmente
-
-title_label = ctk.CTkLabel(header, text="Extrato", font=("Arial", 22, "bold"), text_color="white")  # Cria um rótulo de título para o extrato
-title_label.pack(expand=True)  # Expande o rótulo para ocupar o espaço disponível no header
-
-# Criando os títulos das colunas para o extrato
-coluna_titulo_tipo = ctk.CTkLabel(frame, text="TIPO", font=("Arial", 14), text_color="white")
-coluna_titulo_valor = ctk.CTkLabel(frame, text="VALOR", font=("Arial", 14), text_color="white")
-coluna_titulo_data  = ctk.CTkLabel(frame, text="DATA", font=("Arial", 14), text_color="white")
-coluna_titulo_hora  = ctk.CTkLabel(frame, text="HORA", font=("Arial", 14), text_color="white")
-
-# Posiciona os rótulos de coluna na interface
-coluna_titulo_tipo.place(x=20, y=120)
-coluna_titulo_valor.place(x=100, y=120)
-coluna_titulo_data.place(x=180, y=120)
-coluna_titulo_hora.place(x=260, y=120)
-
-# Criação de um frame para exibir as transações
-frame_inferior = ctk.CTkFrame(frame, width=330, height=280, corner_radius=15, fg_color="#444444")
-frame_inferior.place(relx=0.5, y=140 + 10, anchor="n")
-
-# Cria um canvas para exibir as transações com uma barra de rolagem
-canvas = ctk.CTkCanvas(frame_inferior, bg="#444444", width=330, height=280)
-scrollbar = ctk.CTkScrollbar(frame_inferior, orientation="vertical", command=canvas.yview)  # Cria uma barra de rolagem vertical
-canvas.configure(yscrollcommand=scrollbar.set)  # Conecta a barra de rolagem ao canvas
-scrollbar.pack(side="right", fill="y")  # Posiciona a barra de rolagem à direita
-canvas.pack(side="left", fill="both", expand=True)  # Posiciona o canvas à esquerda e o expande
-
-# Cria um frame dentro do canvas para exibir as transações
-frame_transacoes = ctk.CTkFrame(canvas, fg_color="#444444")
-canvas.create_window((0, 0), window=frame_transacoes, anchor="nw")  # Cria uma janela dentro do canvas
-
-transacoes = load_transacoes()  # Carrega as transações do arquivo JSON
-for i, transacao in enumerate(transacoes):  # Itera sobre as transações
-    tipo = transacao.get("tipo", "Desconhecido")  # Obtém o tipo da transação
-    valor = f"R$ {transacao.get('valor', 0.0):,.2f}"  # Formata o valor da transação
-    data = transacao.get("data", "Desconhecida")  # Obtém a data da transação
-    hora = transacao.get("hora", "Desconhecida")  # Obtém a hora da transação
-
-    # Criação dos rótulos para cada transação
-    tipo_label = ctk.CTkLabel(frame_transacoes, text=tipo, font=("Arial", 12), text_color="white")
-    valor_label = ctk.CTkLabel(frame_transacoes, text=valor, font=("Arial", 12), text_color="white")
-    data_label = ctk.CTkLabel(frame_transacoes, text=data, font=("Arial", 12), text_color="white")
-    hora_label = ctk.CTkLabel(frame_transacoes, text=hora, font=("Arial", 12), text_color="white")
-
-    # Posiciona os rótulos na tela usando grid
-    tipo_label.grid(row=i, column=0, padx=10, pady=5, sticky="w")
-    valor_label.grid(row=i, column=1, padx=10, pady=5, sticky="w")
-    data_label.grid(row=i, column=2, padx=10, pady=5, sticky="w")
-    hora_label.grid(row=i, column=3, padx=22, pady=5, sticky="w")
-
-frame_transacoes.update_idletasks()  # Atualiza os itens no frame de transações
-canvas.config(scrollregion=canvas.bbox("all"))  # Ajusta a região de rolagem do canvas para acomodar todas as transações
-
-# Botão Voltar
-voltar_button2 = ctk.CTkButton(frame, width=40, height=40, text="<", command=abrir_deposito)  # Cria um botão "Voltar" para abrir a janela de depósito
-voltar_button2.place(x=25, y=440)  # Posiciona o botão no canto inferior esquerdo
-
-app.mainloop()  # Inicia o loop principal da interface gráfica
+from armazenamento import data_valida  # Formato exato dd/mm/aaaa esperado pelo índice de tempo
+from dinheiro import formatar  # Formata valores em centavos para exibição
+
+
+# Lista de transações virtualizada: só as linhas visíveis existem como widgets
+class ListaVirtual(ctk.CTkFrame):
+    """
+    Exibe as transações da conta em linhas de altura fixa.
+    Apenas `linhas_visiveis` conjuntos de rótulos são criados; ao rolar, os
+    mesmos rótulos recebem o texto da nova página, lida sob demanda da conta.
+    Abrir o extrato custa o mesmo para 100 ou 1.000.000 de transações.
+    As páginas são lidas pelo escritor (a trava do livro pode estar com uma
+    gravação); enquanto uma leitura está em andamento, a rolagem só anota a
+    posição, e a próxima leitura já busca a página mais recente.
+    """
+
+    ALTURA_LINHA = 28  # Altura de cada linha em pixels
+    COLUNAS_X = (10, 90, 170, 250)  # Posição de TIPO, VALOR, DATA e HORA
+
+    def __init__(self, master, conta, escritor, width, height):
+        super().__init__(master, width=width, height=height, fg_color="#444444")
+        self.conta = conta
+        self.escritor = escritor  # Thread que lê as páginas fora da interface (ver escritor.py)
+        self.filtro = {}  # Filtros do extrato: de, ate ("dd/mm/aaaa") e tipo
+        self.primeira = 0  # Índice da primeira transação visível
+        self.total = 0  # Quantidade de transações na última página lida
+        self.linhas_visiveis = height // self.ALTURA_LINHA
+        self._lendo = False  # Há uma leitura no escritor?
+        self._reler = False  # A posição ou o filtro mudou durante a leitura
+
+        # Barra de rolagem controlada manualmente (não existe um canvas com todo o conteúdo)
+        self.scrollbar = ctk.CTkScrollbar(self, orientation="vertical", command=self.rolar)
+        self.scrollbar.place(relx=1.0, y=0, relheight=1.0, anchor="ne")
+
+        # Cria o conjunto fixo de rótulos que será reaproveitado
+        self.linhas = []
+        for i in range(self.linhas_visiveis):
+            rotulos = []
+            for x in self.COLUNAS_X:
+                rotulo = ctk.CTkLabel(self, text="", font=("Arial", 12), text_color="white", height=self.ALTURA_LINHA)
+                rotulo.place(x=x, y=i * self.ALTURA_LINHA)
+                rotulos.append(rotulo)
+            self.linhas.append(rotulos)
+
+        # Rolagem pelo mouse (Windows/macOS usam <MouseWheel>, Linux usa Button-4/5)
+        for widget in [self] + [rotulo for linha in self.linhas for rotulo in linha]:
+            widget.bind("<MouseWheel>", lambda evento: self.rolar("scroll", -1 if evento.delta > 0 else 1, "units"))
+            widget.bind("<Button-4>", lambda evento: self.rolar("scroll", -1, "units"))
+            widget.bind("<Button-5>", lambda evento: self.rolar("scroll", 1, "units"))
+
+        self.atualizar()
+
+    def rolar(self, *args):
+        """
+        Recebe os comandos da barra de rolagem ("moveto", fração) ou
+        ("scroll", passos, "units"/"pages") e mostra a página correspondente.
+        """
+        if args[0] == "moveto":
+            primeira = int(float(args[1]) * self.total)
+        else:
+            passos = int(args[1]) * (self.linhas_visiveis if args[2] == "pages" else 1)
+            primeira = self.primeira + passos
+        self.primeira = max(0, min(primeira, self.total - self.linhas_visiveis))
+        self.atualizar()
+
+    def atualizar(self):
+        """
+        Pede ao escritor a página visível (e a quantidade de transações).
+        """
+        if self._lendo:
+            self._reler = True
+            return
+        self._lendo, self._reler = True, False
+        self.escritor.enviar(self.ler_pagina, self.primeira, dict(self.filtro),
+                             ao_terminar=self.mostrar_pagina, ao_falhar=self.leitura_falhou)
+
+    def ler_pagina(self, primeira, filtro):
+        """
+        Roda no escritor: retorna (primeira, total, transações da página).
+        """
+        total = self.conta.quantidade_transacoes(**filtro)
+        primeira = max(0, min(primeira, total - self.linhas_visiveis))
+        return primeira, total, self.conta.extrato(primeira, self.linhas_visiveis, **filtro)
+
+    def leitura_falhou(self, erro):
+        self._lendo = False
+        raise erro  # Relatado pelo escritor como qualquer erro de callback
+
+    def mostrar_pagina(self, lida):
+        """
+        Escreve o texto da página lida nos rótulos existentes.
+        """
+        self._lendo = False
+        if self._reler:  # Rolou ou filtrou durante a leitura: busca a posição atual
+            self.atualizar()
+            return
+        self.primeira, total, pagina = lida
+        self.total = total
+        for rotulos, i in zip(self.linhas, range(self.linhas_visiveis)):
+            if i < len(pagina):
+                transacao = pagina[i]
+                textos = (
+                    transacao.get("tipo", "Desconhecido"),
+                    f"R$ {formatar(transacao['centavos'], milhar=True)}",
+                    transacao.get("data", "Desconhecida"),
+                    transacao.get("hora", "Desconhecida"),
+                )
+            else:
+                textos = ("", "", "", "")
+            for rotulo, texto in zip(rotulos, textos):
+                rotulo.configure(text=texto)
+        if total:
+            self.scrollbar.set(self.primeira / total, min(1.0, (self.primeira + self.linhas_visiveis) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def filtrar(self, **filtro):
+        """
+        Troca os filtros (período e tipo) e volta para o início da lista.
+        A busca usa o índice de tempo da conta, sem percorrer o histórico.
+        """
+        self.filtro = {chave: valor for chave, valor in filtro.items() if valor}
+        self.primeira = 0
+        self.atualizar()
+
+# Tela de extrato, exibida dentro da janela principal (painel_principal.App)
+class TelaExtrato(ctk.CTkFrame):
+    titulo = "Sistema Bancário"  # Título da janela enquanto o extrato está visível
+
+    def __init__(self, master, app):
+        super().__init__(master, width=350, height=520, corner_radius=15, fg_color="#2C2F33")  # Cria o frame com o conteúdo do extrato
+        self.app = app  # Janela principal, usada para voltar ao painel
+        self.pack_propagate(False)  # Impede que o frame ajuste o tamanho baseado no conteúdo
+
+        header = ctk.CTkFrame(self, width=350, height=70, fg_color="#3B82F6")  # Cria um header com fundo azul
+        header.pack_propagate(False)  # Impede que o header ajuste seu tamanho baseado no conteúdo
+        header.pack(side="top", fill="x")  # Posiciona o header no topo e o preenche horizontalmente
+
+        title_label = ctk.CTkLabel(header, text="Extrato", font=("Arial", 22, "bold"), text_color="white")  # Cria um rótulo de título para o extrato
+        title_label.pack(expand=True)  # Expande o rótulo para ocupar o espaço disponível no header
+
+        # Filtros: período (dd/mm/aaaa) e tipo de transação
+        self.de_entry = ctk.CTkEntry(self, width=85, height=28, placeholder_text="De")
+        self.ate_entry = ctk.CTkEntry(self, width=85, height=28, placeholder_text="Até")
+        self.tipo_menu = ctk.CTkOptionMenu(self, width=100, height=28, values=["TODOS", "DEPOSITO", "SAQUE"])
+        filtrar_button = ctk.CTkButton(self, width=40, height=28, text="OK", command=self.filtrar)
+        self.de_entry.place(x=10, y=80)
+        self.ate_entry.place(x=100, y=80)
+        self.tipo_menu.place(x=190, y=80)
+        filtrar_button.place(x=295, y=80)
+        self.filtro_label = ctk.CTkLabel(self, text="", font=("Arial", 11), text_color="#F87171", height=14)
+        self.filtro_label.place(x=10, y=108)
+
+        # Criando os títulos das colunas para o extrato
+        coluna_titulo_tipo = ctk.CTkLabel(self, text="TIPO", font=("Arial", 14), text_color="white")
+        coluna_titulo_valor = ctk.CTkLabel(self, text="VALOR", font=("Arial", 14), text_color="white")
+        coluna_titulo_data  = ctk.CTkLabel(self, text="DATA", font=("Arial", 14), text_color="white")
+        coluna_titulo_hora  = ctk.CTkLabel(self, text="HORA", font=("Arial", 14), text_color="white")
+
+        # Posiciona os rótulos de coluna na interface
+        coluna_titulo_tipo.place(x=20, y=122)
+        coluna_titulo_valor.place(x=100, y=122)
+        coluna_titulo_data.place(x=180, y=122)
+        coluna_titulo_hora.place(x=260, y=122)
+
+        # Criação de um frame para exibir as transações
+        frame_inferior = ctk.CTkFrame(self, width=330, height=280, corner_radius=15, fg_color="#444444")
+        frame_inferior.place(relx=0.5, y=140 + 10, anchor="n")
+
+        # Lista virtual: cria rótulos apenas para as linhas visíveis e os reaproveita na rolagem
+        self.lista_transacoes = ListaVirtual(frame_inferior, app.conta, app.escritor, width=330, height=280)
+        self.lista_transacoes.pack(fill="both", expand=True)
+
+        # Botão Voltar
+        voltar_button2 = ctk.CTkButton(self, width=40, height=40, text="<", command=lambda: self.app.mostrar_tela("painel"))  # Cria um botão "Voltar" para o painel principal
+        voltar_button2.place(x=25, y=440)  # Posiciona o botão no canto inferior esquerdo
+
+    # Função para aplicar os filtros digitados
+    def filtrar(self):
+        de, ate = self.de_entry.get().strip(), self.ate_entry.get().strip()
+        for data in (de, ate):
+            try:
+                if data:
+                    if not data_valida(data):  # strptime também aceitaria "1/2/2024"
+                        raise ValueError(data)
+                    datetime.strptime(data, "%d/%m/%Y")
+            except ValueError:
+                self.filtro_label.configure(text="Use datas no formato dd/mm/aaaa")
+                return
+        self.filtro_label.configure(text="")
+        tipo = self.tipo_menu.get()
+        self.lista_transacoes.filtrar(de=de, ate=ate, tipo=None if tipo == "TODOS" else tipo)
+
+    # Chamado pelo painel sempre que a tela volta a ser exibida
+    def ao_mostrar(self):
+        self.lista_transacoes.atualizar()  # Mostra as transações feitas desde a última visita
+
+if __name__ == "__main__":
+    import painel_principal
+    painel_principal.executar("extrato")  # Abre a janela principal já na tela de extrato
@@ -0,0 +1,109 @@
+import threading  # Thread que confirma os grupos
+import time  # Janela de espera para juntar operações
+from concurrent.futures import Future  # Resultado de cada operação, entregue a quem a enviou
+
+from armazenamento import OperacaoRecusada
+
+# Confirmação em grupo (group commit): com muitas operações chegando juntas,
+# em vez de cada uma gravar o diário, dar fsync e reescrever as projeções,
+# elas são reunidas e gravadas com uma única escrita e um único fsync.
+JANELA_GRUPO = 0.002  # Segundos que o grupo espera por mais operações depois da primeira
+MAXIMO_GRUPO = 1000  # Operações por grupo; um grupo cheio é confirmado sem esperar a janela
+
+
+class ConfirmacaoEmGrupo:
+    """
+    Fila de operações de um livro confirmadas em grupos por uma thread própria.
+
+    Quem chama registrar() (ou enviar()) entra na fila; a thread espera até
+    `janela` segundos (ou `maximo` operações) e grava o grupo com
+    livro.registrar_lote(). A janela só é esperada quando o grupo anterior
+    teve mais de uma operação. Operações que chegam enquanto um grupo é gravado
+    formam o próximo, então o tamanho dos grupos acompanha a quantidade de
+    clientes simultâneos. Cada operação é validada em ordem, vendo as
+    anteriores do grupo (regras de saque), e cada chamador recebe a própria
+    transação ou a própria OperacaoRecusada.
+    """
+
+    def __init__(self, livro, janela=JANELA_GRUPO, maximo=MAXIMO_GRUPO):
+        self.livro = livro
+        self.janela = janela
+        self.maximo = maximo
+        self._fila = []  # (futuro, tipo, centavos, validar) ainda não gravados
+        self._condicao = threading.Condition()
+        self._thread = None
+        self._fechado = False
+        self._ultimo_grupo = 0  # Tamanho do último grupo gravado
+
+    def enviar(self, tipo, centavos, validar=None):
+        """
+        Coloca a operação na fila e retorna um concurrent.futures.Future com
+        a transação gravada (ou a OperacaoRecusada), sem esperar a gravação.
+        """
+        futuro = Future()
+        with self._condicao:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._trabalhar, name="grupo", daemon=True)
+                self._thread.start()
+            self._fila.append((futuro, tipo, centavos, validar))
+            if len(self._fila) == 1 or len(self._fila) >= self.maximo:
+                self._condicao.notify()
+        return futuro
+
+    def registrar(self, tipo, centavos, validar=None):
+        """
+        Mesma interface de Livro.registrar: espera o grupo da operação ser gravado.
+        """
+        return self.enviar(tipo, centavos, validar).result()
+
+    def _trabalhar(self):
+        while True:
+            with self._condicao:
+                while not self._fila and not self._fechado:
+                    self._condicao.wait()
+                if not self._fila:
+                    self._thread = None  # Encerrada e sem operações pendentes (um novo enviar() a recria)
+                    return
+                # Só espera a janela se o grupo anterior teve companhia: um cliente
+                # sozinho não paga a espera, e com disputa os grupos crescem
+                limite = time.monotonic() + (self.janela if self._ultimo_grupo > 1 else 0)
+                while len(self._fila) < self.maximo and not self._fechado:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        break
+                    self._condicao.wait(restante)
+                grupo, self._fila = self._fila[:self.maximo], self._fila[self.maximo:]
+                self._ultimo_grupo = len(grupo)
+            self._confirmar(grupo)
+
+    def _confirmar(self, grupo):
+        """
+        Grava um grupo e entrega o resultado de cada operação.
+        """
+        operacoes = [(indice, tipo, centavos, validar) for indice, (_, tipo, centavos, validar) in enumerate(grupo)]
+        aceitas = {}
+        try:
+            # Operações independentes: um grupo interrompido não precisa ser desfeito por inteiro
+            recusas = self.livro.registrar_lote(operacoes, aceitas, atomico=False)
+        except Exception as erro:
+            for futuro, *_ in grupo:
+                futuro.set_exception(erro)
+            return
+        for indice, mensagem in recusas:
+            grupo[indice][0].set_exception(OperacaoRecusada(mensagem))
+        for indice, transacao in aceitas.items():
+            grupo[indice][0].set_result(transacao)
+
+    def fechar(self):
+        """
+        Grava as operações pendentes e encerra a thread. A fila continua
+        utilizável depois (como o livro, que reabre o diário sob demanda).
+        """
+        with self._condicao:
+            self._fechado = True
+            self._condicao.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        with self._condicao:
+            self._fechado = False
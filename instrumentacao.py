@@ -0,0 +1,252 @@
+import atexit  # Grava as métricas ao sair, quando ativadas pela variável de ambiente
+import bisect  # Localiza a faixa do histograma de cada medição
+import contextlib
+import functools
+import json  # Métricas em JSON
+import os  # Variáveis de ambiente e contadores de E/S da thread (/proc)
+import threading  # As operações rodam na interface, no escritor e no observador
+import time  # Medição da latência
+
+# Instrumentação opcional das operações do banco: latência (histograma) e
+# bytes lidos/gravados de cada operação medida. Desligada por padrão; com ela
+# desligada, cada função medida custa só uma verificação a mais.
+#
+# Para ligar:
+#   BANCO_METRICAS=metricas.json python login.py.py      (ou metricas.prom)
+#   python instrumentacao.py --metricas metricas.prom --perfil login.prof login.py.py
+#
+# As operações medidas usam nomes "módulo.operação" (conta.saldo,
+# conta.depositar, credenciais.verificar, tela.deposito, ...).
+
+# Limites das faixas do histograma, em segundos (mesmos padrões do Prometheus, mais finos embaixo)
+FAIXAS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ARQUIVO_ES = "/proc/thread-self/io"  # rchar/wchar da thread atual (só no Linux)
+
+_registro = None  # Métricas coletadas; None enquanto a instrumentação estiver desligada
+_trava = threading.Lock()
+_por_thread = threading.local()  # Descritor de ARQUIVO_ES aberto por cada thread
+
+
+class _DescritorES:
+    """
+    ARQUIVO_ES aberto pela thread que o usa, fechado quando ela termina
+    (o threading.local descarta os valores da thread ao fim dela).
+    """
+
+    numero = None
+
+    def __init__(self):
+        self.numero = os.open(ARQUIVO_ES, os.O_RDONLY)  # Vale só para esta thread
+
+    def __del__(self):
+        if self.numero is not None:  # None: o open() falhou (fora do Linux)
+            os.close(self.numero)
+
+
+# Função que lê os bytes lidos e gravados pela thread atual até agora, ou None.
+# A própria leitura de ARQUIVO_ES entra no rchar seguinte, por isso o tamanho dela também é retornado.
+def _bytes_da_thread():
+    try:
+        descritor = getattr(_por_thread, "descritor", None)
+        if descritor is None:
+            descritor = _por_thread.descritor = _DescritorES()
+        conteudo = os.pread(descritor.numero, 4096, 0)
+        rchar, wchar, _ = conteudo.split(b"\n", 2)  # "rchar: N", "wchar: N", demais campos
+        return int(rchar[7:]), int(wchar[7:]), len(conteudo)
+    except (OSError, ValueError):
+        return None
+
+
+def ativar():
+    """
+    Liga a instrumentação (zerando o que já tinha sido coletado).
+    """
+    global _registro
+    with _trava:
+        _registro = {}
+
+
+def desativar():
+    global _registro
+    with _trava:
+        _registro = None
+
+
+def ativa():
+    return _registro is not None
+
+
+def registrar(nome, segundos, lidos=None, gravados=None):
+    """
+    Soma uma medição da operação `nome` (latência em segundos e, se
+    conhecidos, bytes lidos e gravados).
+    """
+    with _trava:
+        if _registro is None:
+            return
+        metrica = _registro.get(nome)
+        if metrica is None:
+            metrica = _registro[nome] = {"faixas": [0] * (len(FAIXAS) + 1), "contagem": 0, "soma": 0.0,
+                                         "maximo": 0.0, "bytes_lidos": 0, "bytes_gravados": 0}
+        metrica["faixas"][bisect.bisect_left(FAIXAS, segundos)] += 1
+        metrica["contagem"] += 1
+        metrica["soma"] += segundos
+        metrica["maximo"] = max(metrica["maximo"], segundos)
+        if lidos is not None:
+            metrica["bytes_lidos"] += lidos
+            metrica["bytes_gravados"] += gravados
+
+
+class _Medicao:
+    """
+    Mede um trecho: `with medir("nome"):`.
+    """
+
+    def __init__(self, nome):
+        self.nome = nome
+
+    def __enter__(self):
+        self.es = _bytes_da_thread()
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *erro):
+        segundos = time.perf_counter() - self.inicio
+        lidos = gravados = None
+        if self.es is not None:
+            depois = _bytes_da_thread()
+            if depois is not None:
+                lidos = depois[0] - self.es[0] - self.es[2]
+                gravados = depois[1] - self.es[1]
+        registrar(self.nome, segundos, lidos, gravados)
+
+
+_SEM_MEDICAO = contextlib.nullcontext()
+
+
+def medir(nome):
+    """
+    Gerenciador de contexto que mede o trecho como a operação `nome`
+    (não faz nada com a instrumentação desligada).
+    """
+    if _registro is None:
+        return _SEM_MEDICAO
+    return _Medicao(nome)
+
+
+def medido(nome):
+    """
+    Decorador que mede cada chamada da função como a operação `nome`.
+    """
+    def decorar(funcao):
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            if _registro is None:
+                return funcao(*args, **kwargs)
+            with _Medicao(nome):
+                return funcao(*args, **kwargs)
+        return medida
+    return decorar
+
+
+# Função que estima um percentil pelo histograma (limite superior da faixa)
+def _percentil(metrica, fracao):
+    alvo, acumulado = metrica["contagem"] * fracao, 0
+    for limite, quantidade in zip(FAIXAS, metrica["faixas"]):
+        acumulado += quantidade
+        if acumulado >= alvo:
+            return limite
+    return metrica["maximo"]
+
+
+def resumo():
+    """
+    Retorna as métricas coletadas: {operação: {contagem, soma, maximo,
+    p50, p99, bytes_lidos, bytes_gravados, faixas}}.
+    """
+    with _trava:
+        metricas = {nome: dict(metrica, faixas=list(metrica["faixas"])) for nome, metrica in (_registro or {}).items()}
+    for metrica in metricas.values():
+        metrica["p50"] = _percentil(metrica, 0.5)
+        metrica["p99"] = _percentil(metrica, 0.99)
+    return metricas
+
+
+# Função que monta as métricas no formato de texto do Prometheus
+def texto_prometheus(metricas):
+    linhas = ["# HELP banco_operacao_segundos Latência das operações do banco.",
+              "# TYPE banco_operacao_segundos histogram"]
+    for nome, metrica in sorted(metricas.items()):
+        acumulado = 0
+        for limite, quantidade in zip(FAIXAS + ("+Inf",), metrica["faixas"]):
+            acumulado += quantidade
+            linhas.append(f'banco_operacao_segundos_bucket{{operacao="{nome}",le="{limite}"}} {acumulado}')
+        linhas.append(f'banco_operacao_segundos_sum{{operacao="{nome}"}} {metrica["soma"]:.6f}')
+        linhas.append(f'banco_operacao_segundos_count{{operacao="{nome}"}} {metrica["contagem"]}')
+    for chave, descricao in (("bytes_lidos", "Bytes lidos pelas operações do banco."),
+                             ("bytes_gravados", "Bytes gravados pelas operações do banco.")):
+        linhas.append(f"# HELP banco_operacao_{chave}_total {descricao}")
+        linhas.append(f"# TYPE banco_operacao_{chave}_total counter")
+        for nome, metrica in sorted(metricas.items()):
+            linhas.append(f'banco_operacao_{chave}_total{{operacao="{nome}"}} {metrica[chave]}')
+    return "\n".join(linhas) + "\n"
+
+
+def gravar(caminho):
+    """
+    Grava as métricas em `caminho`: texto do Prometheus se terminar em
+    .prom ou .txt, JSON nos demais casos.
+    """
+    metricas = resumo()
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        if caminho.endswith((".prom", ".txt")):
+            arquivo.write(texto_prometheus(metricas))
+        else:
+            json.dump({"faixas_segundos": FAIXAS, "operacoes": metricas}, arquivo, indent=2, ensure_ascii=False)
+
+
+# Liga a instrumentação ao importar, se pedido pela variável de ambiente
+if os.environ.get("BANCO_METRICAS"):
+    ativar()
+    atexit.register(gravar, os.environ["BANCO_METRICAS"])
+
+
+# Função que executa um script (login.py.py, lote.py, ...) com as métricas e/ou o cProfile ligados
+def executar(alvo, argumentos, metricas=None, perfil=None, ordenar="cumulative", linhas=25):
+    import cProfile
+    import pstats
+    import runpy
+    import sys
+
+    if metricas:
+        ativar()
+    sys.argv = [alvo] + list(argumentos)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(alvo)))
+    perfilador = cProfile.Profile() if perfil else None
+    try:
+        if perfilador is not None:
+            perfilador.enable()
+        runpy.run_path(alvo, run_name="__main__")
+    finally:
+        if perfilador is not None:
+            perfilador.disable()
+            perfilador.dump_stats(perfil)
+            pstats.Stats(perfilador, stream=sys.stderr).sort_stats(ordenar).print_stats(linhas)
+        if metricas:
+            gravar(metricas)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import instrumentacao  # O módulo importado pelo banco, não esta cópia rodando como __main__
+
+    # python instrumentacao.py [--metricas m.json|m.prom] [--perfil p.prof] script.py [argumentos...]
+    parser = argparse.ArgumentParser(description="Executa um script do banco com métricas e/ou cProfile.")
+    parser.add_argument("--metricas", help="grava as métricas neste arquivo (.json, ou .prom/.txt)")
+    parser.add_argument("--perfil", help="liga o cProfile e grava o perfil neste arquivo (abra com pstats/snakeviz)")
+    parser.add_argument("--ordenar", default="cumulative", help="ordem do resumo do perfil (padrão: cumulative)")
+    parser.add_argument("alvo", help="script a executar, por exemplo login.py.py ou lote.py")
+    parser.add_argument("argumentos", nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+    instrumentacao.executar(args.alvo, args.argumentos, args.metricas, args.perfil, args.ordenar)
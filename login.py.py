@@ -1,30 +1,22 @@
 import customtkinter as ctk  # Biblioteca para criar interfaces gráficas modernas
-import json  # Módulo para manipulação de arquivos JSON
 import os  # Módulo para manipulação de arquivos e diretórios do sistema
-import painel_principal  # Importando o módulo da janela principal do sistema
-from PIL import Image  # Módulo para manipulação de imagens (Python Imaging Library)
+import queue  # Fila para receber o resultado da verificação de senha
+import threading  # Para verificar a senha sem travar a janela
+from credenciais import USER_DATA_FILE, obter_credenciais  # Cadastro de usuários com senhas em hash
+import recursos  # Cache de imagens compartilhada com o painel principal
+from instrumentacao import medido  # Métricas opcionais (ver instrumentacao.py)
+from sessoes import apagar_sessao, obter_sessoes, salvar_sessao, sessao_salva  # Sessão para entrar de novo sem senha
 
-# Nome do arquivo JSON onde os dados dos usuários serão armazenados
-USER_DATA_FILE = "users.json"
+# Cadastro de usuários com senhas em hash (users.json), ver credenciais.py
+credenciais = obter_credenciais()
 
 # Função para carregar os usuários do arquivo JSON
 def load_users():
     """
-    Carrega os usuários do arquivo JSON. Se o arquivo não existir,
-    retorna um dicionário com um usuário padrão (admin).
+    Carrega os usuários ({usuario: hash da senha}) do arquivo JSON.
+    O arquivo só é lido de novo quando muda no disco.
     """
-    if os.path.exists(USER_DATA_FILE):  # Verifica se o arquivo de usuários existe
-        with open(USER_DATA_FILE, "r") as file:  # Abre o arquivo para leitura
-            return json.load(file)  # Retorna o conteúdo do arquivo como dicionário
-    return {"admin": "admin"}  # Retorna um dicionário com um usuário pré-cadastrado
-
-# Função para salvar os usuários no arquivo JSON
-def save_users(users):
-    """
-    Salva o dicionário de usuários no arquivo JSON.
-    """
-    with open(USER_DATA_FILE, "w") as file:  # Abre o arquivo para escrita (sobrescreve o arquivo existente)
-        json.dump(users, file, indent=4)  # Salva o dicionário de usuários no formato JSON com indentação de 4 espaços
+    return credenciais.usuarios()
 
 # Função para validar o CPF (aceita apenas números ou campo vazio)
 def validar_cpf(text):
@@ -37,49 +29,90 @@ def ensure_admin_user():
     Se o arquivo não existir, cria um arquivo com o usuário admin.
     """
     if not os.path.exists(USER_DATA_FILE):  # Verifica se o arquivo de usuários não existe
-        save_users({"admin": "admin"})  # Cria o arquivo com o usuário admin pré-cadastrado
+        credenciais.definir_senha("admin", "admin")  # Cria o arquivo com o usuário admin pré-cadastrado (senha em hash)
 
 # Chama a função para garantir que o usuário 'admin' seja criado, caso necessário
 ensure_admin_user()
 
 # Função para autenticar o usuário durante o login
+@medido("login.autenticar")
 def authenticate_user(username, password, login_window, error_label):
     """
     Verifica se o nome de usuário e a senha são válidos.
-    Se forem, fecha a janela de login e abre o painel principal.
+    Se forem, abre uma sessão e fecha a janela de login (login_screen abre
+    o painel principal em seguida).
     Caso contrário, exibe uma mensagem de erro.
+    O cálculo do hash roda em uma thread separada para a janela não travar;
+    o resultado volta para a thread da interface através de after().
+    """
+    if getattr(login_window, "verificando", False):  # Ignora cliques/Enter repetidos durante a verificação
+        return
+    login_window.verificando = True
+    error_label.configure(text="Verificando...", text_color="white")  # Mostra que o login está em andamento
+
+    resultado = queue.Queue()  # Recebe o resultado da thread de verificação
+    threading.Thread(target=lambda: resultado.put(credenciais.verificar(username, password)), daemon=True).start()
+
+    # Função que confere, sem bloquear, se a verificação já terminou
+    def aguardar_resultado():
+        try:
+            valido = resultado.get_nowait()
+        except queue.Empty:
+            login_window.after(15, aguardar_resultado)  # Ainda calculando: confere de novo em 15 ms
+            return
+        login_window.verificando = False
+        if valido:
+            print("Login bem-sucedido!")  # Mensagem no terminal (pode ser removida em produção)
+            login_window.sessao = (username, obter_sessoes().criar(username))  # Token assinado, ver sessoes.py
+            login_window.destroy()  # Fecha a janela de login
+        else:
+            error_label.configure(text="⚠   Usuário ou senha incorretos  ⚠", text_color="white")  # Exibe a mensagem de erro
+
+    login_window.after(15, aguardar_resultado)
+
+# Função que importa o painel principal (e o núcleo bancário) depois que a tela de login já apareceu
+def pre_carregar_painel():
     """
-    users = load_users()  # Carrega os usuários do arquivo JSON
-    if username in users and users[username] == password:  # Verifica se o nome de usuário e senha estão corretos
-        print("Login bem-sucedido!")  # Mensagem no terminal (pode ser removida em produção)
-        login_window.destroy()  # Fecha a janela de login
-        painel_principal.App().mainloop()  # Abre a janela principal do sistema
-    else:
-        error_label.configure(text="⚠   Usuário ou senha incorretos  ⚠", text_color="white")  # Exibe a mensagem de erro
+    O painel só é usado depois do login: importá-lo na abertura atrasaria o
+    primeiro quadro da tela de login. Ele é importado logo depois, enquanto
+    o usuário digita, para a troca de tela continuar imediata.
+    """
+    import painel_principal  # Fica em sys.modules; abrir_painel só o reutiliza
 
-# Função que cria a tela de login
-def login_screen():
+# Função que abre o painel principal na conta do usuário de uma sessão
+def abrir_painel(username, token):
+    """
+    Guarda o token (para a próxima abertura entrar direto) e abre a janela
+    principal. Retorna True se ela foi fechada porque a sessão expirou.
     """
-    Cria a janela de login utilizando a biblioteca CustomTkinter.
+    import painel_principal  # Já carregado por pre_carregar_painel, depois que a janela apareceu
+    from banco import obter_banco  # Núcleo bancário: cada usuário tem a própria conta
+    salvar_sessao(token)
+    ctk.set_appearance_mode("dark")  # Entrando direto pela sessão salva, a janela de login não chegou a configurar o tema
+    ctk.set_default_color_theme("blue")
+    app = painel_principal.App(conta=obter_banco().conta(username), sessao=token)
+    if not app.sessao_expirou:
+        app.mainloop()  # Abre a janela principal na conta do usuário
+    return app.sessao_expirou
+
+# Função que cria a janela de login (sem iniciar o loop da interface)
+def criar_janela_login():
+    """
+    Cria a janela de login utilizando a biblioteca CustomTkinter e a retorna.
     """
     ctk.set_appearance_mode("dark")  # Define o modo escuro para a interface
     ctk.set_default_color_theme("blue")  # Define a cor do tema como azul
 
     # Criando a janela principal da tela de login
     app = ctk.CTk()  # Cria a janela principal
+    app.sessao = None  # (usuário, token) depois de um login bem-sucedido
     app.geometry("350x520")  # Define o tamanho da janela
     app.title("Banco QAR V1")  # Define o título da janela
     app.configure(bg="#1E1E1E")  # Define a cor de fundo como cinza escuro
     app.resizable(False, False)  # Impede o redimensionamento da janela
 
-    # Definindo o diretório das imagens
-    image_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), "imagens")
-
-    # Caminho da imagem do logo
-    logo_path = os.path.join(image_path, "base_superior.png")
-
-    # Carrega a imagem do logo
-    base_superior = ctk.CTkImage(light_image=Image.open(logo_path), size=(350, 150))  # Ajusta o tamanho da imagem
+    # Carrega a imagem do logo já no tamanho final (cache compartilhada, ver recursos.py)
+    base_superior = recursos.carregar_imagem("base_superior.png", (350, 150))
 
     # Criando um frame centralizado para o conteúdo da tela de login
     frame = ctk.CTkFrame(app, width=350, height=600, corner_radius=15, fg_color="#2C2F33")  # Cria o frame de login
@@ -125,8 +158,28 @@ def login_screen():
     register_label = ctk.CTkLabel(frame, text="CONTACTE O ADMINISTRADOR", text_color="#3B82F6", font=("Arial", 13, "bold"))  # Rótulo de contato com administrador
     register_label.pack(pady=20)  # Adiciona o rótulo de contato
 
-    # Inicia a interface gráfica
-    app.mainloop()  # Inicia o loop principal da interface
+    app.after(200, pre_carregar_painel)  # Depois do primeiro quadro
+    return app
+
+# Função que cria a tela de login
+def login_screen():
+    """
+    Cria a janela de login e inicia a interface gráfica.
+    Com uma sessão salva ainda válida (conferida em O(1), sem ler users.json),
+    o painel abre direto; quando a sessão expira, a tela de login volta.
+    """
+    while True:
+        token = sessao_salva()
+        username = obter_sessoes().validar(token) if token else None
+        if username is None:
+            apagar_sessao()
+            app = criar_janela_login()
+            app.mainloop()  # Inicia o loop principal da interface
+            if app.sessao is None:  # Janela fechada sem login
+                return
+            username, token = app.sessao
+        if not abrir_painel(username, token):
+            return
 
 # Executa a tela de login se este arquivo for executado diretamente
 if __name__ == "__main__":
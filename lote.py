@@ -0,0 +1,122 @@
+import csv  # Leitura de arquivos de lote em CSV
+import json  # Leitura de arquivos de lote em JSON Lines
+import time  # Medição da vazão do lote
+
+from dinheiro import para_centavos
+from instrumentacao import medido
+
+# Lançamentos em lote (folha de pagamento, liquidações): lê um arquivo de
+# operações, confere cada uma com as regras do banco e grava as aceitas de
+# cada conta com uma única confirmação em disco (Conta.lancar_lote).
+#
+# CSV (separador ";" ou ","), com cabeçalho:   conta;tipo;valor
+#                                              maria;DEPOSITO;1500,00
+# JSON Lines, uma operação por linha:          {"conta": "maria", "tipo": "SAQUE", "valor": "20.50"}
+# Em JSON o valor também pode vir em "centavos" (inteiro).
+# Só lança em contas que já existem (um nome digitado errado não abre uma
+# conta nova), a menos que `criar_contas` seja verdadeiro (--criar-contas).
+
+
+# Função que confere o nome da conta de uma linha
+def _conta(nome):
+    nome = str(nome).strip()
+    if not nome:
+        raise ValueError("conta em branco")
+    return nome
+
+
+# Função geradora que lê o arquivo de lote: (número da linha, conta, tipo, centavos) ou (número da linha, erro)
+def ler_operacoes(caminho):
+    with open(caminho, "r", encoding="utf-8", newline="") as arquivo:
+        if caminho.endswith(".jsonl"):
+            for numero, linha in enumerate(arquivo, start=1):
+                if not linha.strip():
+                    continue
+                try:
+                    operacao = json.loads(linha)
+                    centavos = operacao["centavos"] if "centavos" in operacao else para_centavos(operacao["valor"])
+                    if type(centavos) is not int:
+                        raise ValueError(f"centavos deve ser um número inteiro: {centavos!r}")
+                    yield numero, _conta(operacao["conta"]), str(operacao["tipo"]).upper(), centavos
+                except (ValueError, KeyError, TypeError) as erro:
+                    yield numero, f"Linha inválida: {erro}"
+            return
+        primeira = arquivo.readline()
+        delimitador = ";" if primeira.count(";") >= primeira.count(",") else ","
+        colunas = [coluna.strip().lower() for coluna in primeira.split(delimitador)]
+        try:
+            i_conta, i_tipo, i_valor = (colunas.index(nome) for nome in ("conta", "tipo", "valor"))
+        except ValueError:
+            raise ValueError(f"O cabeçalho do CSV precisa das colunas conta, tipo e valor: {primeira.strip()!r}")
+        for numero, campos in enumerate(csv.reader(arquivo, delimiter=delimitador), start=2):
+            if not campos:
+                continue
+            try:
+                if len(campos) != len(colunas):
+                    raise ValueError(f"esperadas {len(colunas)} colunas, encontradas {len(campos)}")
+                yield numero, _conta(campos[i_conta]), campos[i_tipo].strip().upper(), para_centavos(campos[i_valor])
+            except ValueError as erro:
+                yield numero, f"Linha inválida: {erro}"
+
+
+# Função principal: lança as operações do arquivo e retorna um relatório
+@medido("lote.lancar_arquivo")
+def lancar_arquivo(banco, caminho, criar_contas=False):
+    """
+    As operações são agrupadas por conta, mantendo a ordem do arquivo, e
+    cada conta recebe uma única gravação. Linhas de contas inexistentes são
+    recusadas, a menos que `criar_contas` seja verdadeiro. Retorna um
+    dicionário com o total de linhas, as aceitas, as recusas
+    [(linha, mensagem)] e a vazão.
+    """
+    inicio = time.perf_counter()
+    por_conta, recusas, linhas = {}, [], 0
+    for lida in ler_operacoes(caminho):
+        linhas += 1
+        if len(lida) == 2:
+            recusas.append(lida)
+            continue
+        numero, conta, tipo, centavos = lida
+        por_conta.setdefault(conta, ([], []))
+        por_conta[conta][0].append(numero)
+        por_conta[conta][1].append((tipo, centavos))
+    for nome, (numeros, operacoes) in por_conta.items():
+        if not criar_contas and not banco.existe(nome):
+            recusas.extend((numero, f"Conta inexistente: {nome}") for numero in numeros)
+            continue
+        for indice, mensagem in banco.conta(nome).lancar_lote(operacoes):
+            recusas.append((numeros[indice], mensagem))
+    duracao = time.perf_counter() - inicio
+    recusas.sort()
+    return {
+        "linhas": linhas,
+        "aceitas": linhas - len(recusas),
+        "recusas": recusas,
+        "contas": len(por_conta),
+        "segundos": duracao,
+        "operacoes_por_segundo": linhas / duracao if duracao else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from banco import obter_banco
+
+    # python lote.py folha.csv [--recusas recusas.csv] [--criar-contas]
+    parser = argparse.ArgumentParser(description="Lança depósitos e saques em lote a partir de um CSV ou JSONL.")
+    parser.add_argument("arquivo")
+    parser.add_argument("--recusas", help="grava as linhas recusadas neste CSV (linha;motivo)")
+    parser.add_argument("--criar-contas", action="store_true", help="abre as contas do arquivo que ainda não existem")
+    args = parser.parse_args()
+    relatorio = lancar_arquivo(obter_banco(), args.arquivo, args.criar_contas)
+    print(f"{relatorio['aceitas']} de {relatorio['linhas']} operações lançadas em {relatorio['contas']} contas "
+          f"({relatorio['segundos']:.2f}s, {relatorio['operacoes_por_segundo']:,.0f} ops/s)")
+    if args.recusas:
+        with open(args.recusas, "w", encoding="utf-8", newline="") as arquivo:
+            escritor = csv.writer(arquivo, delimiter=";")
+            escritor.writerow(["linha", "motivo"])
+            escritor.writerows(relatorio["recusas"])
+    else:
+        for numero, mensagem in relatorio["recusas"]:
+            print(f"linha {numero}: {mensagem}")
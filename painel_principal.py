@@ -1,57 +1,55 @@
 import customtkinter as ctk  # Biblioteca para criar interfaces modernas
-from PIL import Image  # Manipulação de imagens
-import os  # Para manipular arquivos do sistema
-import subprocess
-import json  # Para salvar e carregar usuários
-import sys  # Para fechar o aplicativo completamente
+import importlib  # Para carregar o módulo de cada tela só quando ela for aberta
+import queue  # Eventos publicados por outras threads, entregues na thread da interface
+from banco import obter_banco  # Núcleo bancário (saldo, depósito, saque, extrato)
+from dinheiro import formatar  # Formata valores em centavos para exibição
+from escritor import Escritor  # Thread que faz a leitura e a gravação do livro fora da interface
+from eventos import Observador, barramento  # Avisos de mudança de saldo (desta janela ou de outros processos)
+import recursos  # Cache de imagens compartilhada entre as telas
+from instrumentacao import medir  # Métricas opcionais (ver instrumentacao.py)
+from sessoes import apagar_sessao, obter_sessoes, tocar_sessao  # Sessão aberta pela tela de login
 
-# Nome dos arquivos JSON para armazenar o saldo e as transações
-SALDO_FILE = "saldo.json"
-TRANSACOES_FILE = "transacoes.json"
+# Telas da aplicação: nome -> (módulo, classe). Todas vivem dentro da mesma janela.
+TELAS = {
+    "painel": ("painel_principal", "TelaPainel"),
+    "deposito": ("deposito", "TelaDeposito"),
+    "saque": ("saque", "TelaSaque"),
+    "extrato": ("extrato", "TelaExtrato"),
+    "resumo": ("resumo", "TelaResumo"),
+}
 
-class App(ctk.CTk):
-    def __init__(self):
+INTERVALO_EVENTOS = 100  # ms entre duas entregas de eventos para as telas
+RELER_SALDO = object()  # Evento do observador: o diário mudou, o saldo precisa ser lido de novo
+
+class TelaPainel(ctk.CTkFrame):
+    titulo = "Banco QAR V1"
+
+    def __init__(self, master, app):
         """
-        Inicializa a janela principal do aplicativo.
+        Inicializa o painel principal (saldo e botões de ação).
         Configura a interface gráfica, carrega imagens, e configurações iniciais.
         """
-        super().__init__()
-
-        # Configurações da Janela Principal
-        self.title("Banco QAR V1")
-        self.geometry("350x520")
-        self.resizable(False, False)  # Impede redimensionamento
+        super().__init__(master, width=350, height=520, corner_radius=0, fg_color="#2c2f33")
+        self.app = app  # Janela principal, responsável pela troca de telas
 
-        # Diretório das imagens
-        image_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), "imagens")
-        self.logo_path = os.path.join(image_path, "painel1.png")
-        self.cartao_path = os.path.join(image_path, "cartao.png")  
-        self.extratobranco_path = os.path.join(image_path, "extratobranco.png")  
-        self.depositobranco_path = os.path.join(image_path, "depositobranco.png")  
-        self.saquebranco_path = os.path.join(image_path, "saquebranco.png")  
-
-        # Carregar imagens
+        # Carregar imagens (decodificadas uma única vez por processo, ver recursos.py)
         self.carregar_imagens()
 
         # Exibir a imagem de fundo, se existir
-        if os.path.exists(self.logo_path):
-            bg_image = ctk.CTkImage(light_image=Image.open(self.logo_path), size=(350, 520))
+        bg_image = recursos.carregar_imagem("painel1.png", (350, 520))
+        if bg_image is not None:
             bg_label = ctk.CTkLabel(self, image=bg_image, text="")
             bg_label.place(x=0, y=0, relwidth=1, relheight=1)
-        else:
-            print(f"Erro: Imagem '{self.logo_path}' não encontrada!")
 
         # Exibir a imagem do cartão, se existir
-        if os.path.exists(self.cartao_path):
-            cartao_image = ctk.CTkImage(light_image=Image.open(self.cartao_path), size=(300, 180))
+        cartao_image = recursos.carregar_imagem("cartao.png", (300, 180))
+        if cartao_image is not None:
             self.label_cartao = ctk.CTkLabel(self, image=cartao_image, text="")
             self.label_cartao.place(x=25, y=320)
-        else:
-            print(f"Erro: Imagem '{self.cartao_path}' não encontrada!")
 
         # Label de Boas-Vindas
         self.label_boas_vindas = ctk.CTkLabel(
-            self, text="Olá Jessie",
+            self, text=f"Olá {self.app.conta.nome}",
             text_color="#ffffff",
             font=("Arial", 12),
             fg_color="#2c2f33"
@@ -69,28 +67,31 @@ class App(ctk.CTk):
 
         # Exibir saldo atual
         self.saldo_label = ctk.CTkLabel(self, text="", font=("Arial", 16),fg_color="#2c2f33", text_color="white")
-        self.saldo_label.place(x=15, y=160)  # Ajuste as coordenadas conforme necessário
-        self.atualizar_saldo()  # Atualiza o saldo na inicialização
+        self.saldo_label.place(x=15, y=160)  # Ajuste as coordenadas conforme necessário (o saldo é lido em ao_mostrar)
+
+        # Botão do resumo (totais por mês, evolução do saldo e saques disponíveis hoje)
+        self.botao_resumo = ctk.CTkButton(self, text="Resumo", height=28, width=90, command=self.app.abrir_resumo)
+        self.botao_resumo.place(x=240, y=160)
 
         # Botões de Ação
         self.botao_deposito = ctk.CTkButton(
             self, text="", image=self.depositobranco_image, height=80, width=80, 
             compound="top",   # Move a imagem mais para cima
-            command=self.abrir_deposito  
+            command=self.app.abrir_deposito  
         )
         self.botao_deposito.place(x=25, y=220)
 
         self.botao_extrato = ctk.CTkButton(
             self, text="", image=self.extratobranco_image, height=80, width=80, 
             compound="top",   # Move a imagem mais para cima
-            command=self.abrir_extrato
+            command=self.app.abrir_extrato
         )
         self.botao_extrato.place(x=132, y=220)
 
         self.botao_saque = ctk.CTkButton(
             self, text="", image=self.saquebranco_image, height=80, width=80, 
             compound="top",   # Move a imagem mais para cima
-            command=self.abrir_saque  # Chama a função correta
+            command=self.app.abrir_saque  # Chama a função correta
         )
         self.botao_saque.place(x=240, y=220)
 
@@ -99,78 +100,208 @@ class App(ctk.CTk):
         Carrega todas as imagens necessárias para os botões e outros elementos gráficos.
         Caso a imagem não seja encontrada, imprime uma mensagem de erro.
         """
-        # Carregar imagens
-        if os.path.exists(self.extratobranco_path):
-            self.extratobranco_image = ctk.CTkImage(light_image=Image.open(self.extratobranco_path), size=(60, 60))
-        else:
-            print(f"Erro: Imagem '{self.extratobranco_path}' não encontrada!")
-            self.extratobranco_image = None
-
-        if os.path.exists(self.depositobranco_path):
-            self.depositobranco_image = ctk.CTkImage(light_image=Image.open(self.depositobranco_path), size=(60, 60))
-        else:
-            print(f"Erro: Imagem '{self.depositobranco_path}' não encontrada!")
-            self.depositobranco_image = None
-
-        if os.path.exists(self.saquebranco_path):
-            self.saquebranco_image = ctk.CTkImage(light_image=Image.open(self.saquebranco_path), size=(60, 60))
-        else:
-            print(f"Erro: Imagem '{self.saquebranco_path}' não encontrada!")
-            self.saquebranco_image = None
+        self.extratobranco_image = recursos.carregar_imagem("extratobranco.png", (60, 60))
+        self.depositobranco_image = recursos.carregar_imagem("depositobranco.png", (60, 60))
+        self.saquebranco_image = recursos.carregar_imagem("saquebranco.png", (60, 60))
 
     def load_saldo(self):
         """
-        Carrega o saldo armazenado no arquivo JSON.
-        Retorna 0.0 se o arquivo não existir ou se não houver saldo.
+        Retorna o saldo da conta aberta na janela principal.
         """
-        if os.path.exists(SALDO_FILE):
-            with open(SALDO_FILE, "r") as file:
-                return json.load(file).get("saldo", 0.0)
-        return 0.0  # Retorna 0.0 se o arquivo não existir
+        return self.app.conta.saldo()
 
     def atualizar_saldo(self):
         """
-        Atualiza a exibição do saldo na interface gráfica.
+        Atualiza a exibição do saldo na interface gráfica. O App guarda o
+        último saldo conhecido e só lê o livro se ainda não tiver um.
+        """
+        self.app.exibir_saldo()
+
+    def mostrar_saldo(self, novo_saldo):
+        self.saldo_label.configure(text=f"R${formatar(novo_saldo)}")
+
+    def ao_mostrar(self):
+        """
+        Chamado sempre que o painel volta a ser exibido.
+        """
+        self.atualizar_saldo()
+
+class App(ctk.CTk):
+    def __init__(self, tela_inicial="painel", conta=None, sessao=None):
+        """
+        Inicializa a janela principal do aplicativo.
+        Todas as telas são frames dentro desta única janela: trocar de tela
+        apenas traz o frame para frente, sem abrir um novo processo.
+        `sessao` é o token do login (ver sessoes.py), conferido a cada troca
+        de tela; sem ele (execução direta) a janela não pede sessão.
         """
-        novo_saldo = self.load_saldo()
-        self.saldo_label.configure(text=f"R${novo_saldo:.2f}")
+        super().__init__()
+
+        # Configurações da Janela Principal
+        self.geometry("350x520")
+        self.resizable(False, False)  # Impede redimensionamento
+
+        self.conta = conta or obter_banco().conta()  # Conta exibida pelas telas
+        self.sessao = sessao
+        self.sessao_expirou = False  # Fechada por sessão encerrada: quem abriu volta ao login
+        self.escritor = Escritor(self.after, self.report_callback_exception)  # Todo acesso das telas ao livro passa por ele
+        self.protocol("WM_DELETE_WINDOW", self.fechar)
+        self.telas = {}  # Telas já criadas, reaproveitadas nas próximas visitas
+
+        # Saldo ao vivo: operações desta janela publicam o novo saldo no barramento, e o
+        # observador percebe quando outro processo grava na mesma conta
+        self.saldo_atual = None  # Último saldo conhecido (None: ainda não foi lido)
+        self._eventos = queue.Queue()
+        self._cancelar_assinatura = barramento.assinar("saldo", self._saldo_publicado)
+        self.observador = Observador()
+        self.observador.observar(self.conta.arquivo_alterado(), self._arquivo_alterado)
+        self.after(INTERVALO_EVENTOS, self._entregar_eventos)
+        self.mostrar_tela(tela_inicial)
+
+    def mostrar_tela(self, nome):
+        """
+        Exibe a tela `nome`, criando-a apenas na primeira vez.
+        """
+        if not self.sessao_valida():
+            self.encerrar_sessao()
+            return
+        tela = self.telas.get(nome)
+        if tela is None:
+            modulo, classe = TELAS[nome]
+            with medir(f"tela.{nome}"):  # Importação do módulo e criação dos widgets
+                if nome == "painel":
+                    classe_tela = TelaPainel  # Evita importar este arquivo de novo quando roda como script
+                else:
+                    classe_tela = getattr(importlib.import_module(modulo), classe)
+                tela = classe_tela(self, self)
+                tela.place(relx=0.5, rely=0.5, anchor="center")
+            self.telas[nome] = tela
+        tela.tkraise()  # Traz a tela para frente das outras
+        self.title(tela.titulo)
+        tela.ao_mostrar()
+
+    def sessao_valida(self):
+        """
+        Confere (em O(1), sem ler users.json) se a sessão continua aberta e é
+        da conta exibida; cada conferência conta como uso da sessão.
+        """
+        if self.sessao is None:
+            return True
+        if obter_sessoes().validar(self.sessao) != self.conta.nome:
+            return False
+        tocar_sessao()  # A próxima abertura também conta o tempo ocioso a partir daqui
+        return True
+
+    def encerrar_sessao(self):
+        """
+        Sessão expirada ou encerrada: apaga o token salvo e fecha a janela.
+        """
+        apagar_sessao()
+        self.sessao_expirou = True
+        self.fechar()
+
+    def fechar(self):
+        """
+        Fecha a janela depois que as operações em andamento forem gravadas.
+        """
+        self._cancelar_assinatura()
+        self.observador.parar()
+        self.escritor.parar()
+        self.destroy()
+
+    def _saldo_publicado(self, conta, saldo_centavos):
+        # Pode rodar em qualquer thread: só enfileira, a entrega é feita pela interface
+        if conta == self.conta.nome:
+            self._eventos.put(saldo_centavos)
+
+    def _arquivo_alterado(self, caminho):
+        # Roda na thread do observador: o diário da conta mudou (talvez por outro processo).
+        # A leitura fica com o escritor, a única thread das telas que acessa o livro
+        self._eventos.put(RELER_SALDO)
+
+    def _entregar_eventos(self):
+        """
+        Entrega às telas o saldo mais recente recebido desde a última vez.
+        Avisos do observador viram uma única leitura do saldo no escritor.
+        """
+        saldo, reler = None, False
+        while True:
+            try:
+                evento = self._eventos.get_nowait()
+            except queue.Empty:
+                break
+            if evento is RELER_SALDO:
+                reler = True
+            else:
+                saldo = evento
+        if saldo is not None:
+            self._saldo_lido(saldo)
+        if reler:
+            self.escritor.enviar(self.conta.saldo, ao_terminar=self._saldo_lido)
+        self.after(INTERVALO_EVENTOS, self._entregar_eventos)
+
+    def _saldo_lido(self, saldo):
+        if saldo != self.saldo_atual:
+            self.mostrar_saldo(saldo)
+
+    def mostrar_saldo(self, saldo):
+        """
+        Guarda o saldo e o exibe em todas as telas já criadas.
+        """
+        self.saldo_atual = saldo
+        for tela in self.telas.values():
+            if hasattr(tela, "mostrar_saldo"):
+                tela.mostrar_saldo(saldo)
+
+    def exibir_saldo(self):
+        """
+        Exibe o saldo conhecido nas telas; o livro só é lido (na thread do
+        escritor) na primeira vez.
+        """
+        if self.saldo_atual is None:
+            self.escritor.enviar(self.conta.saldo, ao_terminar=self.mostrar_saldo)
+        else:
+            self.mostrar_saldo(self.saldo_atual)
 
     def abrir_deposito(self):
         """
-        Abre a tela de depósito, fechando a janela principal.
-        Executa o script 'deposito.py' em um novo processo.
+        Abre a tela de depósito.
         """
-        self.destroy()  # Fecha a janela principal antes de abrir o depósito
-        subprocess.run(["python", "deposito.py"], check=True)  # Chama o outro arquivo Python
+        self.mostrar_tela("deposito")
 
     def abrir_saque(self):
         """
-        Abre a tela de saque, fechando a janela principal.
-        Executa o script 'saque.py' em um novo processo.
+        Abre a tela de saque.
         """
-        self.destroy()  # Fecha a janela principal antes de abrir o saque
-        subprocess.run(["python", "saque.py"], check=True)  # Chama o outro arquivo Python
+        self.mostrar_tela("saque")
 
     def abrir_extrato(self):
         """
-        Abre a tela de extrato, fechando a janela principal.
-        Executa o script 'extrato.py' em um novo processo.
+        Abre a tela de extrato.
         """
-        self.destroy()  # Fecha a janela principal antes de abrir o extrato
-        subprocess.run(["python", "extrato.py"], check=True)  # Chama o outro arquivo Python
+        self.mostrar_tela("extrato")
 
-    def abrir_janela(self, janela):
+    def abrir_resumo(self):
         """
-        Fecha o aplicativo atual e abre uma nova janela selecionada.
+        Abre a tela de resumo da conta.
         """
-        self.destroy()  # Fecha a janela atual
-        nova_janela = janela()  # Cria uma nova janela
-        nova_janela.mainloop()  # Inicia a nova janela
+        self.mostrar_tela("resumo")
 
-if __name__ == "__main__":
+    def abrir_janela(self, nome):
+        """
+        Troca para a tela selecionada (ver TELAS).
+        """
+        self.mostrar_tela(nome)
+
+# Função que inicia a aplicação em uma das telas
+def executar(tela_inicial="painel"):
     """
     Inicia a aplicação configurando o modo escuro e rodando a janela principal.
     """
     ctk.set_appearance_mode("dark")  # Define o modo escuro como padrão
-    app = App()
+    ctk.set_default_color_theme("blue")  # Define a cor do tema como azul
+    app = App(tela_inicial)
     app.mainloop()
+
+if __name__ == "__main__":
+    executar()
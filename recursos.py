@@ -0,0 +1,68 @@
+import os  # Para manipular arquivos do sistema
+import customtkinter as ctk  # Biblioteca para criar interfaces modernas
+from PIL import Image  # Manipulação de imagens
+
+# Diretório das imagens e da cache de imagens já redimensionadas
+PASTA_IMAGENS = os.path.join(os.path.dirname(os.path.realpath(__file__)), "imagens")
+PASTA_CACHE = os.path.join(PASTA_IMAGENS, ".cache")
+
+# Guarda em disco as versões redimensionadas (False = sempre redimensiona na memória)
+USAR_CACHE_DISCO = True
+
+_imagens = {}  # (nome, tamanho) -> CTkImage já criada neste processo
+
+
+# Função para abrir uma imagem já no tamanho desejado
+def _abrir_redimensionada(caminho, tamanho):
+    """
+    Retorna a imagem PIL em `tamanho`. Com a cache em disco ativa, a versão
+    redimensionada é salva em imagens/.cache com o mtime do arquivo original
+    no nome, então uma imagem alterada gera uma nova entrada automaticamente.
+    """
+    if USAR_CACHE_DISCO:
+        nome, _ = os.path.splitext(os.path.basename(caminho))
+        mtime = os.stat(caminho).st_mtime_ns
+        caminho_cache = os.path.join(PASTA_CACHE, f"{nome}_{tamanho[0]}x{tamanho[1]}_{mtime}.png")
+        if os.path.exists(caminho_cache):
+            imagem = Image.open(caminho_cache)
+            imagem.load()  # Lê o arquivo agora para poder fechá-lo
+            return imagem
+
+    with Image.open(caminho) as original:
+        imagem = original.convert("RGBA").resize(tamanho, Image.LANCZOS)
+
+    if USAR_CACHE_DISCO:
+        try:
+            os.makedirs(PASTA_CACHE, exist_ok=True)
+            temporario = f"{caminho_cache}.{os.getpid()}.tmp"
+            imagem.save(temporario, format="PNG")
+            os.replace(temporario, caminho_cache)
+        except OSError:
+            pass  # Sem permissão de escrita: segue só com a cache em memória
+    return imagem
+
+
+# Função para obter uma imagem da pasta imagens/ pronta para usar em um widget
+def carregar_imagem(nome, tamanho):
+    """
+    Retorna um CTkImage de imagens/`nome` com o `tamanho` (largura, altura) pedido.
+    Cada par (nome, tamanho) é decodificado e redimensionado uma única vez por
+    processo. Retorna None (e avisa no terminal) se a imagem não existir.
+    """
+    chave = (nome, tuple(tamanho))
+    if chave not in _imagens:
+        caminho = os.path.join(PASTA_IMAGENS, nome)
+        if os.path.exists(caminho):
+            imagem = _abrir_redimensionada(caminho, chave[1])
+            _imagens[chave] = ctk.CTkImage(light_image=imagem, size=chave[1])
+        else:
+            print(f"Erro: Imagem '{caminho}' não encontrada!")
+            _imagens[chave] = None
+    return _imagens[chave]
+
+
+# Função para esvaziar a cache de imagens redimensionadas em disco
+def limpar_cache():
+    if os.path.isdir(PASTA_CACHE):
+        for arquivo in os.listdir(PASTA_CACHE):
+            os.remove(os.path.join(PASTA_CACHE, arquivo))
@@ -0,0 +1,130 @@
+import customtkinter as ctk
+
+from dinheiro import formatar  # Valores em centavos (inteiros)
+
+MESES_NO_GRAFICO = 24  # Quantidade de meses mais recentes no gráfico do saldo
+
+
+# Tela de resumo da conta, exibida dentro da janela principal (painel_principal.App)
+class TelaResumo(ctk.CTkFrame):
+    """
+    Totais de depósitos e saques por mês, evolução do saldo e quanto ainda
+    pode ser sacado hoje. Os dados vêm de Conta.resumo(), que lê só os
+    agregados mantidos a cada operação: exibir a tela custa O(meses), não
+    O(transações).
+    """
+
+    titulo = "Banco QAR V1"
+    ALTURA_LINHA = 24  # Altura de cada linha da tabela de meses
+
+    def __init__(self, master, app):
+        super().__init__(master, width=350, height=520, corner_radius=15, fg_color="#2C2F33")
+        self.app = app
+        self.pack_propagate(False)
+        self.saldo_exibido = None  # Saldo do último resumo lido (evita reler sem mudança)
+
+        # Cabeçalho azul
+        header = ctk.CTkFrame(self, width=350, height=70, fg_color="#3B82F6")
+        header.pack_propagate(False)
+        header.pack(side="top", fill="x")
+        title_label = ctk.CTkLabel(header, text="Resumo", font=("Arial", 22, "bold"), text_color="white")
+        title_label.pack(expand=True)
+
+        # Saldo atual e saques disponíveis hoje
+        self.saldo_label = ctk.CTkLabel(self, text="", font=("Arial", 16), text_color="white")
+        self.saldo_label.place(x=15, y=78)
+        self.saques_label = ctk.CTkLabel(self, text="", font=("Arial", 12), text_color="#9CA3AF")
+        self.saques_label.place(x=15, y=104)
+
+        # Gráfico do saldo no fim de cada mês
+        self.grafico = ctk.CTkCanvas(self, width=320, height=110, bg="#444444", highlightthickness=0)
+        self.grafico.place(x=15, y=134)
+
+        # Títulos das colunas da tabela de meses
+        for texto, x in (("MÊS", 20), ("DEPÓSITOS", 85), ("SAQUES", 175), ("SALDO", 260)):
+            ctk.CTkLabel(self, text=texto, font=("Arial", 12), text_color="white").place(x=x, y=250)
+
+        # Tabela de meses, do mais recente para o mais antigo (uma linha de rótulos por mês)
+        self.tabela = ctk.CTkScrollableFrame(self, width=300, height=150, corner_radius=15, fg_color="#444444")
+        self.tabela.place(relx=0.5, y=276, anchor="n")
+        self.linhas = []  # Rótulos já criados, reaproveitados a cada atualização
+
+        # Botão Voltar
+        voltar_button = ctk.CTkButton(self, width=40, height=40, text="<", command=lambda: self.app.mostrar_tela("painel"))
+        voltar_button.place(x=25, y=470)
+
+    # Chamado pelo painel sempre que a tela volta a ser exibida
+    def ao_mostrar(self):
+        self.carregar_resumo()
+
+    # Função que lê o resumo da conta na thread do escritor
+    def carregar_resumo(self):
+        self.app.escritor.enviar(self.app.conta.resumo, ao_terminar=self.exibir_resumo)
+
+    # Função chamada pelo App a cada mudança de saldo (ver eventos.py): relê o resumo só se ele mudou
+    def mostrar_saldo(self, novo_saldo):
+        if novo_saldo != self.saldo_exibido:
+            self.saldo_exibido = novo_saldo
+            self.carregar_resumo()
+
+    # Função que exibe um resumo já lido (dicionário de Conta.resumo)
+    def exibir_resumo(self, resumo):
+        self.saldo_exibido = resumo["saldo_centavos"]
+        self.saldo_label.configure(text=f"Saldo: R${formatar(resumo['saldo_centavos'], True)}")
+        disponiveis = resumo["saques_disponiveis"]
+        if disponiveis["saques"]:
+            texto = (f"Hoje: mais {disponiveis['saques']} saque(s), "
+                     f"até R${formatar(disponiveis['centavos'], True)} cada")
+        else:
+            texto = "Hoje: limite diário de saques atingido"
+        self.saques_label.configure(text=texto)
+        self.desenhar_grafico(resumo["meses"][-MESES_NO_GRAFICO:])
+        self.preencher_tabela(resumo["meses"][::-1])
+
+    # Função que desenha o saldo final de cada mês como uma linha
+    def desenhar_grafico(self, meses):
+        self.grafico.delete("all")
+        largura, altura, margem = 320, 110, 12
+        if not meses:
+            self.grafico.create_text(largura // 2, altura // 2, text="Sem transações", fill="#9CA3AF")
+            return
+        saldos = [mes["saldo_final"] for mes in meses]
+        menor, maior = min(saldos + [0]), max(saldos + [0])
+        escala = (altura - 2 * margem) / ((maior - menor) or 1)
+        passo = (largura - 2 * margem) / max(1, len(saldos) - 1)
+        pontos = []
+        for i, saldo in enumerate(saldos):
+            pontos += [margem + i * passo, altura - margem - (saldo - menor) * escala]
+        zero = altura - margem + menor * escala
+        self.grafico.create_line(margem, zero, largura - margem, zero, fill="#6B7280", dash=(2, 2))
+        if len(saldos) > 1:
+            self.grafico.create_line(*pontos, fill="#3B82F6", width=2)
+        self.grafico.create_oval(pontos[-2] - 3, pontos[-1] - 3, pontos[-2] + 3, pontos[-1] + 3, fill="#3B82F6",
+                                 outline="")
+        self.grafico.create_text(margem, 2, anchor="nw", fill="#9CA3AF", font=("Arial", 9),
+                                 text=f"{meses[0]['mes']} a {meses[-1]['mes']}")
+
+    # Função que escreve os meses na tabela, criando rótulos só quando faltam
+    def preencher_tabela(self, meses):
+        while len(self.linhas) < len(meses):
+            linha = len(self.linhas)
+            rotulos = []
+            for coluna, largura in enumerate((60, 90, 85, 90)):
+                rotulo = ctk.CTkLabel(self.tabela, text="", width=largura, height=self.ALTURA_LINHA,
+                                      font=("Arial", 11), text_color="white", anchor="e" if coluna else "w")
+                rotulo.grid(row=linha, column=coluna, padx=2)
+                rotulos.append(rotulo)
+            self.linhas.append(rotulos)
+        for i, rotulos in enumerate(self.linhas):
+            if i < len(meses):
+                mes = meses[i]
+                textos = (mes["mes"], formatar(mes["depositos"], True), formatar(mes["saques"], True),
+                          formatar(mes["saldo_final"], True))
+            else:
+                textos = ("", "", "", "")
+            for rotulo, texto in zip(rotulos, textos):
+                rotulo.configure(text=texto)
+
+if __name__ == "__main__":
+    import painel_principal
+    painel_principal.executar("resumo")  # Abre a janela principal já na tela de resumo
@@ -0,0 +1,370 @@
+import asyncio  # Servidor HTTP assíncrono: muitas conexões em uma única thread
+import http  # Frase de cada código de status (200 OK, 404 Not Found...)
+import json  # Corpo das requisições e respostas
+import os  # Caminho do cadastro de usuários dentro do diretório do banco
+import signal  # Encerramento limpo com SIGTERM
+import weakref  # Travas por conta liberadas quando ninguém mais as usa
+from concurrent.futures import ThreadPoolExecutor  # Threads para as operações que bloqueiam (fsync, hash)
+from urllib.parse import parse_qs  # Parâmetros do extrato na URL
+
+from armazenamento import FSYNC_A_CADA, OperacaoRecusada, data_valida
+from banco import Banco, obter_banco
+from credenciais import USER_DATA_FILE, Credenciais, obter_credenciais
+from dinheiro import formatar, para_centavos
+from grupo import MAXIMO_GRUPO
+from sessoes import CHAVE_FILE, GerenciadorSessoes, carregar_chave, obter_sessoes
+
+# API HTTP/JSON local do núcleo bancário, para outros serviços e testes de carga.
+#   POST /login     {"usuario": ..., "senha": ...}  -> {"token": ..., "expira": ...}
+#   POST /logout                                    -> encerra a sessão do token
+#   GET  /saldo                                     -> {"saldo_centavos": ..., "saldo": "12.34"}
+#   POST /deposito  {"valor": "12.50"} ou {"centavos": 1250}  -> transação gravada
+#   POST /saque     {"valor": "12.50"} ou {"centavos": 1250}  -> transação gravada
+#   GET  /extrato?inicio=0&quantidade=50[&de=dd/mm/aaaa&ate=dd/mm/aaaa&tipo=SAQUE]
+# Exceto /login, as rotas pedem o cabeçalho "Authorization: Bearer <token>" e
+# operam na conta do usuário, como a janela aberta pela tela de login. O token
+# é o mesmo das telas (sessoes.py): conferido em O(1), sem ler o cadastro, e
+# encerrado depois de sessoes.OCIOSO segundos sem uso.
+# Erros voltam como {"erro": mensagem}: 400 (pedido inválido), 401 (sem sessão),
+# 404, 413 e 422 (operação recusada pelas regras, mesma mensagem das telas).
+#
+# O laço de eventos só lê e escreve nos sockets; as chamadas ao banco (que
+# fazem fsync) e a verificação de senha (PBKDF2) rodam em um conjunto de
+# threads. Depósitos e saques de uma mesma conta são enfileirados no próprio
+# servidor, então uma conta muito usada ocupa no máximo uma thread por vez;
+# com confirmação em grupo (--grupo-ms) eles vão para a fila do grupo da conta.
+
+HOST_PADRAO = "127.0.0.1"
+PORTA_PADRAO = 8080
+TRABALHADORES = 16  # Threads para as operações do banco
+TEMPO_OCIOSO = 30  # Segundos sem requisições antes de fechar uma conexão keep-alive
+TAMANHO_MAXIMO = 64 * 1024  # Maior corpo de requisição aceito, em bytes
+MAXIMO_CABECALHOS = 100
+PAGINA_MAXIMA = 500  # Maior página do extrato
+
+
+class ErroHTTP(Exception):
+    """
+    Erro que vira uma resposta {"erro": mensagem} com o código `status`.
+    """
+
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+
+
+class Pedido:
+    """
+    Uma requisição HTTP já lida do socket.
+    """
+
+    def __init__(self, metodo, caminho, parametros, cabecalhos, corpo, versao):
+        self.metodo = metodo
+        self.caminho = caminho
+        self.parametros = parametros  # {nome: [valores]}, como parse_qs
+        self.cabecalhos = cabecalhos  # Nomes em minúsculas
+        self.corpo = corpo
+        self.versao = versao
+        self.usuario = None  # Preenchido para as rotas que pedem sessão
+        self.token = None
+
+    def manter_conexao(self):
+        """
+        Keep-alive: padrão no HTTP/1.1, só com pedido explícito no HTTP/1.0.
+        """
+        conexao = self.cabecalhos.get("connection", "").lower()
+        return conexao != "close" if self.versao == "HTTP/1.1" else conexao == "keep-alive"
+
+    def json(self):
+        try:
+            dados = json.loads(self.corpo or b"{}")
+        except ValueError:
+            raise ErroHTTP(400, "Corpo da requisição não é um JSON válido") from None
+        if not isinstance(dados, dict):
+            raise ErroHTTP(400, "O corpo da requisição deve ser um objeto JSON")
+        return dados
+
+    def parametro(self, nome, padrao=None):
+        return self.parametros.get(nome, [padrao])[0]
+
+
+class ServidorBanco:
+    """
+    Servidor HTTP/1.1 com keep-alive sobre asyncio, ligado a um Banco e a um
+    cadastro de usuários e a um gerenciador de sessões (por padrão os mesmos
+    das telas).
+    """
+
+    def __init__(self, banco=None, credenciais=None, trabalhadores=TRABALHADORES, sessoes=None):
+        self.banco = banco or obter_banco()
+        self.credenciais = credenciais or obter_credenciais()
+        self.sessoes = sessoes or obter_sessoes()
+        self.rotas = {
+            ("POST", "/login"): (self.login, False),  # (função, pede sessão?)
+            ("POST", "/logout"): (self.logout, True),
+            ("GET", "/saldo"): (self.saldo, True),
+            ("POST", "/deposito"): (self.depositar, True),
+            ("POST", "/saque"): (self.sacar, True),
+            ("GET", "/extrato"): (self.extrato, True),
+        }
+        self._executor = ThreadPoolExecutor(trabalhadores, thread_name_prefix="servidor")
+        self._travas = weakref.WeakValueDictionary()  # conta -> asyncio.Lock das gravações
+        self._conexoes = set()  # Escritores das conexões abertas, fechados no encerramento
+        self._servidor = None
+
+    async def _executar(self, funcao, *args):
+        """
+        Roda `funcao(*args)` em uma thread de trabalho, sem bloquear o laço de eventos.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._executor, funcao, *args)
+
+    def _trava(self, conta):
+        trava = self._travas.get(conta)
+        if trava is None:
+            trava = self._travas[conta] = asyncio.Lock()
+        return trava
+
+    # Rotas
+
+    async def login(self, pedido):
+        """
+        Mesma verificação de login.authenticate_user (Credenciais.verificar).
+        """
+        dados = pedido.json()
+        usuario, senha = dados.get("usuario"), dados.get("senha")
+        if not isinstance(usuario, str) or not isinstance(senha, str):
+            raise ErroHTTP(400, "Informe usuario e senha")
+        if not await self._executar(self.credenciais.verificar, usuario, senha):
+            raise ErroHTTP(401, "Usuário ou senha incorretos")
+        token = self.sessoes.criar(usuario)
+        return 200, {"token": token, "usuario": usuario, "expira": int(token.split(".")[3])}
+
+    async def logout(self, pedido):
+        self.sessoes.encerrar(pedido.token)
+        return 200, {"usuario": pedido.usuario}
+
+    async def saldo(self, pedido):
+        saldo = await self._executar(lambda: self.banco.conta(pedido.usuario).saldo())
+        return 200, {"saldo_centavos": saldo, "saldo": formatar(saldo)}
+
+    async def depositar(self, pedido):
+        """
+        Mesma operação de deposito.salvar_valor (Conta.depositar).
+        """
+        return await self._gravar(pedido, "DEPOSITO")
+
+    async def sacar(self, pedido):
+        """
+        Mesma operação de saque.salvar_valor (Conta.sacar, com as regras de saque).
+        """
+        return await self._gravar(pedido, "SAQUE")
+
+    async def _gravar(self, pedido, tipo):
+        centavos = self._centavos(pedido.json())
+        conta = await self._executar(self.banco.conta, pedido.usuario)
+        if conta.grupo is not None:
+            # Confirmação em grupo (ver grupo.py): a operação entra no próximo grupo
+            # da conta e o resultado é esperado sem ocupar uma thread de trabalho
+            transacao = await asyncio.wrap_future(conta.enviar(tipo, centavos))
+        else:
+            async with self._trava(pedido.usuario):  # Uma gravação por conta de cada vez
+                operacao = conta.depositar if tipo == "DEPOSITO" else conta.sacar
+                transacao = await self._executar(operacao, centavos)
+        return 200, dict(transacao, saldo=formatar(transacao["saldo_centavos"]))
+
+    @staticmethod
+    def _centavos(dados):
+        if "centavos" in dados:
+            centavos = dados["centavos"]
+            if not isinstance(centavos, int) or isinstance(centavos, bool):
+                raise ErroHTTP(400, "centavos deve ser um número inteiro")
+            return centavos
+        valor = dados.get("valor")
+        if not isinstance(valor, (str, int)) or isinstance(valor, bool):
+            raise ErroHTTP(400, "Informe valor (texto, ex.: \"12.50\") ou centavos")
+        try:
+            return para_centavos(valor)  # "12.5" -> 1250; mais de 2 casas é recusado
+        except ValueError:
+            raise ErroHTTP(400, "Valor inválido!") from None
+
+    async def extrato(self, pedido):
+        try:
+            inicio = max(0, int(pedido.parametro("inicio", 0)))
+            quantidade = min(PAGINA_MAXIMA, max(0, int(pedido.parametro("quantidade", 50))))
+        except ValueError:
+            raise ErroHTTP(400, "inicio e quantidade devem ser números inteiros") from None
+        filtro = {"de": pedido.parametro("de"), "ate": pedido.parametro("ate"), "tipo": pedido.parametro("tipo")}
+        if filtro["tipo"] not in (None, "DEPOSITO", "SAQUE"):
+            raise ErroHTTP(400, "tipo deve ser DEPOSITO ou SAQUE")
+        for data in (filtro["de"], filtro["ate"]):
+            if data is not None and not data_valida(data):
+                raise ErroHTTP(400, "Use datas no formato dd/mm/aaaa")
+
+        def ler():
+            conta = self.banco.conta(pedido.usuario)
+            return conta.quantidade_transacoes(**filtro), conta.extrato(inicio, quantidade, **filtro)
+        total, transacoes = await self._executar(ler)
+        return 200, {"total": total, "inicio": inicio, "transacoes": transacoes}
+
+    # Protocolo
+
+    async def _ler_pedido(self, leitor):
+        """
+        Lê uma requisição da conexão; retorna None se o cliente fechou a
+        conexão ou ficou ocioso por mais de TEMPO_OCIOSO segundos.
+        """
+        try:
+            linha = await asyncio.wait_for(leitor.readline(), TEMPO_OCIOSO)
+        except asyncio.TimeoutError:
+            return None
+        if not linha.strip():
+            return None
+        try:
+            metodo, alvo, versao = linha.decode("latin-1").split()
+        except ValueError:
+            raise ErroHTTP(400, "Linha de requisição inválida") from None
+        cabecalhos = {}
+        while True:
+            linha = await leitor.readline()
+            if linha in (b"\r\n", b"\n", b""):
+                break
+            if len(cabecalhos) >= MAXIMO_CABECALHOS:
+                raise ErroHTTP(431, "Cabeçalhos demais")
+            nome, _, valor = linha.decode("latin-1").partition(":")
+            cabecalhos[nome.strip().lower()] = valor.strip()
+        try:
+            tamanho = int(cabecalhos.get("content-length") or 0)
+        except ValueError:
+            raise ErroHTTP(400, "Content-Length inválido") from None
+        if tamanho > TAMANHO_MAXIMO:
+            raise ErroHTTP(413, "Corpo da requisição grande demais")
+        corpo = await leitor.readexactly(tamanho) if tamanho > 0 else b""
+        caminho, _, consulta = alvo.partition("?")
+        return Pedido(metodo.upper(), caminho, parse_qs(consulta), cabecalhos, corpo, versao.upper())
+
+    async def _responder(self, pedido):
+        rota = self.rotas.get((pedido.metodo, pedido.caminho))
+        if rota is None:
+            if any(caminho == pedido.caminho for _, caminho in self.rotas):
+                raise ErroHTTP(405, "Método não permitido")
+            raise ErroHTTP(404, "Rota inexistente")
+        funcao, pede_sessao = rota
+        if pede_sessao:
+            esquema, _, token = pedido.cabecalhos.get("authorization", "").partition(" ")
+            if esquema.lower() == "bearer":
+                pedido.token = token.strip()
+                pedido.usuario = self.sessoes.validar(pedido.token)
+            if pedido.usuario is None:
+                raise ErroHTTP(401, "Faça login e envie Authorization: Bearer <token>")
+        try:
+            return await funcao(pedido)
+        except OperacaoRecusada as erro:
+            raise ErroHTTP(422, str(erro)) from None
+
+    @staticmethod
+    def _resposta(status, dados, manter):
+        corpo = json.dumps(dados, ensure_ascii=False).encode("utf-8")
+        cabecalho = (f"HTTP/1.1 {status} {http.HTTPStatus(status).phrase}\r\n"
+                     "Content-Type: application/json; charset=utf-8\r\n"
+                     f"Content-Length: {len(corpo)}\r\n"
+                     f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n")
+        return cabecalho.encode("ascii") + corpo
+
+    async def atender(self, leitor, escritor):
+        """
+        Atende uma conexão: várias requisições em sequência (keep-alive) até o
+        cliente fechar, pedir "Connection: close" ou ficar ocioso.
+        """
+        self._conexoes.add(escritor)
+        try:
+            while True:
+                try:
+                    pedido = await self._ler_pedido(leitor)
+                except ErroHTTP as erro:
+                    escritor.write(self._resposta(erro.status, {"erro": str(erro)}, False))
+                    break
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+                    break  # Conexão cortada no meio ou linha longa demais
+                if pedido is None:
+                    break
+                manter = pedido.manter_conexao()
+                try:
+                    status, dados = await self._responder(pedido)
+                except ErroHTTP as erro:
+                    status, dados = erro.status, {"erro": str(erro)}
+                except Exception as erro:  # Falha inesperada: a conexão continua servindo as próximas
+                    status, dados = 500, {"erro": f"Erro interno: {erro.__class__.__name__}"}
+                escritor.write(self._resposta(status, dados, manter))
+                await escritor.drain()
+                if not manter:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self._conexoes.discard(escritor)
+            escritor.close()
+
+    async def iniciar(self, host=HOST_PADRAO, porta=PORTA_PADRAO):
+        """
+        Começa a aceitar conexões e retorna (host, porta) em que o servidor
+        está ouvindo (porta 0 escolhe uma porta livre).
+        """
+        self._servidor = await asyncio.start_server(self.atender, host, porta)
+        return self._servidor.sockets[0].getsockname()[:2]
+
+    async def parar(self):
+        """
+        Para de aceitar conexões, fecha as abertas e espera as gravações em andamento.
+        """
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+            self._servidor = None
+        for escritor in list(self._conexoes):
+            escritor.close()
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+
+
+# Função que roda o servidor até SIGINT/SIGTERM
+async def servir(servidor, host=HOST_PADRAO, porta=PORTA_PADRAO):
+    host, porta = await servidor.iniciar(host, porta)
+    print(f"ouvindo em http://{host}:{porta}", flush=True)
+    encerrar = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sinal in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sinal, encerrar.set)
+        except (NotImplementedError, AttributeError):  # Windows: só Ctrl+C, via KeyboardInterrupt
+            pass
+    try:
+        await encerrar.wait()
+    finally:
+        await servidor.parar()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    # python servidor.py [--host 127.0.0.1] [--porta 8080] [--diretorio .] [--motor json|sqlite] [--grupo-ms 2]
+    parser = argparse.ArgumentParser(description="API HTTP/JSON local do banco (ver o início de servidor.py).")
+    parser.add_argument("--host", default=HOST_PADRAO)
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO, help="0 escolhe uma porta livre")
+    parser.add_argument("--diretorio", default=".", help="diretório do banco e do users.json")
+    parser.add_argument("--motor", choices=["json", "sqlite"], default=None)
+    parser.add_argument("--fsync-a-cada", type=int, default=FSYNC_A_CADA,
+                        help="transações gravadas entre dois fsync (ver armazenamento.FSYNC_A_CADA)")
+    parser.add_argument("--trabalhadores", type=int, default=TRABALHADORES)
+    parser.add_argument("--grupo-ms", type=float, default=None,
+                        help="confirmação em grupo: janela em ms para juntar operações de uma conta (ver grupo.py)")
+    parser.add_argument("--grupo-max", type=int, default=MAXIMO_GRUPO, help="operações por grupo")
+    args = parser.parse_args()
+    banco = Banco(args.diretorio, args.fsync_a_cada, motor=args.motor,
+                  janela_grupo=None if args.grupo_ms is None else args.grupo_ms / 1000, maximo_grupo=args.grupo_max)
+    servidor = ServidorBanco(banco, Credenciais(os.path.join(args.diretorio, USER_DATA_FILE)), args.trabalhadores,
+                             GerenciadorSessoes(carregar_chave(os.path.join(args.diretorio, CHAVE_FILE))))
+    try:
+        asyncio.run(servir(servidor, args.host, args.porta))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        banco.fechar()
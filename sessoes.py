@@ -0,0 +1,217 @@
+import base64  # Campos do token em texto seguro para URL e cabeçalhos
+import hashlib  # SHA-256 da assinatura
+import hmac  # Assinatura do token e comparação em tempo constante
+import os  # Chave e sessão salva em arquivos
+import threading  # As sessões são usadas pela interface, pelo escritor e pelo servidor
+import time  # Validade e tempo ocioso (relógio de parede: o token passa entre processos)
+from collections import OrderedDict  # Sessões ativas da menos para a mais recentemente usada
+
+# Sessões de login: o token é assinado (HMAC-SHA256) e carrega o usuário e a
+# validade, então conferir um token é O(1) e não lê users.json. As sessões
+# ativas ficam em uma LRU em memória com limite de tamanho; cada uso renova a
+# sessão e as paradas há mais de OCIOSO segundos são descartadas.
+#
+# Formato do token: usuario.emissor.id.expira.assinatura (campos em base64url,
+# expira em segundos desde 1970). `emissor` identifica o processo que criou a
+# sessão: um token deste processo que não está na LRU foi encerrado (logout,
+# tempo ocioso ou limite de sessões) e é recusado. Um token de outro processo
+# que usa a mesma chave (a tela de login de uma execução anterior, o servidor
+# HTTP) é aceito enquanto não expirar e passa a valer nesta LRU.
+
+CHAVE_FILE = ".sessoes.chave"  # Chave das assinaturas, compartilhada pelos processos do banco
+SESSAO_FILE = ".sessao"  # Token da última sessão da interface, para entrar de novo sem login
+VALIDADE = 12 * 3600  # Segundos de vida de um token, usado ou não
+OCIOSO = 30 * 60  # Segundos sem uso depois dos quais a sessão é encerrada
+MAXIMO_SESSOES = 100_000  # Sessões ativas em memória; a usada há mais tempo sai primeiro
+
+
+def _b64(dados):
+    return base64.urlsafe_b64encode(dados).rstrip(b"=").decode("ascii")
+
+
+def _de_b64(texto):
+    return base64.urlsafe_b64decode(texto + "=" * (-len(texto) % 4))
+
+
+# Função que lê a chave das assinaturas, criando-a (só para o dono) na primeira vez
+def carregar_chave(caminho=CHAVE_FILE):
+    try:
+        with open(caminho, "rb") as arquivo:
+            return arquivo.read()
+    except FileNotFoundError:
+        pass
+    chave = os.urandom(32)
+    try:
+        descritor = os.open(caminho, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:  # Outro processo criou ao mesmo tempo: usa a dele
+        with open(caminho, "rb") as arquivo:
+            return arquivo.read()
+    with os.fdopen(descritor, "wb") as arquivo:
+        arquivo.write(chave)
+    return chave
+
+
+class GerenciadorSessoes:
+    """
+    Cria, confere e encerra sessões (ver o início de sessoes.py).
+    Todos os métodos são O(1) (amortizado) e seguros para várias threads.
+    """
+
+    def __init__(self, chave, validade=VALIDADE, ocioso=OCIOSO, maximo=MAXIMO_SESSOES, relogio=time.time):
+        self._chave = chave
+        self.validade = validade
+        self.ocioso = ocioso
+        self.maximo = maximo
+        self._relogio = relogio
+        self._emissor = _b64(os.urandom(6))
+        self._ativas = OrderedDict()  # id -> (usuário, expira, último uso, de outro processo?), da menos para a mais usada
+        self._encerradas = OrderedDict()  # id -> expira, de tokens de outros processos já encerrados aqui
+        self._trava = threading.Lock()
+
+    def _assinatura(self, corpo):
+        return _b64(hmac.new(self._chave, corpo.encode("ascii"), hashlib.sha256).digest())
+
+    def criar(self, usuario):
+        """
+        Abre uma sessão para o usuário (já autenticado) e retorna o token.
+        """
+        agora = self._relogio()
+        identificador = _b64(os.urandom(12))
+        expira = int(agora + self.validade)
+        corpo = f"{_b64(usuario.encode('utf-8'))}.{self._emissor}.{identificador}.{expira}"
+        with self._trava:
+            self._expurgar(agora)
+            self._ativas[identificador] = (usuario, expira, agora, False)
+            if len(self._ativas) > self.maximo:
+                self._encerrar(*self._ativas.popitem(last=False))
+        return f"{corpo}.{self._assinatura(corpo)}"
+
+    def _ler(self, token):
+        """
+        Confere a assinatura e retorna (usuário, emissor, id, expira), ou None.
+        """
+        if not token or not token.isascii():
+            return None
+        corpo, _, assinatura = token.rpartition(".")
+        if not corpo or not hmac.compare_digest(assinatura, self._assinatura(corpo)):
+            return None
+        try:
+            usuario, emissor, identificador, expira = corpo.split(".")
+            return _de_b64(usuario).decode("utf-8"), emissor, identificador, int(expira)
+        except ValueError:
+            return None
+
+    def validar(self, token):
+        """
+        Retorna o usuário da sessão, ou None se o token for inválido, tiver
+        expirado ou a sessão tiver sido encerrada. Cada uso renova a sessão.
+        """
+        lido = self._ler(token)
+        if lido is None:
+            return None
+        usuario, emissor, identificador, expira = lido
+        agora = self._relogio()
+        with self._trava:
+            self._expurgar(agora)
+            sessao = self._ativas.get(identificador)
+            if sessao is None:
+                # Encerrada aqui, ou de outro processo: só esta passa a valer
+                if emissor == self._emissor or identificador in self._encerradas or expira <= agora:
+                    return None
+                sessao = (usuario, expira, agora, True)
+                if len(self._ativas) >= self.maximo:
+                    self._encerrar(*self._ativas.popitem(last=False))
+            elif sessao[1] <= agora or agora - sessao[2] > self.ocioso:
+                self._encerrar(identificador, self._ativas.pop(identificador))
+                return None
+            self._ativas[identificador] = (usuario, expira, agora, sessao[3])
+            self._ativas.move_to_end(identificador)
+            return usuario
+
+    def encerrar(self, token):
+        """
+        Encerra a sessão do token (logout). Tokens inválidos são ignorados.
+        """
+        lido = self._ler(token)
+        if lido is None:
+            return
+        _, emissor, identificador, expira = lido
+        with self._trava:
+            sessao = self._ativas.pop(identificador, None)
+            self._encerrar(identificador, sessao or (None, expira, None, emissor != self._emissor))
+
+    def _encerrar(self, identificador, sessao):
+        # Tokens deste processo já são recusados fora da LRU; os de outros processos
+        # precisam ser lembrados (até expirarem) para não voltarem a valer
+        if not sessao[3]:
+            return
+        self._encerradas[identificador] = sessao[1]
+        if len(self._encerradas) > self.maximo:
+            self._encerradas.popitem(last=False)
+
+    def _expurgar(self, agora):
+        """
+        Descarta as sessões paradas há mais de `ocioso` segundos. A LRU está
+        em ordem de uso, então basta olhar o começo dela.
+        """
+        while self._ativas:
+            identificador, (_, expira, ultimo_uso, _) = next(iter(self._ativas.items()))
+            if agora - ultimo_uso <= self.ocioso and expira > agora:
+                break
+            self._encerrar(identificador, self._ativas.popitem(last=False)[1])
+        while self._encerradas:
+            identificador, expira = next(iter(self._encerradas.items()))
+            if expira > agora:
+                break
+            del self._encerradas[identificador]  # Expirado: seria recusado de qualquer forma
+
+    def __len__(self):
+        return len(self._ativas)
+
+
+_sessoes = None  # Gerenciador compartilhado por este processo
+
+
+# Função para obter o gerenciador de sessões padrão (chave em .sessoes.chave)
+def obter_sessoes():
+    global _sessoes
+    if _sessoes is None:
+        _sessoes = GerenciadorSessoes(carregar_chave())
+    return _sessoes
+
+
+# Função que guarda o token da interface para a próxima abertura (só o dono lê)
+def salvar_sessao(token, caminho=SESSAO_FILE):
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    descritor = os.open(temporario, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(descritor, "w", encoding="ascii") as arquivo:
+        arquivo.write(token)
+    os.replace(temporario, caminho)
+
+
+# Função que retorna o token salvo, se a interface foi usada há menos de OCIOSO segundos
+def sessao_salva(caminho=SESSAO_FILE, ocioso=OCIOSO):
+    try:
+        if time.time() - os.path.getmtime(caminho) > ocioso:
+            apagar_sessao(caminho)
+            return None
+        with open(caminho, "r", encoding="ascii") as arquivo:
+            return arquivo.read().strip() or None
+    except (FileNotFoundError, UnicodeDecodeError):
+        return None
+
+
+# Função que marca o uso da sessão salva (o tempo ocioso conta a partir daqui)
+def tocar_sessao(caminho=SESSAO_FILE):
+    try:
+        os.utime(caminho)
+    except FileNotFoundError:
+        pass
+
+
+# Função que apaga o token salvo (sessão encerrada ou expirada)
+def apagar_sessao(caminho=SESSAO_FILE):
+    try:
+        os.remove(caminho)
+    except FileNotFoundError:
+        pass